@@ -23,7 +23,11 @@ from src.config.settings import get_config, create_directories, STREAMLIT_CONFIG
 from src.auth.authentication import render_login_form, logout
 from src.utils.data_processor import DataProcessor
 from src.utils.export_utils import ExportManager
-from src.components.ui_components import render_sidebar, render_file_upload, render_filters
+from src.utils.file_cache import content_digest
+from src.components.ui_components import (
+    render_sidebar, render_file_upload, render_report_batch_loader, render_history_controls,
+    render_column_mapping, render_filters, render_quality_profiler
+)
 
 # Configurar a página
 st.set_page_config(**STREAMLIT_CONFIG)
@@ -44,6 +48,35 @@ def initialize_session_state():
     
     if 'analysis_mode' not in st.session_state:
         st.session_state.analysis_mode = 'pending'
+    
+    if 'upload_digests' not in st.session_state:
+        st.session_state.upload_digests = {}
+    
+    # Origem dos dados ativos (upload, relatórios ou histórico)
+    if 'active_source' not in st.session_state:
+        st.session_state.active_source = None
+
+def get_upload_digest(uploaded_file) -> str:
+    """Digest do upload, calculado uma única vez por arquivo enviado."""
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if file_id is None:
+        return content_digest(uploaded_file)
+    
+    digests = st.session_state.upload_digests
+    if file_id not in digests:
+        digests[file_id] = content_digest(uploaded_file)
+    return digests[file_id]
+
+def get_upload_source(uploaded_file, processor) -> tuple:
+    """
+    Identifica o upload como origem dos dados.
+    
+    Inclui as colunas fixadas e as opções de carregamento, que mudam o
+    resultado: o arquivo só é recarregado quando algum deles muda.
+    """
+    file_id = getattr(uploaded_file, 'file_id', None) or get_upload_digest(uploaded_file)
+    options = repr(sorted(st.session_state.get('load_options', {}).items()))
+    return ('upload', file_id, processor.column_mapper.pins_digest(), options)
 
 def render_header():
     """Renderiza o cabeçalho da aplicação."""
@@ -98,17 +131,51 @@ def render_data_analysis_tab(permissions):
     # Upload de arquivo
     if permissions.get('upload_files', False):
         uploaded_file = render_file_upload()
+        report_paths = render_report_batch_loader()
+        render_quality_profiler(processor)
+        history_period = render_history_controls(processor)
+        
+        if history_period:
+            with st.spinner("🗄️ Lendo histórico..."):
+                success, message, df = processor.load_history(*history_period)
+            
+            if success:
+                st.success(message)
+                st.session_state.uploaded_data = df
+                st.session_state.active_source = ('history', tuple(history_period))
+            else:
+                st.error(message)
+                return
+        
+        elif report_paths:
+            with st.spinner(f"📂 Processando {len(report_paths)} relatórios..."):
+                success, message, df = processor.load_reports(
+                    report_paths,
+                    **st.session_state.get('load_options', {})
+                )
+            
+            if success:
+                st.success(message)
+                st.session_state.uploaded_data = df
+                st.session_state.active_source = ('reports', tuple(str(path) for path in report_paths))
+            else:
+                st.error(message)
+                return
         
-        if uploaded_file:
+        # O upload continua no widget entre reruns: só recarregar quando ele muda
+        elif uploaded_file and get_upload_source(uploaded_file, processor) != st.session_state.active_source:
             with st.spinner("📂 Processando arquivo..."):
                 success, message, df = processor.load_file(
-                    uploaded_file.getvalue(), 
-                    uploaded_file.name
+                    uploaded_file,
+                    uploaded_file.name,
+                    digest=get_upload_digest(uploaded_file),
+                    **st.session_state.get('load_options', {})
                 )
             
             if success:
                 st.success(message)
                 st.session_state.uploaded_data = df
+                st.session_state.active_source = get_upload_source(uploaded_file, processor)
             else:
                 st.error(message)
                 return
@@ -122,14 +189,20 @@ def render_data_analysis_tab(permissions):
     
     df = st.session_state.uploaded_data
     
+    # Colunas fixadas entram na chave de carregamento: o próximo rerun recarrega o arquivo
+    if permissions.get('upload_files', False) and render_column_mapping(
+        processor, permissions.get('manage_column_mappings', False)
+    ):
+        st.rerun()
+    
     # Filtros
     st.markdown("---")
     st.markdown("### 🎛️ Filtros de Análise")
     
     filters = render_filters(processor, permissions.get('advanced_filters', False))
     
-    # Aplicar filtros
-    filtered_df = processor.apply_filters(filters)
+    # Consulta preguiçosa: executada uma única vez pelas agregações abaixo
+    query = processor.query(filters)
     
     # Modo de análise
     analysis_mode = st.radio(
@@ -147,9 +220,10 @@ def render_data_analysis_tab(permissions):
     st.session_state.analysis_mode = analysis_mode
     
     # Filtrar por status
-    status_filtered_df = processor.filter_by_status(filtered_df, analysis_mode)
+    query = query.with_status(analysis_mode)
+    total_deliveries = query.count()
     
-    if status_filtered_df.empty:
+    if total_deliveries == 0:
         st.warning("⚠️ Nenhum registro encontrado com os filtros selecionados")
         return
     
@@ -157,7 +231,7 @@ def render_data_analysis_tab(permissions):
     st.markdown("---")
     st.markdown("### 📊 Resultados por Entregador")
     
-    grouped_data = processor.group_by_deliverer(status_filtered_df)
+    grouped_data = query.group_by_deliverer()
     
     if not grouped_data.empty:
         # Exibir tabela
@@ -171,7 +245,7 @@ def render_data_analysis_tab(permissions):
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("📦 Total de Entregas", len(status_filtered_df))
+            st.metric("📦 Total de Entregas", total_deliveries)
         
         with col2:
             st.metric("👥 Entregadores", len(grouped_data))
@@ -235,9 +309,9 @@ def render_dashboard_tab():
     df = st.session_state.uploaded_data
     
     # Aplicar filtros atuais
-    filtered_df = processor.apply_filters(st.session_state.current_filters)
+    query = processor.query(st.session_state.current_filters)
     
-    if filtered_df.empty:
+    if query.count() == 0:
         st.warning("Nenhum dado para exibir no dashboard")
         return
     
@@ -248,7 +322,7 @@ def render_dashboard_tab():
     
     with col1:
         # Gráfico de entregas por entregador
-        grouped_data = processor.group_by_deliverer(filtered_df)
+        grouped_data = query.group_by_deliverer()
         if not grouped_data.empty:
             fig_bar = px.bar(
                 grouped_data.head(10),
@@ -274,7 +348,12 @@ def render_dashboard_tab():
     
     # Estatísticas detalhadas
     st.markdown("---")
-    stats = processor.get_statistics(filtered_df)
+    stats = query.statistics()
+    
+    # Estatísticas estimadas pelos resumos: distintos com erro padrão indicado
+    approximate = stats.get('approximate')
+    prefix = "≈ " if approximate else ""
+    distinct_help = f"Estimativa com erro padrão de ±{approximate['distinct_error']:.1%}" if approximate else None
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -282,16 +361,23 @@ def render_dashboard_tab():
         st.metric("📦 Total de Registros", stats.get('total_records', 0))
     
     with col2:
-        st.metric("👥 Entregadores Únicos", stats.get('unique_deliverers', 0))
+        st.metric("👥 Entregadores Únicos", f"{prefix}{stats.get('unique_deliverers', 0)}", help=distinct_help)
     
     with col3:
-        st.metric("🏙️ Cidades Únicas", stats.get('unique_cities', 0))
+        st.metric("🏙️ Cidades Únicas", f"{prefix}{stats.get('unique_cities', 0)}", help=distinct_help)
     
     with col4:
         date_range = stats.get('date_range')
         if date_range:
             days = (date_range['max'] - date_range['min']).days
             st.metric("📅 Período (dias)", days)
+    
+    if approximate:
+        st.caption(
+            f"Estatísticas aproximadas: entregadores e cidades únicos com erro padrão de "
+            f"±{approximate['distinct_error']:.1%}; contagens de status com erro de até "
+            f"{approximate['status_error']} registros"
+        )
 
 def render_data_quality_tab():
     """Renderiza a aba de qualidade dos dados."""
@@ -331,6 +417,12 @@ def render_data_quality_tab():
         for rec in recommendations:
             st.info(rec)
     
+    # Registros do mesmo pedido no mesmo dia e com o mesmo entregador
+    near_duplicates = processor.find_duplicates(near=True) if df is processor.df else None
+    if near_duplicates is not None and not near_duplicates.empty:
+        with st.expander(f"🔁 Possíveis Duplicatas ({len(near_duplicates)})"):
+            st.dataframe(near_duplicates.head(500), use_container_width=True)
+    
     # Informações detalhadas
     with st.expander("📊 Detalhes dos Dados"):
         col1, col2 = st.columns(2)
@@ -20,6 +20,16 @@ import warnings
 
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 
+from src.utils.xlsx_reader import read_xlsx
+
+COLUNAS_USADAS = ['Data prevista de entrega', 'Status', 'Cidade', 'Entregador']
+
+def carregar_planilha(arquivo):
+    # Leitura em streaming apenas das colunas usadas pela interface
+    df = read_xlsx(arquivo, columns=COLUNAS_USADAS)
+    df['Data prevista de entrega'] = pd.to_datetime(df['Data prevista de entrega'], errors='coerce')
+    return df
+
 def encontrar_arquivo_excel_mais_recente(pasta='.'):
     arquivos = [f for f in os.listdir(pasta) if f.endswith('.xlsx')]
     if not arquivos:
@@ -57,8 +67,7 @@ def gerar_relatorio(data_opcao):
         return
 
     try:
-        df = pd.read_excel(arquivo, sheet_name=0, engine='openpyxl')
-        df['Data prevista de entrega'] = pd.to_datetime(df['Data prevista de entrega'], errors='coerce')
+        df = carregar_planilha(arquivo)
 
         if data_opcao == "Ontem":
             data = datetime.now().date() - timedelta(days=1)
@@ -88,8 +97,7 @@ def iniciar_app():
         messagebox.showerror("Erro", "Nenhum arquivo Excel encontrado.")
         return
 
-    df = pd.read_excel(arquivo, sheet_name=0, engine='openpyxl')
-    df['Data prevista de entrega'] = pd.to_datetime(df['Data prevista de entrega'], errors='coerce')
+    df = carregar_planilha(arquivo)
 
     app = tk.Tk()
     app.title("app_logistica_gui - Relatório de Entregas")
@@ -5,6 +5,8 @@ import sys
 import subprocess
 import warnings
 
+from src.utils.xlsx_reader import read_xlsx
+
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 
 COLUNA_DATA = 'Data prevista de entrega'
@@ -24,7 +26,8 @@ def encontrar_arquivo_excel_mais_recente(pasta=PASTA):
 
 def carregar_dados(caminho_arquivo):
     try:
-        return pd.read_excel(caminho_arquivo, sheet_name=0, engine='openpyxl')
+        # Leitura em streaming apenas das colunas usadas no relatório
+        return read_xlsx(caminho_arquivo, columns=[COLUNA_DATA, COLUNA_ENTREGADOR])
     except Exception as e:
         print(f"Erro ao carregar o arquivo: {e}")
         sys.exit(1)
@@ -61,6 +61,10 @@ setup(
             "mypy>=1.5.0",
             "pre-commit>=3.4.0",
         ],
+        "performance": [
+            "pyarrow>=14.0.0",
+            "duckdb>=0.10.0",
+        ],
         "docs": [
             "sphinx>=7.0.0",
             "sphinx-rtd-theme>=1.3.0",
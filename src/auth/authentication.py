@@ -123,6 +123,7 @@ class AuthenticationManager:
                 'view_reports': True,
                 'export_data': True,
                 'manage_users': True,
+                'manage_column_mappings': True,
                 'view_logs': True,
                 'advanced_filters': True
             },
@@ -131,6 +132,7 @@ class AuthenticationManager:
                 'view_reports': True,
                 'export_data': True,
                 'manage_users': False,
+                'manage_column_mappings': False,
                 'view_logs': False,
                 'advanced_filters': True
             },
@@ -139,6 +141,7 @@ class AuthenticationManager:
                 'view_reports': True,
                 'export_data': False,
                 'manage_users': False,
+                'manage_column_mappings': False,
                 'view_logs': False,
                 'advanced_filters': False
             }
@@ -3,10 +3,14 @@ Componentes de interface do usuário para o LogisticSmart.
 """
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
 import plotly.express as px
 
+from ..config.settings import INGESTION_CONFIG
+from ..utils.batch_loader import find_report_files
+
 def render_sidebar(permissions: Dict[str, bool]):
     """
     Renderiza a sidebar com opções baseadas nas permissões do usuário.
@@ -30,6 +34,7 @@ def render_sidebar(permissions: Dict[str, bool]):
             'view_reports': '📊',
             'export_data': '📥',
             'manage_users': '👥',
+            'manage_column_mappings': '🧭',
             'view_logs': '📋',
             'advanced_filters': '🔍'
         }
@@ -46,6 +51,10 @@ def render_sidebar(permissions: Dict[str, bool]):
             # Cache
             if st.button("🗑️ Limpar Cache", help="Limpa dados em cache"):
                 st.cache_data.clear()
+                if 'data_processor' in st.session_state:
+                    st.session_state.data_processor.disk_cache.clear()
+                    st.session_state.data_processor.result_cache.clear()
+                    st.session_state.data_processor.load_cache.clear()
                 st.success("Cache limpo!")
                 st.rerun()
             
@@ -63,6 +72,24 @@ def render_sidebar(permissions: Dict[str, bool]):
             # Uso de memória
             memory_mb = df.memory_usage(deep=True).sum() / 1024**2
             st.metric("💾 Memória", f"{memory_mb:.1f} MB")
+            
+            # Reaproveitamento de resultados de filtros
+            if 'data_processor' in st.session_state:
+                cache_stats = st.session_state.data_processor.result_cache.stats()
+                st.metric(
+                    "⚡ Cache de Resultados",
+                    f"{cache_stats['hit_rate']:.0%}",
+                    help=f"{cache_stats['hits']} acertos, {cache_stats['misses']} falhas, "
+                         f"{cache_stats['entries']} resultados ({cache_stats['bytes'] / 1024**2:.1f} MB)"
+                )
+                
+                # Datasets compartilhados entre as sessões do servidor
+                load_stats = st.session_state.data_processor.load_cache.stats()
+                st.metric(
+                    "🗂️ Datasets em Memória",
+                    f"{load_stats['in_use']}/{load_stats['entries']} em uso",
+                    help=f"{load_stats['bytes'] / 1024**2:.1f} MB compartilhados entre as sessões"
+                )
         else:
             st.info("Nenhum dado carregado")
 
@@ -97,6 +124,24 @@ def render_file_upload() -> Optional[Any]:
         ⚡ O sistema detecta automaticamente as colunas!
         """)
     
+    # Opções de carregamento
+    with st.expander("⚙️ Opções de Carregamento"):
+        project_columns = st.toggle(
+            "Carregar apenas colunas reconhecidas",
+            value=INGESTION_CONFIG["project_columns"],
+            help="Reduz o uso de memória em planilhas com muitas colunas"
+        )
+        extra_columns = st.text_input(
+            "Colunas adicionais (separadas por vírgula):",
+            value=", ".join(INGESTION_CONFIG["extra_columns"]),
+            disabled=not project_columns
+        )
+    
+    st.session_state.load_options = {
+        'project_columns': project_columns,
+        'extra_columns': tuple(c.strip() for c in extra_columns.split(',') if c.strip()),
+    }
+    
     # Upload
     uploaded_file = st.file_uploader(
         "Escolha um arquivo:",
@@ -107,7 +152,7 @@ def render_file_upload() -> Optional[Any]:
     
     if uploaded_file:
         # Informações do arquivo
-        file_size = len(uploaded_file.getvalue()) / 1024**2  # MB
+        file_size = uploaded_file.size / 1024**2  # MB
         st.info(f"📄 **{uploaded_file.name}** ({file_size:.1f} MB)")
         
         # Validações básicas
@@ -119,6 +164,189 @@ def render_file_upload() -> Optional[Any]:
     
     return None
 
+def render_report_batch_loader() -> Optional[List[Path]]:
+    """
+    Renderiza a seleção de relatórios da pasta Relatórios para carga em lote.
+    
+    Returns:
+        Arquivos selecionados quando o botão de carregamento é acionado
+    """
+    report_files = find_report_files()
+    if not report_files:
+        return None
+    
+    with st.expander(f"📂 Relatórios da Pasta ({len(report_files)} arquivos)"):
+        selected = st.multiselect(
+            "Relatórios:",
+            options=report_files,
+            default=report_files,
+            format_func=lambda path: path.name,
+            help="Os arquivos selecionados são analisados em conjunto"
+        )
+        
+        if st.button("📥 Carregar Relatórios", disabled=not selected, use_container_width=True):
+            return selected
+    
+    return None
+
+def render_quality_profiler(processor):
+    """
+    Renderiza a avaliação de qualidade de um relatório sem carregá-lo.
+    
+    Útil para arquivos grandes demais para a memória: o arquivo é lido em
+    blocos e o resultado usa estimativas com erro indicado.
+    
+    Args:
+        processor: Instância do DataProcessor
+    """
+    report_files = find_report_files()
+    if not report_files:
+        return
+    
+    with st.expander("🔎 Avaliar Qualidade sem Carregar"):
+        path = st.selectbox("Relatório:", options=report_files, format_func=lambda path: path.name)
+        
+        if not st.button("🔎 Avaliar", use_container_width=True):
+            return
+        
+        with st.spinner("🔎 Lendo o arquivo em blocos..."):
+            report = processor.profile_data_quality(path)
+        
+        st.metric("Score de Qualidade", f"{report.get('quality_score', 0)}%")
+        for issue in report.get('issues', []):
+            st.warning(issue)
+        
+        profile = report.get('profile')
+        if profile:
+            st.caption(
+                f"{profile['rows']:,} linhas lidas com {profile['memory_bytes'] / 1024**2:.1f} MB de sketches; "
+                f"distintos com erro de ±{profile['distinct_error']:.1%}, duplicatas entre blocos "
+                f"com até {profile['duplicate_error']:.1%} de falsos positivos"
+            )
+            st.dataframe(
+                pd.DataFrame({
+                    'Coluna': list(profile['distinct']),
+                    'Distintos (aprox.)': list(profile['distinct'].values()),
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+
+def render_history_controls(processor) -> Optional[Tuple[date, date]]:
+    """
+    Renderiza as opções do histórico local (gravar e carregar períodos).
+    
+    Args:
+        processor: Instância do DataProcessor
+        
+    Returns:
+        Período (início, fim) a carregar quando o botão é acionado
+    """
+    if not processor.history.enabled:
+        return None
+    
+    days = processor.history.days()
+    
+    with st.expander(f"🗄️ Histórico Local ({len(days)} dias)"):
+        # Com o backend SQL os dados em memória são só uma prévia do próprio histórico
+        if (
+            processor.df is not None and processor.backend is None
+            and st.button("💾 Salvar dados atuais no histórico", use_container_width=True)
+        ):
+            success, message, summary = processor.save_history()
+            if success:
+                st.success(
+                    f"Histórico atualizado: {summary.get('added', 0)} dia(s) novo(s), "
+                    f"{summary.get('changed', 0)} alterado(s), {summary.get('unchanged', 0)} sem mudanças"
+                )
+            else:
+                st.error(f"❌ {message}")
+            days = processor.history.days()
+        
+        if not days:
+            st.info("Nenhum dia gravado no histórico")
+            return None
+        
+        period = st.date_input(
+            "Período do histórico:",
+            value=(max(days[0], days[-1] - timedelta(days=30)), days[-1]),
+            min_value=days[0],
+            max_value=days[-1]
+        )
+        
+        if isinstance(period, tuple) and len(period) == 2:
+            if st.button("📤 Carregar período do histórico", use_container_width=True):
+                return period
+    
+    return None
+
+def render_column_mapping(processor, can_edit: bool = False) -> bool:
+    """
+    Renderiza o mapeamento das colunas do arquivo para os tipos de filtro.
+    
+    Colunas fixadas valem para qualquer arquivo que tenha uma coluna com o
+    mesmo nome, em todas as sessões, e têm prioridade sobre a detecção
+    automática. Sem permissão de edição o mapeamento é apenas exibido.
+    
+    Args:
+        processor: Instância do DataProcessor
+        can_edit: Se o usuário pode alterar os mapeamentos fixados
+        
+    Returns:
+        True se os mapeamentos fixados foram alterados (recarregar os dados)
+    """
+    if not processor.original_columns:
+        return False
+    
+    mapper = processor.column_mapper
+    pins = mapper.pins
+    automatic, ignored = "(automático)", "(ignorar)"
+    column_names = [str(column) for column in processor.original_columns]
+    labels = {
+        'data_entrega': '📅 Data de entrega',
+        'entregador': '👤 Entregador',
+        'cidade': '🏙️ Cidade',
+        'status': '📊 Status',
+        'produto': '📦 Produto',
+        'cliente': '👥 Cliente'
+    }
+    
+    with st.expander(f"🧭 Mapeamento de Colunas ({len(pins)} fixadas)"):
+        selections = {}
+        for column_type, label in labels.items():
+            if column_type in pins:
+                current = ignored if pins[column_type] is None else pins[column_type]
+            else:
+                current = automatic
+            options = [automatic, ignored] + column_names
+            selections[column_type] = st.selectbox(
+                label,
+                options=options,
+                index=options.index(current) if current in options else 0,
+                help=f"Detectada: {processor.detected_columns.get(column_type, '—')}",
+                disabled=not can_edit
+            )
+        
+        if not can_edit:
+            st.info("🔒 Somente administradores podem fixar mapeamentos de colunas")
+            return False
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("📌 Fixar mapeamento", use_container_width=True):
+                mapper.unpin()
+                mapper.pin({
+                    column_type: None if choice == ignored else choice
+                    for column_type, choice in selections.items() if choice != automatic
+                })
+                return True
+        with col2:
+            if st.button("↩️ Detecção automática", disabled=not pins, use_container_width=True):
+                mapper.unpin()
+                return True
+    
+    return False
+
 def render_filters(processor, advanced_mode: bool = False) -> Dict[str, Any]:
     """
     Renderiza filtros dinâmicos baseados nos dados carregados.
@@ -243,6 +471,7 @@ def render_filters(processor, advanced_mode: bool = False) -> Dict[str, Any]:
                 
                 if start_date <= end_date:
                     filters['date_range'] = (start_date, end_date)
+                    filters.pop('date_filter', None)  # O período substitui o dia selecionado
                 else:
                     st.error("Data inicial deve ser anterior à data final!")
             
@@ -251,6 +480,7 @@ def render_filters(processor, advanced_mode: bool = False) -> Dict[str, Any]:
                 end_date = datetime.now().date()
                 start_date = end_date - timedelta(days=days_back)
                 filters['date_range'] = (start_date, end_date)
+                filters.pop('date_filter', None)
             
             # Filtros numéricos se disponíveis
             numeric_columns = df.select_dtypes(include=['number']).columns
@@ -381,8 +611,11 @@ def render_quick_stats(df: pd.DataFrame, processor):
         # Métricas resumidas
         st.markdown("**📋 Resumo:**")
         st.write(f"• **Total de registros:** {stats.get('total_records', 0)}")
-        st.write(f"• **Entregadores únicos:** {stats.get('unique_deliverers', 0)}")
-        st.write(f"• **Cidades únicas:** {stats.get('unique_cities', 0)}")
+        prefix = "≈ " if stats.get('approximate') else ""
+        st.write(f"• **Entregadores únicos:** {prefix}{stats.get('unique_deliverers', 0)}")
+        st.write(f"• **Cidades únicas:** {prefix}{stats.get('unique_cities', 0)}")
+        if stats.get('approximate'):
+            st.caption(f"Únicos estimados (erro padrão de ±{stats['approximate']['distinct_error']:.1%})")
         
         date_range = stats.get('date_range')
         if date_range:
@@ -10,6 +10,7 @@ BASE_DIR = Path(__file__).parent.parent.parent
 UPLOAD_DIR = BASE_DIR / "uploads"
 REPORTS_DIR = BASE_DIR / "Relatórios"
 TEMP_DIR = BASE_DIR / "temp"
+HISTORY_DIR = BASE_DIR / "historico"
 
 # Configurações da aplicação
 APP_CONFIG = {
@@ -43,6 +44,42 @@ CACHE_CONFIG = {
     "ttl": 3600,  # 1 hora
     "max_entries": 100,
     "persist": True,
+    "disk_cache_dir": TEMP_DIR / "cache",
+    "memory_map": True,  # DataFrames carregados como visões sobre os arquivos do cache
+    "result_cache_bytes": 256 * 1024 * 1024,  # resultados de filtros em memória
+    "loaded_datasets": 4,  # arquivos já carregados mantidos em memória
+    "column_mappings_file": TEMP_DIR / "column_mappings.json",  # layouts detectados e colunas fixadas
+    "column_layouts": 256,  # layouts de cabeçalho memorizados
+}
+
+# Configurações de leitura de arquivos
+INGESTION_CONFIG = {
+    "csv_chunk_size": 50_000,  # linhas por bloco
+    "xlsx_chunk_size": 50_000,
+    "project_columns": False,  # carregar apenas colunas reconhecidas
+    "extra_columns": [],  # colunas sempre mantidas na projeção
+    "sniff_bytes": 64 * 1024,  # prefixo usado para detectar encoding/separador
+    "cube_max_cell_ratio": 0.2,  # cubo de agregação só é mantido se compactar as linhas
+    "batch_workers": None,  # processos para carregar lotes de relatórios (None = núcleos)
+    "sql_backend_rows": 2_000_000,  # acima disso, períodos do histórico são consultados em SQL
+    "sql_preview_rows": 10_000,  # linhas carregadas na sessão quando o backend SQL está ativo
+    # Formatos de data tentados na detecção (em ordem de preferência) e amostra usada
+    "date_formats": [
+        "%d/%m/%Y",
+        "%d/%m/%Y %H:%M",
+        "%d/%m/%Y %H:%M:%S",
+        "%d/%m/%y",
+        "%d-%m-%Y",
+        "%d.%m.%Y",
+        "%Y-%m-%d",
+        "%Y-%m-%d %H:%M:%S",
+        "%Y-%m-%dT%H:%M:%S",
+        "%Y/%m/%d",
+    ],
+    "date_sample_size": 1_000,
+    # Unificar categorias que diferem só em acentos ou caixa ("SAO PAULO" / "São Paulo")
+    "fold_categories": False,
+    "quality_chunk_rows": 100_000,  # linhas por bloco na varredura de qualidade
 }
 
 # Colunas obrigatórias e opcionais
@@ -67,12 +104,39 @@ AUTO_FILTERS = {
     "cliente": ["Cliente", "Destinatário", "Receptor"],
 }
 
+# Indicadores usados para classificar o status das entregas
+STATUS_CONFIG = {
+    "delivered_indicators": ["entregue", "entregado", "delivered", "ok", "concluido", "finalizado"],
+    "pending_indicators": ["pendente", "pending", "aguardando", "em rota", "em transito"],
+}
+
+# Verificação de qualidade dos dados
+QUALITY_CONFIG = {
+    "row_fingerprints": True,  # fingerprints das linhas calculados no carregamento
+    # Coluna de pedido usada na verificação aproximada (mesmo pedido, dia e entregador)
+    "order_keywords": ["Pedido", "Order", "Rastreio", "Tracking", "Nota fiscal"],
+    # Perfil de arquivos grandes lidos em blocos (sem carregar o DataFrame)
+    "profile_bloom_rows": 10_000_000,  # linhas previstas no filtro de duplicatas (~12 MB)
+    "profile_bloom_error": 0.01,  # taxa de falsos positivos entre blocos
+    "profile_hll_precision": 12,  # 4 KB por coluna, erro padrão de 1,6% nos distintos
+}
+
+# Estatísticas aproximadas do painel (resumos construídos no carregamento e por dia do histórico)
+STATISTICS_CONFIG = {
+    "approximate": False,  # responder estatísticas sem filtros pelos resumos
+    "hll_precision": 12,  # erro padrão de 1,6% nos entregadores e cidades únicos
+    "top_values": 32,  # status mais frequentes mantidos no resumo
+}
+
 # Configurações de exportação
 EXPORT_CONFIG = {
     "excel": {
         "engine": "openpyxl",
         "index": False,
         "sheet_name": "Relatório",
+        "write_chunk_rows": 10_000,  # linhas convertidas por vez na escrita em streaming
+        "width_sample_rows": 20_000,  # amostra usada para a largura das colunas
+        "max_column_width": 50,
     },
     "csv": {
         "index": False,
@@ -115,7 +179,11 @@ def get_config(section: str = None) -> Dict[str, Any]:
         "streamlit": STREAMLIT_CONFIG,
         "theme": THEME_CONFIG,
         "cache": CACHE_CONFIG,
+        "ingestion": INGESTION_CONFIG,
+        "status": STATUS_CONFIG,
         "export": EXPORT_CONFIG,
+        "quality": QUALITY_CONFIG,
+        "statistics": STATISTICS_CONFIG,
         "logging": LOGGING_CONFIG,
     }
     
@@ -125,7 +193,7 @@ def get_config(section: str = None) -> Dict[str, Any]:
 
 def create_directories():
     """Cria diretórios necessários se não existirem."""
-    directories = [UPLOAD_DIR, REPORTS_DIR, TEMP_DIR, BASE_DIR / "logs"]
+    directories = [UPLOAD_DIR, REPORTS_DIR, TEMP_DIR, HISTORY_DIR, BASE_DIR / "logs"]
     
     for directory in directories:
         directory.mkdir(parents=True, exist_ok=True)
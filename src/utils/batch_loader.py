@@ -0,0 +1,155 @@
+"""
+Carregamento em lote de relatórios, em paralelo por processos.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from ..config.settings import APP_CONFIG, INGESTION_CONFIG, REPORTS_DIR
+from .file_cache import frame_from_buffer, frame_to_buffer
+
+logger = logging.getLogger(__name__)
+
+# Coluna adicionada com o nome do arquivo de origem de cada linha
+SOURCE_COLUMN = "Arquivo"
+
+PathLike = Union[str, Path]
+
+
+def find_report_files(directory: Optional[PathLike] = None) -> List[Path]:
+    """
+    Lista os relatórios suportados de um diretório.
+
+    Args:
+        directory: Diretório dos relatórios (padrão: REPORTS_DIR)
+
+    Returns:
+        Arquivos ordenados por nome
+    """
+    directory = Path(directory or REPORTS_DIR)
+    if not directory.is_dir():
+        return []
+
+    return sorted(
+        path for path in directory.iterdir()
+        if path.is_file()
+        and path.suffix.lower() in APP_CONFIG["supported_formats"]
+        and not path.name.startswith("~$")  # arquivos temporários do Excel
+    )
+
+
+def batch_key(paths: Sequence[PathLike], variant: str = "") -> str:
+    """Chave de um lote a partir do caminho, tamanho e modificação de cada arquivo."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"batch:{variant}".encode())
+    for path in paths:
+        stat = Path(path).stat()
+        digest.update(f"\0{Path(path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def _parse_report(path: str, project_columns: bool, extra_columns: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Lê e pré-processa um relatório (executado no processo de trabalho).
+
+    Returns:
+        Dicionário com o DataFrame serializado (Arrow IPC) e as colunas
+        detectadas, ou com a mensagem de erro
+    """
+    from .data_processor import DataProcessor
+
+    processor = DataProcessor()
+    try:
+        success, message, total_records = processor._parse_file(
+            Path(path).read_bytes(), Path(path).name, project_columns, extra_columns
+        )
+    except Exception as e:
+        success, message = False, str(e)
+
+    if not success:
+        return {'path': path, 'error': message}
+
+    return {
+        'path': path,
+        'buffer': frame_to_buffer(processor.df),
+        'original_columns': [str(c) for c in processor.original_columns],
+        'detected_columns': processor.detected_columns,
+        'total_records': total_records,
+    }
+
+
+def parse_reports(
+    paths: Sequence[PathLike],
+    project_columns: bool = False,
+    extra_columns: Tuple[str, ...] = (),
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Lê e pré-processa vários relatórios, um por processo de trabalho.
+
+    Args:
+        paths: Arquivos a carregar
+        project_columns: Carregar apenas as colunas reconhecidas
+        extra_columns: Colunas adicionais mantidas na projeção
+        max_workers: Número de processos (padrão: INGESTION_CONFIG["batch_workers"]
+            ou o número de núcleos)
+
+    Returns:
+        Resultados de _parse_report, na ordem dos caminhos
+    """
+    paths = [str(path) for path in paths]
+    max_workers = max_workers or INGESTION_CONFIG["batch_workers"] or os.cpu_count() or 1
+    max_workers = min(max_workers, len(paths))
+
+    if max_workers <= 1:
+        return [_parse_report(path, project_columns, extra_columns) for path in paths]
+
+    # spawn: fork dentro do servidor multithread do Streamlit pode travar os processos
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return list(executor.map(
+            _parse_report,
+            paths,
+            [project_columns] * len(paths),
+            [extra_columns] * len(paths),
+        ))
+
+
+def combine_reports(results: List[Dict[str, Any]]) -> Tuple[List[pd.DataFrame], List[str], Dict[str, str]]:
+    """
+    Alinha os relatórios carregados às colunas do primeiro arquivo.
+
+    Colunas detectadas com nomes diferentes entre arquivos (ex.: 'Motorista' e
+    'Entregador') são renomeadas para o nome usado no primeiro arquivo em que
+    o tipo aparece, e cada linha recebe o nome do arquivo de origem.
+
+    Returns:
+        Tupla (DataFrames alinhados, colunas originais, colunas detectadas)
+    """
+    detected: Dict[str, str] = {}
+    for result in results:
+        for filter_type, column in result['detected_columns'].items():
+            detected.setdefault(filter_type, column)
+
+    frames: List[pd.DataFrame] = []
+    columns: List[str] = []
+
+    for result in results:
+        df = frame_from_buffer(result['buffer'])
+        df = df.rename(columns={
+            column: detected[filter_type]
+            for filter_type, column in result['detected_columns'].items()
+            if column != detected[filter_type]
+        })
+        df[SOURCE_COLUMN] = pd.Categorical([Path(result['path']).name] * len(df))
+
+        columns.extend(column for column in df.columns if column not in columns)
+        frames.append(df)
+
+    frames = [df.reindex(columns=columns) for df in frames]
+    return frames, columns, detected
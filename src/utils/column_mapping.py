@@ -0,0 +1,256 @@
+"""
+Detecção de colunas com cache por layout de cabeçalho e mapeamentos fixados.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+from ..config.settings import AUTO_FILTERS, CACHE_CONFIG, REQUIRED_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Tipo atribuído às colunas que correspondem a REQUIRED_COLUMNS
+DATE_TYPE = "data_entrega"
+
+
+class KeywordMatcher:
+    """
+    Busca de palavras-chave em uma única expressão regular compilada.
+
+    Os grupos de palavras-chave são tentados em ordem de prioridade; a busca
+    com lookahead encontra ocorrências sobrepostas numa só passada pelo texto.
+    """
+
+    def __init__(self, groups: Mapping[str, Sequence[str]]):
+        self.names = list(groups)
+        self._priority: Dict[str, int] = {}
+        for index, keywords in enumerate(groups.values()):
+            for keyword in keywords:
+                if keyword:
+                    self._priority.setdefault(keyword.lower(), index)
+
+        alternatives = sorted(self._priority, key=lambda keyword: (self._priority[keyword], -len(keyword)))
+        self._pattern = re.compile(
+            "(?=(" + "|".join(re.escape(keyword) for keyword in alternatives) + "))"
+        ) if alternatives else None
+
+    def matches(self, text: str) -> Set[str]:
+        """Grupos com alguma palavra-chave contida no texto (sem diferenciar caixa)."""
+        if self._pattern is None:
+            return set()
+        return {
+            self.names[self._priority[match.group(1)]]
+            for match in self._pattern.finditer(text.lower())
+        }
+
+    def first(self, text: str) -> Optional[str]:
+        """Grupo de maior prioridade encontrado no texto."""
+        found = self.matches(text)
+        return next((name for name in self.names if name in found), None)
+
+
+class ColumnLayout(NamedTuple):
+    """Resultado da detecção para um cabeçalho."""
+    columns: Dict[str, Any]  # tipo -> coluna
+    missing: List[str]  # colunas obrigatórias ausentes
+
+
+def header_signature(header: Sequence[Any]) -> str:
+    """Identificador estável de um cabeçalho (nomes e ordem das colunas)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for column in header:
+        digest.update(repr(column).encode())
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def keywords_digest(filters: Mapping[str, Sequence[str]], required: Sequence[str]) -> str:
+    """Identificador das palavras-chave da detecção (a ordem define a prioridade)."""
+    encoded = json.dumps([list(filters.items()), list(required)], ensure_ascii=False).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+class ColumnMapper:
+    """
+    Mapeia colunas do arquivo para os tipos de filtro do LogisticSmart.
+
+    Os resultados são memorizados pela assinatura do cabeçalho: exportações
+    com o mesmo layout são resolvidas com uma consulta ao dicionário. O
+    arquivo só é gravado quando os mapeamentos fixados mudam (junto com os
+    layouts memorizados até ali), e não a cada carga. Mapeamentos fixados
+    (tipo -> nome da coluna) valem para todas as sessões e têm prioridade
+    sobre a detecção automática em qualquer layout que contenha a coluna
+    indicada; alterá-los exige a permissão manage_column_mappings. Os
+    layouts gravados sob outras palavras-chave (AUTO_FILTERS,
+    REQUIRED_COLUMNS) são descartados na leitura.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_layouts: Optional[int] = None):
+        self.path = Path(path or CACHE_CONFIG["column_mappings_file"])
+        self.persist = CACHE_CONFIG.get("persist", True)
+        self.max_layouts = max_layouts or CACHE_CONFIG["column_layouts"]
+
+        self._filters = KeywordMatcher(AUTO_FILTERS)
+        self._required = KeywordMatcher({column: [column] for column in REQUIRED_COLUMNS})
+        self.keywords_digest = keywords_digest(AUTO_FILTERS, REQUIRED_COLUMNS)
+        self._layouts: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._pins: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def pins(self) -> Dict[str, Optional[str]]:
+        """Mapeamentos fixados (tipo -> coluna; None ignora o tipo)."""
+        return dict(self._pins)
+
+    def pins_digest(self) -> str:
+        """Resumo dos mapeamentos fixados (vazio se não houver nenhum)."""
+        if not self._pins:
+            return ""
+        encoded = json.dumps(self._pins, sort_keys=True, ensure_ascii=False).encode()
+        return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+    def resolve(self, header: Sequence[Any]) -> ColumnLayout:
+        """
+        Detecta os tipos das colunas de um cabeçalho.
+
+        Args:
+            header: Nomes das colunas, na ordem do arquivo
+
+        Returns:
+            ColumnLayout com o mapeamento tipo -> coluna e as colunas
+            obrigatórias ausentes
+        """
+        header = list(header)
+        signature = header_signature(header)
+
+        with self._lock:
+            entry = self._layouts.get(signature)
+            if entry is not None:
+                self._layouts.move_to_end(signature)
+
+        if entry is None:
+            entry = self._detect(header)
+            with self._lock:
+                self._layouts[signature] = entry
+                while len(self._layouts) > self.max_layouts:
+                    self._layouts.popitem(last=False)
+
+        # Posições (e não nomes) no cache: colunas podem não ser texto
+        columns = {column_type: header[position] for column_type, position in entry["columns"].items()}
+        missing = list(entry["missing"])
+        pins = dict(self._pins)
+        if pins:
+            columns, missing = _apply_pins(pins, header, columns, missing)
+
+        return ColumnLayout(columns, missing)
+
+    def _detect(self, header: List[Any]) -> Dict[str, Any]:
+        columns: Dict[str, int] = {}
+        found: Set[str] = set()
+
+        for position, column in enumerate(header):
+            text = str(column)
+
+            filter_type = self._filters.first(text)
+            if filter_type is not None:
+                columns[filter_type] = position
+
+            required = self._required.matches(text)
+            if required:
+                columns[DATE_TYPE] = position
+                found |= required
+
+        return {
+            "columns": columns,
+            "missing": [column for column in REQUIRED_COLUMNS if column not in found],
+        }
+
+    def pin(self, mapping: Mapping[str, Optional[str]]):
+        """
+        Fixa mapeamentos tipo -> nome da coluna.
+
+        Args:
+            mapping: Ex.: {'entregador': 'Motorista Parceiro', 'cliente': None}
+        """
+        with self._lock:
+            self._pins.update(mapping)
+        self._save()
+
+    def unpin(self, column_types: Optional[Sequence[str]] = None):
+        """Remove mapeamentos fixados (todos se column_types for None)."""
+        with self._lock:
+            if column_types is None:
+                self._pins.clear()
+            for column_type in column_types or []:
+                self._pins.pop(column_type, None)
+        self._save()
+
+    def clear(self):
+        """Esquece os layouts memorizados (mantém os mapeamentos fixados)."""
+        with self._lock:
+            self._layouts.clear()
+        self._save()
+
+    def _load(self):
+        if not self.persist or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("keywords") == self.keywords_digest:
+                self._layouts.update(data.get("layouts", {}))
+            else:
+                logger.info("Palavras-chave da detecção alteradas: layouts memorizados descartados")
+            self._pins.update(data.get("pins", {}))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Não foi possível ler mapeamentos de colunas: {e}")
+
+    def _save(self):
+        if not self.persist:
+            return
+
+        with self._lock:
+            data = {"keywords": self.keywords_digest, "layouts": dict(self._layouts), "pins": dict(self._pins)}
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar mapeamentos de colunas: {e}")
+
+
+def _apply_pins(
+    pins: Dict[str, Optional[str]], header: List[Any], columns: Dict[str, Any], missing: List[str]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Sobrepõe os mapeamentos fixados ao resultado da detecção."""
+    names = {str(column): column for column in header}
+
+    for column_type, name in pins.items():
+        if name is None:
+            columns.pop(column_type, None)
+        elif name in names:
+            column = names[name]
+            if column_type != DATE_TYPE:
+                # Uma coluna atende a um único tipo de filtro
+                for other in [t for t, c in columns.items() if c == column and t != DATE_TYPE]:
+                    del columns[other]
+            columns[column_type] = column
+
+    if pins.get(DATE_TYPE) in names:
+        missing = []
+    return columns, missing
+
+
+# Compartilhado entre sessões: as exportações costumam repetir o mesmo cabeçalho
+COLUMN_MAPPER = ColumnMapper()
@@ -4,15 +4,41 @@ Utilitários para processamento e validação de dados.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
-import streamlit as st
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union, Any
 import logging
+import weakref
+from collections import OrderedDict
 from pathlib import Path
 
-from ..config.settings import REQUIRED_COLUMNS, AUTO_FILTERS
+from ..config.settings import AUTO_FILTERS, APP_CONFIG, INGESTION_CONFIG, QUALITY_CONFIG, STATISTICS_CONFIG
+from .batch_loader import batch_key, combine_reports, find_report_files, parse_reports
+from .column_mapping import COLUMN_MAPPER, ColumnMapper, KeywordMatcher
+from .dataset import LOAD_CACHE, LoadedDataset
+from .date_parsing import DATE_PARSER
+from .file_cache import DiskCache, content_digest, make_cache_key
+from .history_store import HistoryStore
+from .sql_backend import SQLBackend, open_backend
+from .file_readers import sniff_csv_format, read_csv_columns, iter_csv_chunks
+from .xlsx_reader import iter_xlsx_chunks, mixed_values, unify_chunk_dtypes
+from .indexes import AggregationCube, DateIndex, FilterIndex, RowFingerprints, StatusIndex, day_values, to_day
+from .quality import QualityProfile, QualityScan, scan_quality
+from .query import FilterQuery
+from .result_cache import ResultCache, frame_fingerprint
+from .sketches import StatisticsSketch, new_statistics_sketch
+from .status import STATUS_MODES, StatusClassifier, status_mask
+from .text_normalization import clean_values, merge_labels, normalize_strings
 
 logger = logging.getLogger(__name__)
 
+# Dimensões do cubo de agregação (além do dia)
+CUBE_DIMENSIONS = ['entregador', 'cidade', 'status', 'produto']
+
+# Recortes recentes cuja seleção é lembrada para consultas ao cubo
+MAX_TRACKED_VIEWS = 8
+
+# Coluna de pedido das verificações aproximadas de duplicatas
+_ORDER_MATCHER = KeywordMatcher({'pedido': QUALITY_CONFIG['order_keywords']})
+
 class DataProcessor:
     """Processador principal de dados do LogisticSmart."""
     
@@ -20,15 +46,48 @@ class DataProcessor:
         self.df: Optional[pd.DataFrame] = None
         self.original_columns: List[str] = []
         self.detected_columns: Dict[str, str] = {}
+        self.disk_cache = DiskCache()
+        self.filter_index: Optional[FilterIndex] = None
+        self.date_index: Optional[DateIndex] = None
+        self.status_classifier = StatusClassifier()
+        self.date_parser = DATE_PARSER
+        self.column_mapper = COLUMN_MAPPER
+        self.status_index: Optional[StatusIndex] = None
+        self.cube: Optional[AggregationCube] = None
+        self.row_fingerprints: Optional[RowFingerprints] = None
+        self.statistics_sketch: Optional[StatisticsSketch] = None
+        self._views: 'OrderedDict[int, Tuple[Any, int, FilterQuery]]' = OrderedDict()
+        self.result_cache = ResultCache()
+        self._fingerprint: Optional[Tuple[Any, str]] = None
+        self.load_cache = LOAD_CACHE
+        self.dataset: Optional[LoadedDataset] = None
+        self.history = HistoryStore()
+        self.backend: Optional[SQLBackend] = None
+        self._release: Optional[weakref.finalize] = None
     
-    @st.cache_data(ttl=3600, show_spinner=False)
-    def load_file(_self, file_content: bytes, filename: str) -> Tuple[bool, str, Optional[pd.DataFrame]]:
+    def load_file(
+        self,
+        file_content: Union[bytes, BinaryIO],
+        filename: str,
+        project_columns: Optional[bool] = None,
+        extra_columns: Optional[Tuple[str, ...]] = None,
+        digest: Optional[str] = None,
+    ) -> Tuple[bool, str, Optional[pd.DataFrame]]:
         """
         Carrega arquivo Excel ou CSV.
         
+        O resultado é reaproveitado pelo digest do conteúdo: primeiro do cache
+        em memória (dataset com índices prontos), depois do cache em disco; o
+        arquivo só é lido e processado quando não há resultado anterior.
+        
         Args:
-            file_content: Conteúdo do arquivo
+            file_content: Conteúdo do arquivo ou objeto de arquivo (ex.: upload do Streamlit)
             filename: Nome do arquivo
+            project_columns: Carregar apenas as colunas reconhecidas pela detecção
+                (padrão: INGESTION_CONFIG["project_columns"])
+            extra_columns: Colunas adicionais mantidas na projeção
+                (padrão: INGESTION_CONFIG["extra_columns"])
+            digest: Digest do conteúdo já calculado por content_digest
             
         Returns:
             Tupla (sucesso, mensagem, dataframe)
@@ -36,40 +95,568 @@ class DataProcessor:
         try:
             file_extension = Path(filename).suffix.lower()
             
-            if file_extension in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_content, engine='openpyxl')
-            elif file_extension == '.csv':
-                # Tentar diferentes encodings e separadores
-                try:
-                    df = pd.read_csv(file_content, encoding='utf-8', sep=';')
-                except:
-                    try:
-                        df = pd.read_csv(file_content, encoding='latin-1', sep=';')
-                    except:
-                        df = pd.read_csv(file_content, encoding='utf-8', sep=',')
-            else:
+            if file_extension not in APP_CONFIG['supported_formats']:
                 return False, f"Formato de arquivo não suportado: {file_extension}", None
             
-            if df.empty:
-                return False, "Arquivo está vazio", None
+            if project_columns is None:
+                project_columns = INGESTION_CONFIG['project_columns']
+            if extra_columns is None:
+                extra_columns = tuple(INGESTION_CONFIG['extra_columns'])
             
-            # Validar e processar
-            success, message = _self._validate_dataframe(df)
-            if not success:
-                return False, message, None
+            variant = _load_variant(project_columns, extra_columns, self.column_mapper)
+            cache_key = make_cache_key(None, filename, variant, digest=digest or content_digest(file_content))
             
-            # Detectar colunas automaticamente
-            _self.original_columns = df.columns.tolist()
-            _self.detected_columns = _self._detect_columns(df)
-            _self.df = _self._preprocess_dataframe(df)
+            # Mesmo arquivo já ativo (ex.: novo rerun do Streamlit)
+            if self.dataset is not None and self.dataset.fingerprint == cache_key and self.df is self.dataset.df:
+                return True, f"✅ Arquivo carregado: {self.dataset.total_records} registros", self.df
             
-            logger.info(f"Arquivo carregado com sucesso: {filename}, {len(df)} linhas")
-            return True, f"✅ Arquivo carregado: {len(df)} registros", _self.df
+            # Sessões com o mesmo arquivo compartilham um único dataset
+            dataset, message = self.load_cache.get_or_load(
+                cache_key,
+                lambda: self._scratch()._load_dataset(file_content, filename, cache_key, project_columns, extra_columns)
+            )
+            if dataset is None:
+                return False, message, None
+            
+            self.use_dataset(dataset)
+            return True, f"✅ Arquivo carregado: {dataset.total_records} registros", self.df
             
         except Exception as e:
             logger.error(f"Erro ao carregar arquivo {filename}: {e}")
             return False, f"Erro ao carregar arquivo: {str(e)}", None
     
+    def _load_dataset(
+        self,
+        file_content: Union[bytes, BinaryIO],
+        filename: str,
+        cache_key: str,
+        project_columns: bool,
+        extra_columns: Tuple[str, ...],
+    ) -> Tuple[Optional[LoadedDataset], str]:
+        """Lê o arquivo (ou o cache em disco) e constrói o dataset com seus índices."""
+        total_records = self._restore_cached(cache_key)
+        if total_records is not None:
+            logger.info(f"Arquivo carregado do cache: {filename}, {len(self.df)} linhas")
+        else:
+            if not isinstance(file_content, bytes):
+                file_content = file_content.getvalue()
+            
+            success, message, total_records = self._parse_file(
+                file_content, filename, project_columns, extra_columns
+            )
+            if not success:
+                return None, message
+            
+            self._persist_mapped(cache_key, total_records)
+            logger.info(f"Arquivo carregado com sucesso: {filename}, {total_records} linhas")
+        
+        self._build_indexes(fingerprint=cache_key)
+        return self._snapshot(cache_key, total_records), "Dataset carregado"
+    
+    def load_reports(
+        self,
+        paths: Optional[List[Union[str, Path]]] = None,
+        project_columns: Optional[bool] = None,
+        extra_columns: Optional[Tuple[str, ...]] = None,
+        max_workers: Optional[int] = None,
+    ) -> Tuple[bool, str, Optional[pd.DataFrame]]:
+        """
+        Carrega vários relatórios (ex.: um mês de exportações) como um único dataset.
+        
+        Cada arquivo é lido e pré-processado em um processo separado e volta
+        ao processo principal como buffer Arrow; as colunas detectadas são
+        alinhadas às do primeiro arquivo e cada linha guarda o arquivo de origem.
+        
+        Args:
+            paths: Arquivos a carregar (padrão: todos os relatórios de REPORTS_DIR)
+            project_columns: Carregar apenas as colunas reconhecidas pela detecção
+            extra_columns: Colunas adicionais mantidas na projeção
+            max_workers: Número de processos
+            
+        Returns:
+            Tupla (sucesso, mensagem, dataframe)
+        """
+        try:
+            paths = list(paths) if paths is not None else find_report_files()
+            if not paths:
+                return False, "Nenhum relatório encontrado", None
+            
+            if project_columns is None:
+                project_columns = INGESTION_CONFIG['project_columns']
+            if extra_columns is None:
+                extra_columns = tuple(INGESTION_CONFIG['extra_columns'])
+            
+            variant = _load_variant(project_columns, extra_columns, self.column_mapper)
+            cache_key = batch_key(paths, variant)
+            
+            skipped = 0
+            
+            def load() -> Tuple[Optional[LoadedDataset], str]:
+                nonlocal skipped
+                builder = self._scratch()
+                total_records = builder._restore_cached(cache_key)
+                if total_records is not None:
+                    builder._build_indexes(fingerprint=cache_key)
+                    return builder._snapshot(cache_key, total_records), "Relatórios carregados do cache"
+                
+                results = parse_reports(paths, project_columns, tuple(extra_columns), max_workers)
+                loaded = [result for result in results if 'error' not in result]
+                
+                for result in results:
+                    if 'error' in result:
+                        logger.warning(f"Relatório ignorado {result['path']}: {result['error']}")
+                skipped = len(results) - len(loaded)
+                
+                if not loaded:
+                    return None, f"Nenhum relatório válido: {results[0]['error']}"
+                
+                frames, builder.original_columns, builder.detected_columns = combine_reports(loaded)
+                builder.df = _concat_chunks(frames).reset_index(drop=True)
+                total_records = sum(result['total_records'] for result in loaded)
+                
+                builder._persist_mapped(cache_key, total_records)
+                builder._build_indexes(fingerprint=cache_key)
+                logger.info(f"{len(loaded)} relatórios carregados: {total_records} linhas")
+                return builder._snapshot(cache_key, total_records), "Relatórios carregados"
+            
+            dataset, message = self.load_cache.get_or_load(cache_key, load)
+            if dataset is None:
+                return False, message, None
+            
+            self.use_dataset(dataset)
+            
+            message = f"✅ Relatórios carregados: {dataset.total_records} registros"
+            if skipped:
+                message += f" ({skipped} arquivo(s) ignorado(s))"
+            return True, message, self.df
+            
+        except Exception as e:
+            logger.error(f"Erro ao carregar relatórios: {e}")
+            return False, f"Erro ao carregar relatórios: {str(e)}", None
+    
+    def save_history(self) -> Tuple[bool, str, Dict[str, int]]:
+        """
+        Grava os dados carregados no histórico local.
+        
+        Com o backend SQL ativo, self.df é só uma prévia do período: gravá-la
+        substituiria as partições dos dias com um subconjunto das linhas, por
+        isso a gravação é recusada.
+        
+        Returns:
+            Tupla (sucesso, mensagem, resumo com dias novos, alterados e
+            inalterados e linhas gravadas)
+        """
+        if self.backend is not None:
+            return False, "Dados carregados do histórico via SQL: apenas uma prévia está em memória", {}
+        
+        date_col = self.detected_columns.get('data_entrega')
+        if self.df is None or not date_col or date_col not in self.df.columns:
+            return False, "Nenhum dado com data de entrega carregado", {}
+        
+        # Chaves do histórico são os mesmos fingerprints calculados no carregamento
+        keys = None
+        if self.row_fingerprints is not None and self.row_fingerprints.is_current(self.df):
+            keys = self.row_fingerprints.rows
+        
+        try:
+            summary = self.history.ingest(self.df, date_col, {
+                'original_columns': [str(c) for c in self.original_columns],
+                'detected_columns': self.detected_columns,
+            }, keys=keys)
+        except ValueError as e:
+            logger.warning(f"Histórico não atualizado: {e}")
+            return False, str(e), {}
+        return True, f"{summary.get('rows_written', 0):,} linhas gravadas no histórico", summary
+    
+    def load_history(
+        self,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+    ) -> Tuple[bool, str, Optional[pd.DataFrame]]:
+        """
+        Carrega um período do histórico local, lendo apenas as partições dos dias pedidos.
+        
+        Acima de INGESTION_CONFIG["sql_backend_rows"] linhas o período não é
+        carregado: as consultas passam a ser executadas pelo backend SQL.
+        
+        Args:
+            start: Primeiro dia (None = desde o início)
+            end: Último dia (None = até o fim)
+            
+        Returns:
+            Tupla (sucesso, mensagem, dataframe)
+        """
+        try:
+            if not self.history.enabled:
+                return False, "Histórico indisponível: instale o pyarrow", None
+            
+            day_bounds = self._history_bounds(start, end)
+            total_records = self.history.row_count(*day_bounds) if day_bounds else 0
+            if total_records == 0:
+                return False, "Nenhum registro no histórico para o período", None
+            
+            # Períodos grandes ficam no disco e são consultados em SQL
+            if total_records > INGESTION_CONFIG["sql_backend_rows"]:
+                return self._open_history_backend(day_bounds, total_records)
+            
+            start, end = day_bounds
+            cache_key = self.history.fingerprint(start, end)
+            
+            def load() -> Tuple[Optional[LoadedDataset], str]:
+                builder = self._scratch()
+                total_records = builder._restore_cached(cache_key)
+                if total_records is None:
+                    df = self.history.read(start, end)
+                    if df is None:
+                        return None, "Nenhum registro no histórico para o período"
+                    
+                    metadata = self.history.metadata()
+                    builder.df = df
+                    builder.original_columns = [c for c in metadata.get('original_columns', []) if c in df.columns]
+                    builder.detected_columns = {
+                        filter_type: column
+                        for filter_type, column in metadata.get('detected_columns', {}).items()
+                        if column in df.columns
+                    }
+                    total_records = len(df)
+                    builder._persist_mapped(cache_key, total_records)
+                
+                builder._build_indexes(fingerprint=cache_key)
+                return builder._snapshot(cache_key, total_records), "Histórico carregado"
+            
+            dataset, message = self.load_cache.get_or_load(cache_key, load)
+            if dataset is None:
+                return False, message, None
+            
+            self.use_dataset(dataset)
+            return True, f"✅ Histórico carregado: {dataset.total_records} registros", self.df
+            
+        except Exception as e:
+            logger.error(f"Erro ao carregar histórico: {e}")
+            return False, f"Erro ao carregar histórico: {str(e)}", None
+    
+    def _history_bounds(
+        self,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+    ) -> Optional[Tuple[np.datetime64, np.datetime64]]:
+        """Período do histórico a carregar, limitado aos dias gravados (None se vazio)."""
+        days = self.history.days()
+        if not days:
+            return None
+        
+        lower = to_day(start if start is not None else days[0])
+        upper = to_day(end if end is not None else days[-1])
+        return (lower, upper) if lower <= upper else None
+    
+    def _open_history_backend(
+        self,
+        day_bounds: Tuple[np.datetime64, np.datetime64],
+        total_records: int,
+    ) -> Tuple[bool, str, Optional[pd.DataFrame]]:
+        """
+        Ativa o backend SQL para um período do histórico.
+        
+        Apenas uma prévia das linhas é carregada na sessão (colunas, tipos e
+        filtros numéricos); contagens, agrupamentos e estatísticas das
+        consultas são executados pelo backend.
+        """
+        metadata = self.history.metadata()
+        detected_columns = metadata.get('detected_columns', {})
+        date_col = detected_columns.get('data_entrega')
+        if not date_col:
+            return False, "Histórico sem coluna de data detectada", None
+        
+        backend = open_backend(self.history, date_col, detected_columns, day_bounds, self.status_classifier)
+        if backend is None:
+            return False, "Nenhum registro no histórico para o período", None
+        
+        try:
+            preview = backend.fetch(limit=INGESTION_CONFIG["sql_preview_rows"])
+            builder = self._scratch()
+            builder.df = preview
+            builder.original_columns = [c for c in metadata.get('original_columns', []) if c in preview.columns]
+            builder.detected_columns = {
+                filter_type: column
+                for filter_type, column in detected_columns.items()
+                if column in preview.columns
+            }
+            
+            fingerprint = f"{backend.engine}:{self.history.fingerprint(*day_bounds)}"
+            builder._build_indexes(fingerprint=fingerprint)
+            if STATISTICS_CONFIG['approximate']:
+                # Resumo do período inteiro (e não da prévia), combinando os resumos diários
+                builder.statistics_sketch = self.history.sketch(*day_bounds)
+            dataset = builder._snapshot(fingerprint, total_records)
+        except Exception:
+            backend.close()
+            raise
+        
+        self.use_dataset(dataset)
+        self.backend = backend
+        
+        logger.info(f"Histórico com {total_records} registros consultado via {backend.engine}")
+        return True, (
+            f"✅ Histórico com {total_records} registros consultado via {backend.engine.upper()} "
+            f"(prévia de {len(preview)} linhas na sessão)"
+        ), self.df
+    
+    def _restore_cached(self, cache_key: str) -> Optional[int]:
+        """
+        Restaura dados e colunas do cache em disco (mapeado em memória).
+        
+        Returns:
+            Total de registros lidos originalmente ou None se não houver entrada
+        """
+        cached = self.disk_cache.get(cache_key)
+        if cached is None:
+            return None
+        
+        self.df, metadata = cached
+        self.original_columns = metadata['original_columns']
+        self.detected_columns = metadata['detected_columns']
+        return metadata['total_records']
+    
+    def _persist_mapped(self, cache_key: str, total_records: int):
+        """
+        Grava o DataFrame processado no cache em disco e passa a usá-lo mapeado.
+        
+        A cópia no heap é substituída por visões sobre o arquivo Arrow; se a
+        gravação falhar, o DataFrame em memória continua sendo usado.
+        """
+        stored = self.disk_cache.put(cache_key, self.df, {
+            'original_columns': [str(c) for c in self.original_columns],
+            'detected_columns': self.detected_columns,
+            'total_records': total_records,
+        })
+        if stored:
+            mapped = self.disk_cache.get(cache_key)
+            if mapped is not None:
+                self.df = mapped[0]
+    
+    def _snapshot(self, fingerprint: str, total_records: int) -> LoadedDataset:
+        """Congela o estado atual (dados, colunas e índices) em um LoadedDataset."""
+        return LoadedDataset(
+            self.df, self.original_columns, self.detected_columns, fingerprint, total_records,
+            filter_index=self.filter_index,
+            date_index=self.date_index,
+            status_index=self.status_index,
+            cube=self.cube,
+            row_fingerprints=self.row_fingerprints,
+            statistics_sketch=self.statistics_sketch,
+        )
+    
+    def _parse_file(
+        self,
+        file_content: bytes,
+        filename: str,
+        project_columns: bool,
+        extra_columns: Tuple[str, ...],
+    ) -> Tuple[bool, str, int]:
+        """Lê e pré-processa um arquivo, definindo df e as colunas detectadas."""
+        projection = None
+        if project_columns:
+            projection = lambda header: self._project_columns(header, extra_columns)
+        
+        chunks = self._iter_file_chunks(file_content, filename, projection)
+        
+        # Validar, detectar colunas e processar bloco a bloco
+        return self._ingest_chunks(chunks)
+    
+    def _iter_file_chunks(
+        self,
+        source: Union[bytes, str, Path],
+        filename: str,
+        projection: Optional[Callable[[List[Any]], List[Any]]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Blocos brutos de um CSV ou XLSX (conteúdo em memória ou caminho)."""
+        if Path(filename).suffix.lower() == '.csv':
+            return self._iter_csv_chunks(source, projection)
+        return iter_xlsx_chunks(source, columns=projection)
+    
+    def _scratch(self) -> 'DataProcessor':
+        """
+        Processador auxiliar para construir um dataset sem alterar esta sessão.
+        
+        Compartilha caches, histórico e configuração de detecção; dados,
+        colunas e índices só passam para a sessão em use_dataset, depois que
+        o carregamento inteiro deu certo.
+        """
+        builder = DataProcessor()
+        builder.disk_cache = self.disk_cache
+        builder.column_mapper = self.column_mapper
+        builder.date_parser = self.date_parser
+        builder.status_classifier = self.status_classifier
+        builder.history = self.history
+        builder.load_cache = self.load_cache
+        return builder
+    
+    def use_dataset(self, dataset: LoadedDataset):
+        """
+        Ativa um dataset já carregado, restaurando dados, colunas e índices.
+        
+        A sessão passa a referenciar o dataset no registro compartilhado e
+        libera o anterior (também liberado quando o processador é descartado).
+        """
+        if self._release is not None:
+            self._release()
+        self.load_cache.acquire(dataset.fingerprint)
+        self._release = weakref.finalize(self, self.load_cache.release, dataset.fingerprint)
+        
+        if self.backend is not None:
+            self.backend.close()
+        self.backend = None
+        self.dataset = dataset
+        self.df = dataset.df
+        self.original_columns = list(dataset.original_columns)
+        self.detected_columns = dict(dataset.detected_columns)
+        self.filter_index = dataset.filter_index
+        self.date_index = dataset.date_index
+        self.status_index = dataset.status_index
+        self.cube = dataset.cube
+        self.row_fingerprints = dataset.row_fingerprints
+        self.statistics_sketch = dataset.statistics_sketch
+        self._fingerprint = (weakref.ref(dataset.df), dataset.fingerprint)
+        self._views.clear()
+    
+    def _iter_csv_chunks(
+        self,
+        file_content: Union[bytes, str, Path],
+        projection: Optional[Callable[[List[Any]], List[Any]]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Lê o CSV em blocos, detectando encoding e separador uma única vez."""
+        encoding, separator = sniff_csv_format(file_content)
+        columns = read_csv_columns(file_content, encoding, separator)
+        usecols = projection(columns) if projection else None
+        
+        # Colunas reconhecidas são lidas como texto para evitar inferência por bloco
+        detected = self._detect_columns(pd.DataFrame(columns=columns))
+        dtype = {column: str for column in detected.values()}
+        
+        logger.debug(f"CSV detectado: encoding={encoding}, separador={separator!r}")
+        return iter_csv_chunks(file_content, encoding, separator, dtype=dtype, usecols=usecols)
+    
+    def _project_columns(self, header: List[Any], extra_columns: Tuple[str, ...] = ()) -> List[Any]:
+        """
+        Seleciona, a partir do cabeçalho, as colunas que serão carregadas.
+        
+        Args:
+            header: Nomes das colunas do arquivo
+            extra_columns: Colunas adicionais pedidas pelo usuário
+            
+        Returns:
+            Colunas detectadas e adicionais, na ordem do arquivo
+        """
+        detected = set(self._detect_columns(pd.DataFrame(columns=header)).values())
+        extra = {str(column).strip().lower() for column in extra_columns}
+        
+        return [
+            column for column in header
+            if column in detected or str(column).strip().lower() in extra
+        ]
+    
+    def _ingest_chunks(self, chunks: Iterator[pd.DataFrame]) -> Tuple[bool, str, int]:
+        """
+        Valida, detecta colunas e pré-processa os dados bloco a bloco.
+        
+        Validação e detecção usam apenas o primeiro bloco; cada bloco bruto é
+        descartado logo após o pré-processamento.
+        
+        Args:
+            chunks: Iterador de DataFrames brutos
+            
+        Returns:
+            Tupla (sucesso, mensagem, total de registros lidos)
+        """
+        first_chunk = next(chunks, None)
+        if first_chunk is None or first_chunk.empty:
+            return False, "Arquivo está vazio", 0
+        
+        success, message = self._validate_dataframe(first_chunk)
+        if not success:
+            return False, message, 0
+        
+        # Detectar colunas automaticamente
+        self.original_columns = first_chunk.columns.tolist()
+        self.detected_columns = self._detect_columns(first_chunk)
+        
+        total_records = len(first_chunk)
+        processed = [self._preprocess_dataframe(first_chunk, copy=False)]
+        del first_chunk
+        
+        for chunk in chunks:
+            total_records += len(chunk)
+            processed.append(self._preprocess_dataframe(chunk, copy=False))
+        
+        self.df = _concat_chunks(processed)
+        return True, "Dados processados", total_records
+    
+    def _build_indexes(self, fingerprint: Optional[str] = None):
+        """
+        Constrói os índices de filtro para o DataFrame carregado.
+        
+        Args:
+            fingerprint: Identificador do conteúdo (padrão: hash do DataFrame)
+        """
+        self._fingerprint = (weakref.ref(self.df), fingerprint or frame_fingerprint(self.df))
+        
+        filter_columns = [
+            col for filter_type, col in self.detected_columns.items()
+            if filter_type in AUTO_FILTERS
+        ]
+        self.filter_index = FilterIndex(self.df, filter_columns)
+        
+        date_col = self.detected_columns.get('data_entrega')
+        if date_col in self.df.columns and pd.api.types.is_datetime64_any_dtype(self.df[date_col]):
+            self.date_index = DateIndex(self.df, date_col)
+        else:
+            self.date_index = None
+        
+        status_col = self.detected_columns.get('status')
+        if status_col in self.df.columns:
+            self.status_index = StatusIndex(self.df, status_col, self.status_classifier)
+        else:
+            self.status_index = None
+        
+        cube_columns = [
+            self.detected_columns[dimension] for dimension in CUBE_DIMENSIONS
+            if self.detected_columns.get(dimension) in self.df.columns
+        ]
+        cube_date_col = date_col if self.date_index is not None else None
+        if cube_columns or cube_date_col:
+            cube = AggregationCube(
+                self.df, cube_date_col, cube_columns, status_col, self.status_classifier
+            )
+            logger.debug(f"Cubo de agregação: {len(cube)} células para {len(self.df)} linhas")
+            
+            # Cubo quase do tamanho dos dados não compensa: consultas seguem pelas linhas
+            max_cells = INGESTION_CONFIG['cube_max_cell_ratio'] * len(self.df)
+            self.cube = cube if len(cube) <= max(max_cells, 1) else None
+        else:
+            self.cube = None
+        
+        if QUALITY_CONFIG['row_fingerprints']:
+            self.row_fingerprints = RowFingerprints(self.df, self._near_duplicate_keys(), date_col)
+        else:
+            self.row_fingerprints = None
+        
+        if STATISTICS_CONFIG['approximate']:
+            self.statistics_sketch = new_statistics_sketch(self.detected_columns)
+            self.statistics_sketch.update(self.df)
+        else:
+            self.statistics_sketch = None
+        
+        self._views.clear()
+    
+    def _near_duplicate_keys(self) -> List[str]:
+        """Colunas da verificação aproximada: pedido, dia e entregador (vazio sem pedido)."""
+        order_col = next((col for col in self.df.columns if _ORDER_MATCHER.first(str(col))), None)
+        if order_col is None:
+            return []
+        
+        keys = [order_col, self.detected_columns.get('data_entrega'), self.detected_columns.get('entregador')]
+        return [col for col in keys if col in self.df.columns]
+    
     def _validate_dataframe(self, df: pd.DataFrame) -> Tuple[bool, str]:
         """Valida estrutura básica do DataFrame."""
         if df.empty:
@@ -79,11 +666,8 @@ class DataProcessor:
         if df.dropna(how='all').empty:
             return False, "Arquivo não contém dados válidos"
         
-        # Verificar colunas obrigatórias
-        missing_required = []
-        for col in REQUIRED_COLUMNS:
-            if not any(col.lower() in str(c).lower() for c in df.columns):
-                missing_required.append(col)
+        # Verificar colunas obrigatórias (mesma consulta usada pela detecção)
+        missing_required = self.column_mapper.resolve(df.columns).missing
         
         if missing_required:
             return False, f"Colunas obrigatórias não encontradas: {', '.join(missing_required)}"
@@ -91,49 +675,48 @@ class DataProcessor:
         return True, "DataFrame válido"
     
     def _detect_columns(self, df: pd.DataFrame) -> Dict[str, str]:
-        """Detecta automaticamente o tipo de cada coluna."""
-        detected = {}
-        
-        for col in df.columns:
-            col_lower = str(col).lower()
-            
-            # Verificar cada tipo de filtro automático
-            for filter_type, keywords in AUTO_FILTERS.items():
-                for keyword in keywords:
-                    if keyword.lower() in col_lower:
-                        detected[filter_type] = col
-                        break
-                if filter_type in detected:
-                    break
-            
-            # Detectar coluna de data obrigatória
-            for required_col in REQUIRED_COLUMNS:
-                if required_col.lower() in col_lower:
-                    detected['data_entrega'] = col
-                    break
+        """
+        Detecta automaticamente o tipo de cada coluna.
         
-        return detected
+        O resultado é memorizado pela assinatura do cabeçalho, e mapeamentos
+        fixados pelo usuário têm prioridade (ver ColumnMapper).
+        """
+        return self.column_mapper.resolve(df.columns).columns
     
-    def _preprocess_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Pré-processa o DataFrame para padronizar dados."""
-        df_processed = df.copy()
+    def _preprocess_dataframe(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        """
+        Pré-processa o DataFrame para padronizar dados.
+        
+        Args:
+            df: DataFrame bruto
+            copy: Copiar antes de alterar (False quando o bloco bruto é descartado em seguida)
+        """
+        df_processed = df.copy() if copy else df
         
         # Processar coluna de data
         date_col = self.detected_columns.get('data_entrega')
         if date_col and date_col in df_processed.columns:
-            df_processed[date_col] = pd.to_datetime(
-                df_processed[date_col], 
-                errors='coerce',
-                infer_datetime_format=True
-            )
+            df_processed[date_col] = self.date_parser.parse(df_processed[date_col], date_col)
             
-            # Remover linhas com datas inválidas
+            # Remover linhas com datas inválidas (cópia própria: a fatia ainda referencia o bloco bruto)
+            valid_rows = len(df_processed)
             df_processed = df_processed.dropna(subset=[date_col])
+            if len(df_processed) != valid_rows:
+                df_processed = df_processed.copy()
+        
+        # Colunas de baixa cardinalidade como category (filtros e agrupamentos sobre códigos)
+        categorical_columns = [
+            col for filter_type, col in self.detected_columns.items()
+            if filter_type in AUTO_FILTERS
+            and col in df_processed.columns and df_processed[col].dtype == object
+        ]
+        fold = INGESTION_CONFIG['fold_categories']
+        for col in categorical_columns:
+            df_processed[col] = _to_normalized_category(df_processed[col], fold)
         
-        # Limpar strings
+        # Limpar strings (nulos viram texto vazio)
         for col in df_processed.select_dtypes(include=['object']).columns:
-            df_processed[col] = df_processed[col].astype(str).str.strip()
-            df_processed[col] = df_processed[col].replace('nan', '')
+            df_processed[col] = normalize_strings(df_processed[col])
         
         # Remover linhas completamente vazias
         df_processed = df_processed.dropna(how='all')
@@ -145,7 +728,15 @@ class DataProcessor:
         if self.df is None or column not in self.df.columns:
             return []
         
-        options = self.df[column].dropna().unique()
+        if self.backend is not None:
+            return self.backend.distinct(column)
+        
+        series = self.df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Categorias já normalizadas e ordenadas no pré-processamento
+            return [str(opt) for opt in series.cat.categories]
+        
+        options = series.dropna().unique()
         return sorted([str(opt) for opt in options if str(opt) != 'nan'])
     
     def apply_filters(self, filters: Dict[str, Any]) -> pd.DataFrame:
@@ -153,20 +744,88 @@ class DataProcessor:
         if self.df is None:
             return pd.DataFrame()
         
-        filtered_df = self.df.copy()
+        query = self.query(filters)
+        result = query.collect()
+        self._remember_view(result, query)
+        return result
+    
+    def query(self, filters: Optional[Dict[str, Any]] = None) -> FilterQuery:
+        """
+        Cria uma consulta preguiçosa a partir dos filtros da interface.
         
-        # Filtro por data
-        if 'date_filter' in filters and filters['date_filter']:
-            date_col = self.detected_columns.get('data_entrega')
-            if date_col and date_col in filtered_df.columns:
-                target_date = filters['date_filter']
-                filtered_df = filtered_df[
-                    filtered_df[date_col].dt.date == target_date
-                ]
+        Args:
+            filters: Filtros no formato de render_filters
+            
+        Returns:
+            Consulta ainda não executada
+        """
+        if self.df is None or not filters:
+            return FilterQuery(self)
+        
+        return FilterQuery(
+            self,
+            values=self._resolve_filters(filters),
+            day_bounds=self._date_bounds(filters),
+            ranges=self._resolve_ranges(filters),
+        )
+    
+    def _select_positions(self, query: FilterQuery) -> Optional[np.ndarray]:
+        """
+        Executa os predicados da consulta.
+        
+        Período e colunas indexadas geram as posições candidatas; valores não
+        indexados, faixas numéricas e status são combinados numa única máscara
+        avaliada apenas sobre essas candidatas.
+        
+        Returns:
+            Posições ordenadas das linhas selecionadas ou None (todas)
+        """
+        df = self.df
+        index = self.filter_index if self.filter_index and self.filter_index.is_current(df) else None
+        
+        # Separar filtros resolvidos pelo índice dos demais
+        indexed = {col: vals for col, vals in query.values.items() if index is not None and col in index}
+        scanned = {col: vals for col, vals in query.values.items() if col not in indexed}
+        
+        # Posições candidatas (None = todas as linhas)
+        positions = self._date_positions(query.day_bounds)
+        if indexed:
+            positions = index.select(indexed, positions)
+        
+        def candidates(values):
+            return values if positions is None else values[positions]
+        
+        masks = []
+        for column, accepted in scanned.items():
+            series = df[column] if positions is None else df[column].take(positions)
+            masks.append(_values_mask(series, accepted))
+        
+        for column, (low, high) in query.ranges.items():
+            values = candidates(df[column].to_numpy(dtype=float, na_value=np.nan))
+            masks.append((values >= low) & (values <= high))
+        
+        status_col = self.detected_columns.get('status')
+        if query.status_type in STATUS_MODES and status_col in df.columns:
+            codes = candidates(self._status_codes(df, status_col))
+            masks.append(status_mask(codes, query.status_type))
+        
+        if masks:
+            mask = np.logical_and.reduce(masks) if len(masks) > 1 else masks[0]
+            positions = np.flatnonzero(mask) if positions is None else positions[mask]
+        
+        # Posições podem ser compartilhadas pelo cache de resultados
+        if positions is not None:
+            positions.flags.writeable = False
+        return positions
+    
+    def _resolve_filters(self, filters: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Mapeia os filtros por valores para {coluna real: valores aceitos}."""
+        resolved: Dict[str, List[str]] = {}
         
-        # Filtros por colunas específicas
         for filter_name, values in filters.items():
-            if filter_name == 'date_filter' or not values:
+            if filter_name in ('date_filter', 'date_range') or not values:
+                continue
+            if filter_name.endswith('_range'):  # Faixas numéricas: _resolve_ranges
                 continue
             
             # Mapear filtro para coluna real
@@ -176,17 +835,121 @@ class DataProcessor:
             elif filter_name in self.df.columns:
                 column = filter_name
             
-            if column and column in filtered_df.columns:
-                if isinstance(values, list):
-                    filtered_df = filtered_df[
-                        filtered_df[column].astype(str).isin([str(v) for v in values])
-                    ]
-                else:
-                    filtered_df = filtered_df[
-                        filtered_df[column].astype(str) == str(values)
-                    ]
+            if column and column in self.df.columns:
+                if not isinstance(values, list):
+                    values = [values]
+                resolved[column] = [str(v) for v in values]
+        
+        return resolved
+    
+    def _resolve_ranges(self, filters: Dict[str, Any]) -> Dict[str, Tuple[float, float]]:
+        """Mapeia os filtros '{coluna}_range' para {coluna numérica: (mínimo, máximo)}."""
+        resolved: Dict[str, Tuple[float, float]] = {}
+        
+        for filter_name, bounds in filters.items():
+            if filter_name == 'date_range' or not filter_name.endswith('_range') or not bounds:
+                continue
+            
+            column = filter_name[:-len('_range')]
+            if column in self.df.columns and pd.api.types.is_numeric_dtype(self.df[column]):
+                low, high = bounds
+                resolved[column] = (float(low), float(high))
+        
+        return resolved
+    
+    def _date_bounds(self, filters: Dict[str, Any]) -> Optional[Tuple[np.datetime64, np.datetime64]]:
+        """
+        Resolve os filtros de data ('date_filter' e 'date_range').
+        
+        Returns:
+            Período (início, fim) inclusive ou None se não houver filtro
+        """
+        date_col = self.detected_columns.get('data_entrega')
+        if not date_col or date_col not in self.df.columns:
+            return None
+        
+        bounds = []
+        if filters.get('date_filter'):
+            bounds.append((filters['date_filter'], filters['date_filter']))
+        if filters.get('date_range'):
+            bounds.append(tuple(filters['date_range']))
+        if not bounds:
+            return None
+        
+        # Filtros combinados: interseção dos períodos
+        start = max(to_day(lower) for lower, _ in bounds)
+        end = min(to_day(upper) for _, upper in bounds)
+        return start, end
+    
+    def _date_positions(
+        self,
+        day_bounds: Optional[Tuple[np.datetime64, np.datetime64]]
+    ) -> Optional[np.ndarray]:
+        """Posições ordenadas das linhas no período (None se não houver filtro)."""
+        if day_bounds is None:
+            return None
+        
+        start, end = day_bounds
+        if self.date_index is not None and self.date_index.is_current(self.df):
+            return self.date_index.positions(start, end)
+        
+        days = day_values(self.df[self.detected_columns['data_entrega']])
+        return np.flatnonzero((days >= start) & (days <= end))
+    
+    @property
+    def fingerprint(self) -> Optional[str]:
+        """Fingerprint do dataset carregado (None se os índices estiverem desatualizados)."""
+        if self._fingerprint is None or self._fingerprint[0]() is not self.df:
+            return None
+        return self._fingerprint[1]
+    
+    def _cached_result(self, operation: str, query: FilterQuery, compute: Callable[[], Any]) -> Any:
+        """Resultado de uma operação da consulta, memorizado por dataset e filtros."""
+        fingerprint = self.fingerprint
+        if fingerprint is None:
+            return compute()
+        
+        key = (fingerprint, operation, query.signature())
+        return self.result_cache.get_or_compute(key, compute)
+    
+    def _remember_view(self, view: pd.DataFrame, query: FilterQuery):
+        """Associa um recorte do DataFrame carregado à consulta que o gerou."""
+        self._views[id(view)] = (weakref.ref(view), len(view), query)
+        self._views.move_to_end(id(view))
+        while len(self._views) > MAX_TRACKED_VIEWS:
+            self._views.popitem(last=False)
+    
+    def _view_query(self, df: pd.DataFrame) -> Optional[FilterQuery]:
+        """Consulta que gerou df, quando df é um recorte conhecido."""
+        if df is self.df:
+            return FilterQuery(self)
         
-        return filtered_df
+        entry = self._views.get(id(df))
+        if entry is None or entry[0]() is not df or entry[1] != len(df):
+            return None
+        return entry[2]
+    
+    def _cube_mask(self, query: FilterQuery) -> Optional[np.ndarray]:
+        """
+        Células do cubo equivalentes à consulta.
+        
+        Returns:
+            Máscara sobre as células ou None se o cubo não puder responder
+        """
+        if self.cube is None or not self.cube.is_current(self.df):
+            return None
+        if query.ranges or not self.cube.covers(query.values):
+            return None
+        if query.day_bounds is not None and self.cube.date_column is None:
+            return None
+        
+        status_type = query.status_type if query.status_type in STATUS_MODES else 'all'
+        return self.cube.mask(query.values, query.day_bounds, status_type)
+    
+    def _cube_selection(self, df: pd.DataFrame) -> Optional[np.ndarray]:
+        """Células do cubo equivalentes a df, quando df é um recorte conhecido."""
+        query = self._view_query(df)
+        return None if query is None else self._cube_mask(query)
     
     def filter_by_status(self, df: pd.DataFrame, status_type: str = 'all') -> pd.DataFrame:
         """Filtra por status de entrega."""
@@ -197,23 +960,24 @@ class DataProcessor:
         if not status_col or status_col not in df.columns:
             return df
         
-        if status_type == 'delivered':
-            # Buscar indicadores de entrega
-            delivered_indicators = ['entregue', 'entregado', 'delivered', 'ok', 'concluido', 'finalizado']
-            mask = df[status_col].astype(str).str.lower().str.contains(
-                '|'.join(delivered_indicators), na=False
-            )
-            return df[mask]
+        if status_type not in STATUS_MODES:
+            return df
         
-        elif status_type == 'pending':
-            # Buscar indicadores de pendência
-            pending_indicators = ['pendente', 'pending', 'aguardando', 'em rota', 'em transito']
-            mask = df[status_col].astype(str).str.lower().str.contains(
-                '|'.join(pending_indicators), na=False
-            )
-            return df[mask]
+        result = df[status_mask(self._status_codes(df, status_col), status_type)]
         
-        return df
+        query = self._view_query(df)
+        if query is not None and query.status_type in ('all', status_type):
+            self._remember_view(result, query.with_status(status_type))
+        
+        return result
+    
+    def _status_codes(self, df: pd.DataFrame, status_col: str) -> np.ndarray:
+        """Códigos de status das linhas de df (pré-calculados quando possível)."""
+        if self.status_index is not None and self.status_index.is_current(df):
+            return self.status_index.codes
+        
+        # Recortes mantêm as categorias: classificação memorizada por categoria
+        return self.status_classifier.codes(df[status_col])
     
     def group_by_deliverer(self, df: pd.DataFrame) -> pd.DataFrame:
         """Agrupa entregas por entregador."""
@@ -224,32 +988,56 @@ class DataProcessor:
         if not deliverer_col or deliverer_col not in df.columns:
             return pd.DataFrame(columns=['Entregador', 'Quantidade'])
         
-        result = (
-            df[deliverer_col]
-            .value_counts()
-            .reset_index()
-            .rename(columns={deliverer_col: 'Quantidade', 'index': 'Entregador'})
-        )
+        cells = self._cube_selection(df)
+        if cells is not None and self.cube.covers([deliverer_col]):
+            counts = self.cube.value_counts(deliverer_col, cells)
+        else:
+            counts = df[deliverer_col].value_counts(sort=False)
+            counts = counts[counts > 0]  # Categorias sem registros no recorte
+        
+        return self._deliverer_table(counts)
+    
+    def _deliverer_table(self, counts: pd.Series) -> pd.DataFrame:
+        """Monta a tabela de entregas por entregador a partir das contagens."""
+        if counts.empty:
+            return pd.DataFrame(columns=['Entregador', 'Quantidade'])
+        
+        result = pd.DataFrame({
+            'Entregador': np.asarray(counts.index, dtype=object),
+            'Quantidade': counts.to_numpy(),
+        })
         
         # Adicionar estatísticas extras se possível
         if len(result) > 0:
-            result = result.sort_values('Quantidade', ascending=False)
+            result = result.sort_values('Quantidade', ascending=False, kind='stable', ignore_index=True)
             result['Percentual'] = (result['Quantidade'] / result['Quantidade'].sum() * 100).round(1)
         
         return result
     
-    def get_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Gera estatísticas do DataFrame."""
+    def get_statistics(self, df: pd.DataFrame, approximate: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Gera estatísticas do DataFrame.
+        
+        Args:
+            df: DataFrame a resumir
+            approximate: Usar os resumos de tamanho fixo para o dataset
+                carregado (padrão: STATISTICS_CONFIG["approximate"])
+        """
         if df.empty:
             return {}
         
-        stats = {
-            'total_records': len(df),
-            'date_range': None,
-            'unique_deliverers': 0,
-            'unique_cities': 0,
-            'status_distribution': {},
-        }
+        if approximate is None:
+            approximate = STATISTICS_CONFIG['approximate']
+        if approximate and df is self.df:
+            stats = self._sketch_statistics()
+            if stats is not None:
+                return stats
+        
+        stats = self._empty_statistics(len(df))
+        
+        cells = self._cube_selection(df)
+        if cells is not None:
+            return self._cube_statistics(stats, cells)
         
         # Estatísticas de data
         date_col = self.detected_columns.get('data_entrega')
@@ -274,54 +1062,350 @@ class DataProcessor:
         # Distribuição de status
         status_col = self.detected_columns.get('status')
         if status_col and status_col in df.columns:
-            stats['status_distribution'] = df[status_col].value_counts().to_dict()
+            status_counts = df[status_col].value_counts()
+            stats['status_distribution'] = status_counts[status_counts > 0].to_dict()
         
         return stats
     
+    def _sketch_statistics(self, day_bounds: Optional[Tuple[np.datetime64, np.datetime64]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Estatísticas estimadas pelos resumos (StatisticsSketch), sem ler as linhas.
+        
+        Total e período são exatos; entregadores e cidades únicos vêm do
+        HyperLogLog e a distribuição de status dos valores mais frequentes.
+        A chave 'approximate' traz o erro padrão relativo dos distintos e o
+        erro máximo das contagens de status.
+        
+        Args:
+            day_bounds: Período (qualquer um no histórico, resumido por dia;
+                no dataset carregado, apenas um que cubra todas as datas)
+            
+        Returns:
+            Estatísticas ou None quando não há resumo que cubra o pedido
+        """
+        sketch = self.statistics_sketch
+        if self.backend is not None and day_bounds is not None:
+            lower, upper = day_bounds
+            if self.backend.day_bounds is not None:
+                lower = max(lower, self.backend.day_bounds[0])
+                upper = min(upper, self.backend.day_bounds[1])
+            if lower > upper:
+                return {}
+            sketch = self.history.sketch(lower, upper)
+        elif sketch is not None and day_bounds is not None:
+            # Sem resumo por dia: só um período que cubra todas as linhas
+            if sketch.undated or sketch.min_day is None:
+                return None
+            if day_bounds[0] > sketch.min_day or day_bounds[1] < sketch.max_day:
+                return None
+        
+        if sketch is None:
+            return None
+        if not sketch.rows:
+            return {}
+        
+        deliverer_col = self.detected_columns.get('entregador')
+        city_col = self.detected_columns.get('cidade')
+        status_col = self.detected_columns.get('status')
+        if any(col and col not in sketch.distinct for col in (deliverer_col, city_col)):
+            return None
+        if status_col and status_col not in sketch.top:
+            return None
+        
+        stats = self._empty_statistics(sketch.rows)
+        if sketch.min_day is not None:
+            stats['date_range'] = {
+                'min': pd.Timestamp(sketch.min_day).date(),
+                'max': pd.Timestamp(sketch.max_day).date()
+            }
+        if deliverer_col:
+            stats['unique_deliverers'] = sketch.distinct[deliverer_col].estimate()
+        if city_col:
+            stats['unique_cities'] = sketch.distinct[city_col].estimate()
+        
+        status_error = 0
+        if status_col:
+            summary = sketch.top[status_col]
+            stats['status_distribution'] = summary.top().to_dict()
+            status_error = summary.max_error
+        
+        stats['approximate'] = {'distinct_error': sketch.relative_error, 'status_error': status_error}
+        return stats
+    
+    def _empty_statistics(self, total_records: int) -> Dict[str, Any]:
+        return {
+            'total_records': total_records,
+            'date_range': None,
+            'unique_deliverers': 0,
+            'unique_cities': 0,
+            'status_distribution': {},
+        }
+    
+    def _cube_statistics(self, stats: Dict[str, Any], cells: np.ndarray) -> Dict[str, Any]:
+        """Preenche as estatísticas somando as células selecionadas do cubo."""
+        cube = self.cube
+        
+        day_range = cube.day_range(cells)
+        if day_range is not None:
+            stats['date_range'] = {
+                'min': pd.Timestamp(day_range[0]).date(),
+                'max': pd.Timestamp(day_range[1]).date()
+            }
+        
+        deliverer_col = self.detected_columns.get('entregador')
+        if cube.covers([deliverer_col]):
+            stats['unique_deliverers'] = cube.nunique(deliverer_col, cells)
+        
+        city_col = self.detected_columns.get('cidade')
+        if cube.covers([city_col]):
+            stats['unique_cities'] = cube.nunique(city_col, cells)
+        
+        status_col = self.detected_columns.get('status')
+        if cube.covers([status_col]):
+            status_counts = cube.value_counts(status_col, cells)
+            status_counts = status_counts.sort_values(ascending=False, kind='stable')
+            stats['status_distribution'] = status_counts.to_dict()
+        
+        return stats
+    
+    def find_duplicates(self, near: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Repetições do dataset carregado, a partir dos fingerprints das linhas.
+        
+        Args:
+            near: Mesmo pedido, dia e entregador em vez da linha inteira
+            
+        Returns:
+            Linhas repetidas (sem a primeira ocorrência) ou None se os
+            fingerprints não estiverem disponíveis
+        """
+        fingerprints = self.row_fingerprints
+        if fingerprints is None or not fingerprints.is_current(self.df):
+            return None
+        
+        mask = fingerprints.duplicated(near)
+        if mask is None:
+            return None
+        return self.df.iloc[np.flatnonzero(mask)]
+    
     def validate_data_quality(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Avalia qualidade dos dados."""
+        """
+        Avalia qualidade dos dados.
+        
+        As métricas vêm de uma única varredura por blocos (scan_quality); para
+        o dataset carregado, o resultado é memorizado pelo fingerprint e pela
+        hora de referência das datas futuras.
+        """
         if df.empty:
             return {'quality_score': 0, 'issues': ['DataFrame vazio']}
         
-        issues = []
-        quality_score = 100
+        date_col = self.detected_columns.get('data_entrega')
+        reference = pd.Timestamp.now().floor('h')
         
-        # Verificar dados faltantes
-        missing_data = df.isnull().sum()
-        if missing_data.sum() > 0:
-            missing_percentage = (missing_data.sum() / (len(df) * len(df.columns))) * 100
-            quality_score -= min(missing_percentage, 30)
-            issues.append(f"Dados faltantes: {missing_percentage:.1f}%")
+        fingerprints = self.row_fingerprints
+        if fingerprints is not None and not fingerprints.is_current(df):
+            fingerprints = None
         
-        # Verificar duplicatas
-        duplicates = df.duplicated().sum()
-        if duplicates > 0:
-            duplicate_percentage = (duplicates / len(df)) * 100
-            quality_score -= min(duplicate_percentage, 20)
-            issues.append(f"Registros duplicados: {duplicates} ({duplicate_percentage:.1f}%)")
+        def compute() -> QualityScan:
+            return scan_quality(df, date_col, reference, fingerprints=fingerprints)
         
-        # Verificar consistência de datas
-        date_col = self.detected_columns.get('data_entrega')
-        if date_col and date_col in df.columns:
-            future_dates = df[df[date_col] > datetime.now()]
-            if len(future_dates) > len(df) * 0.8:  # Mais de 80% no futuro
-                quality_score -= 15
-                issues.append("Muitas datas futuras detectadas")
+        fingerprint = self.fingerprint if df is self.df else None
+        if fingerprint is not None:
+            scan = self.result_cache.get_or_compute((fingerprint, 'quality', reference.isoformat()), compute)
+        else:
+            scan = compute()
         
-        # Verificar valores extremos
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            if df[col].std() > df[col].mean() * 3:  # Desvio muito alto
-                quality_score -= 5
-                issues.append(f"Valores extremos em {col}")
+        near_duplicates = fingerprints.duplicate_count(near=True) if fingerprints is not None else None
+        return _quality_report(scan, near_duplicates)
+    
+    def profile_data_quality(
+        self,
+        source: Union[bytes, str, Path],
+        filename: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Avalia a qualidade de um arquivo sem carregá-lo inteiro.
         
-        quality_score = max(0, min(100, quality_score))
+        O arquivo é lido e pré-processado bloco a bloco, como no carregamento,
+        e cada bloco alimenta acumuladores de tamanho fixo (QualityProfile);
+        o estado do processador (dados e colunas detectadas) não é alterado.
         
-        return {
-            'quality_score': round(quality_score, 1),
-            'issues': issues,
-            'recommendations': _get_quality_recommendations(issues)
+        Args:
+            source: Caminho do arquivo (ou conteúdo em memória)
+            filename: Nome usado para identificar o formato (padrão: nome do caminho)
+            
+        Returns:
+            Relatório no formato de validate_data_quality, com a chave
+            'profile' (linhas, distintos estimados por coluna e erro relativo)
+        """
+        filename = filename or Path(source).name
+        
+        # Processador auxiliar: detecção e pré-processamento sem tocar nesta sessão
+        scratch = self._scratch()
+        
+        chunks = scratch._iter_file_chunks(source, filename)
+        first_chunk = next(chunks, None)
+        if first_chunk is None or first_chunk.empty:
+            return {'quality_score': 0, 'issues': ['Arquivo está vazio'], 'recommendations': []}
+        
+        success, message = scratch._validate_dataframe(first_chunk)
+        if not success:
+            return {'quality_score': 0, 'issues': [message], 'recommendations': []}
+        
+        scratch.detected_columns = scratch._detect_columns(first_chunk)
+        profile = QualityProfile(scratch.detected_columns.get('data_entrega'), pd.Timestamp.now().floor('h'))
+        
+        profile.update(scratch._preprocess_dataframe(first_chunk, copy=False))
+        del first_chunk
+        for chunk in chunks:
+            profile.update(scratch._preprocess_dataframe(chunk, copy=False))
+        
+        scan = profile.result()
+        if not scan.rows:
+            return {'quality_score': 0, 'issues': ['DataFrame vazio'], 'recommendations': []}
+        
+        report = _quality_report(scan)
+        report['profile'] = {
+            'rows': scan.rows,
+            'distinct': profile.distinct_counts(),
+            'distinct_error': profile.distinct_error,
+            'duplicate_error': profile.duplicate_error,
+            'memory_bytes': profile.memory_bytes,
         }
+        return report
+
+def _load_variant(project_columns: bool, extra_columns: Tuple[str, ...], mapper: ColumnMapper) -> str:
+    """Opções de carregamento que alteram o resultado (entram na chave de cache)."""
+    variant = f"projection={sorted(extra_columns)}" if project_columns else ""
+    if INGESTION_CONFIG['fold_categories']:
+        variant += ";fold"
+    # Detecção com outras palavras-chave ou mapeamentos fixados produz outro dataset
+    variant += f";keywords={mapper.keywords_digest}"
+    pins = mapper.pins_digest()
+    if pins:
+        variant += f";pins={pins}"
+    return variant
+
+
+def _to_normalized_category(series: pd.Series, fold: bool = False) -> pd.Series:
+    """
+    Converte uma coluna de texto em category com categorias normalizadas.
+    
+    Espaços internos repetidos são colapsados e valores vazios viram nulos;
+    a normalização é feita sobre as categorias, não sobre as linhas. Com
+    fold=True, grafias que diferem só em acentos ou caixa ('SAO PAULO',
+    'São Paulo') viram uma categoria, rotulada pela grafia mais frequente.
+    """
+    categorical = series.astype('category')
+    normalized = clean_values(categorical.cat.categories, collapse_spaces=True)
+    codes = categorical.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(normalized))
+    
+    # Categorias que passam a coincidir após a normalização são unificadas
+    remap, categories = merge_labels(normalized, counts, fold)
+    codes = np.where(codes >= 0, remap[codes], -1)
+    
+    # Texto vazio é tratado como ausente
+    empty = np.flatnonzero(categories == '')
+    if len(empty):
+        codes = np.where(codes == empty[0], -1, codes)
+        codes = np.where(codes > empty[0], codes - 1, codes)
+        categories = categories.delete(empty[0])
+    
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=categories),
+        index=series.index,
+        name=series.name
+    )
+
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatena blocos pré-processados preservando colunas category e tipos comuns."""
+    if len(chunks) == 1:
+        return chunks[0]
+    
+    # Coluna numérica num bloco e texto em outro: texto em todos, como numa leitura única
+    for col in unify_chunk_dtypes(chunks):
+        if chunks[0][col].dtype == object:
+            for chunk in chunks:
+                chunk[col] = normalize_strings(chunk[col])
+    
+    categorical_columns = {
+        col for chunk in chunks for col in chunk.columns
+        if isinstance(chunk[col].dtype, pd.CategoricalDtype)
+    }
+    
+    for col in categorical_columns:
+        # Cada bloco tem suas próprias categorias: unificar antes de concatenar
+        categories = pd.Index(sorted({
+            category for chunk in chunks
+            if isinstance(chunk[col].dtype, pd.CategoricalDtype)
+            for category in chunk[col].cat.categories
+        }))
+        
+        for chunk in chunks:
+            series = chunk[col]
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = pd.Series(mixed_values(series), index=series.index)
+                series = series.where(series.isna(), series.astype(str))
+            chunk[col] = pd.Categorical(series, categories=categories)
+    
+    return pd.concat(chunks)
+
+
+def _values_mask(series: pd.Series, values: List[str]) -> np.ndarray:
+    """Máscara de linhas cujo valor (como texto) está em values."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Comparar códigos inteiros em vez de strings
+        positions = series.cat.categories.astype(str).get_indexer(values)
+        return np.isin(series.cat.codes.to_numpy(), positions[positions >= 0])
+    
+    return series.astype(str).isin(values).to_numpy()
+
+
+def _quality_report(scan: QualityScan, near_duplicates: Optional[int] = None) -> Dict[str, Any]:
+    """Score, problemas e recomendações a partir das métricas de qualidade."""
+    issues = []
+    quality_score = 100
+    
+    # Verificar dados faltantes
+    if scan.missing_cells > 0:
+        missing_percentage = (scan.missing_cells / (scan.rows * len(scan.columns))) * 100
+        quality_score -= min(missing_percentage, 30)
+        issues.append(f"Dados faltantes: {missing_percentage:.1f}%")
+    
+    # Verificar duplicatas
+    duplicates = scan.duplicate_rows
+    if duplicates > 0:
+        duplicate_percentage = (duplicates / scan.rows) * 100
+        quality_score -= min(duplicate_percentage, 20)
+        issues.append(f"Registros duplicados: {duplicates} ({duplicate_percentage:.1f}%)")
+    
+    # Mesmo pedido, dia e entregador (informativo: pode ser entrega parcial)
+    if near_duplicates and near_duplicates > duplicates:
+        issues.append(
+            f"Possíveis duplicatas (mesmo pedido, dia e entregador): {near_duplicates - duplicates}"
+        )
+    
+    # Verificar consistência de datas
+    if scan.future_dates > scan.rows * 0.8:  # Mais de 80% no futuro
+        quality_score -= 15
+        issues.append("Muitas datas futuras detectadas")
+    
+    # Verificar valores extremos
+    for col, moments in scan.moments.items():
+        if moments.std > moments.mean * 3:  # Desvio muito alto
+            quality_score -= 5
+            issues.append(f"Valores extremos em {col}")
+    
+    quality_score = max(0, min(100, quality_score))
+    
+    return {
+        'quality_score': round(quality_score, 1),
+        'issues': issues,
+        'recommendations': _get_quality_recommendations(issues)
+    }
+
 
 def _get_quality_recommendations(issues: List[str]) -> List[str]:
     """Gera recomendações baseadas nos problemas encontrados."""
@@ -332,6 +1416,8 @@ def _get_quality_recommendations(issues: List[str]) -> List[str]:
             recommendations.append("Considere preencher dados faltantes ou remover registros incompletos")
         elif 'duplicados' in issue:
             recommendations.append("Remova registros duplicados para melhorar a precisão")
+        elif 'duplicatas' in issue:
+            recommendations.append("Confira os registros do mesmo pedido no mesmo dia antes de consolidar os totais")
         elif 'datas futuras' in issue:
             recommendations.append("Verifique se as datas estão no formato correto")
         elif 'extremos' in issue:
@@ -0,0 +1,190 @@
+"""
+Datasets carregados e cache de carregamento em memória.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ..config.settings import CACHE_CONFIG
+from .indexes import AggregationCube, DateIndex, FilterIndex, RowFingerprints, StatusIndex
+from .sketches import StatisticsSketch
+
+logger = logging.getLogger(__name__)
+
+
+class LoadedDataset:
+    """
+    Resultado imutável de um carregamento.
+
+    Reúne o DataFrame pré-processado, as colunas detectadas e os índices
+    construídos para ele. Pode ser compartilhado entre processadores: o
+    DataFrame não deve ser alterado por quem o recebe.
+    """
+
+    __slots__ = (
+        'df', 'original_columns', 'detected_columns', 'fingerprint', 'total_records',
+        'filter_index', 'date_index', 'status_index', 'cube', 'row_fingerprints', 'statistics_sketch',
+    )
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        original_columns: List[str],
+        detected_columns: Dict[str, str],
+        fingerprint: str,
+        total_records: int,
+        filter_index: Optional[FilterIndex] = None,
+        date_index: Optional[DateIndex] = None,
+        status_index: Optional[StatusIndex] = None,
+        cube: Optional[AggregationCube] = None,
+        row_fingerprints: Optional[RowFingerprints] = None,
+        statistics_sketch: Optional[StatisticsSketch] = None,
+    ):
+        values = {
+            'df': df,
+            'original_columns': tuple(original_columns),
+            'detected_columns': MappingProxyType(dict(detected_columns)),
+            'fingerprint': fingerprint,
+            'total_records': total_records,
+            'filter_index': filter_index,
+            'date_index': date_index,
+            'status_index': status_index,
+            'cube': cube,
+            'row_fingerprints': row_fingerprints,
+            'statistics_sketch': statistics_sketch,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"LoadedDataset é imutável: não é possível alterar '{name}'")
+
+
+class LoadCache:
+    """
+    Registro em memória dos datasets carregados, compartilhado entre sessões.
+
+    Indexado pela chave do conteúdo: sessões que carregam o mesmo arquivo
+    recebem o mesmo LoadedDataset, e carregamentos simultâneos da mesma chave
+    são feitos uma única vez. Cada sessão que usa um dataset mantém uma
+    referência (acquire/release); datasets referenciados nunca são removidos,
+    e o limite LRU de max_entries vale apenas para os que não estão em uso.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or CACHE_CONFIG["loaded_datasets"]
+        self._entries: 'OrderedDict[str, LoadedDataset]' = OrderedDict()
+        self._references: Dict[str, int] = {}
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[LoadedDataset]:
+        """Retorna o dataset da chave, marcando-o como usado recentemente."""
+        with self._lock:
+            dataset = self._entries.get(key)
+            if dataset is not None:
+                self._entries.move_to_end(key)
+            return dataset
+
+    def put(self, key: str, dataset: LoadedDataset):
+        """Guarda um dataset, removendo os menos usados sem referências além do limite."""
+        with self._lock:
+            self._entries[key] = dataset
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], Tuple[Optional[LoadedDataset], str]],
+    ) -> Tuple[Optional[LoadedDataset], str]:
+        """
+        Retorna o dataset da chave, carregando-o uma única vez.
+
+        Sessões que pedem a mesma chave durante o carregamento aguardam o
+        resultado em vez de ler o arquivo novamente.
+
+        Args:
+            key: Chave do conteúdo
+            load: Função que produz (dataset ou None, mensagem)
+
+        Returns:
+            Tupla (dataset ou None, mensagem)
+        """
+        dataset = self.get(key)
+        if dataset is not None:
+            return dataset, "Dataset reaproveitado da memória"
+
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                dataset = self.get(key)
+                if dataset is not None:
+                    return dataset, "Dataset reaproveitado da memória"
+
+                dataset, message = load()
+                if dataset is not None:
+                    self.put(key, dataset)
+                return dataset, message
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+    def acquire(self, key: str):
+        """Registra uma sessão usando o dataset da chave."""
+        with self._lock:
+            self._references[key] = self._references.get(key, 0) + 1
+
+    def release(self, key: str):
+        """Libera a referência de uma sessão ao dataset da chave."""
+        with self._lock:
+            count = self._references.get(key, 0) - 1
+            if count > 0:
+                self._references[key] = count
+            else:
+                self._references.pop(key, None)
+                self._evict()
+
+    def references(self, key: str) -> int:
+        """Número de sessões usando o dataset da chave."""
+        with self._lock:
+            return self._references.get(key, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Datasets registrados, em uso e memória ocupada por eles."""
+        with self._lock:
+            entries = list(self._entries.items())
+            in_use = sum(1 for key, _ in entries if key in self._references)
+        return {
+            'entries': len(entries),
+            'in_use': in_use,
+            'bytes': sum(int(dataset.df.memory_usage(index=True, deep=False).sum()) for _, dataset in entries),
+        }
+
+    def _evict(self):
+        unreferenced = [key for key in self._entries if key not in self._references]
+        for key in unreferenced[:max(0, len(unreferenced) - self.max_entries)]:
+            del self._entries[key]
+            logger.debug(f"Dataset removido do cache de carregamento: {key}")
+
+    def clear(self):
+        """Remove os datasets que não estão em uso por nenhuma sessão."""
+        with self._lock:
+            for key in [key for key in self._entries if key not in self._references]:
+                del self._entries[key]
+
+
+# Compartilhado entre as sessões do processo (como o antigo st.cache_data)
+LOAD_CACHE = LoadCache()
@@ -0,0 +1,206 @@
+"""
+Conversão vetorizada de colunas de data com formato detectado por coluna.
+"""
+import logging
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import INGESTION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Pseudo-formato para números de série do Excel (dias desde 1899-12-30)
+EXCEL_SERIAL = "excel-serial"
+
+_EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+
+# Séries plausíveis para datas de entrega: 1954-10-03 a 2119-01-06
+_SERIAL_RANGE = (20_000, 80_000)
+
+# Acima desta fração de falhas o formato memorizado da coluna é detectado de novo
+_MAX_FAILURE_RATIO = 0.1
+
+
+def _from_serial(numbers: np.ndarray) -> pd.DatetimeIndex:
+    """Converte números de série do Excel (fora da faixa plausível viram NaT)."""
+    result = np.full(len(numbers), np.datetime64("NaT"), dtype="datetime64[ns]")
+    valid = (numbers >= _SERIAL_RANGE[0]) & (numbers <= _SERIAL_RANGE[1])
+    if valid.any():
+        # Aritmética inteira em milissegundos: frações do Excel têm ruído de ponto flutuante
+        millis = np.round(numbers[valid] * 86_400_000).astype(np.int64)
+        result[valid] = _EXCEL_EPOCH.to_datetime64() + millis.astype("timedelta64[ms]")
+    return pd.DatetimeIndex(result)
+
+
+class DateParser:
+    """
+    Converte colunas de data detectando o formato uma única vez.
+
+    O formato é detectado sobre uma amostra dos valores distintos e
+    memorizado pelo nome da coluna de origem; cada conversão analisa apenas
+    os valores distintos (datas se repetem muito) e espalha o resultado para
+    as linhas. Colunas com variantes (ex.: 'dd/mm/aaaa' e 'dd/mm/aaaa hh:mm')
+    guardam mais de um formato, aplicados em sequência às linhas restantes.
+    """
+
+    def __init__(self, formats: Optional[Iterable[str]] = None, sample_size: Optional[int] = None):
+        self.formats = tuple(formats or INGESTION_CONFIG["date_formats"]) + (EXCEL_SERIAL,)
+        self.sample_size = sample_size or INGESTION_CONFIG["date_sample_size"]
+        self._detected: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    def detected_formats(self, column: str) -> Optional[Tuple[str, ...]]:
+        """Formatos memorizados para a coluna (None se ainda não detectados)."""
+        return self._detected.get(column)
+
+    def parse(self, series: pd.Series, column: Optional[str] = None) -> pd.Series:
+        """
+        Converte uma coluna para datetime64 (valores inválidos viram NaT).
+
+        Args:
+            series: Coluna com textos, datas ou números de série do Excel
+            column: Nome usado para memorizar o formato (padrão: series.name)
+
+        Returns:
+            Série datetime64[ns] com o mesmo índice
+        """
+        column = str(column if column is not None else series.name)
+
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            values = _from_serial(series.to_numpy(dtype=float, na_value=np.nan))
+            return pd.Series(values, index=series.index, name=series.name)
+
+        # Datas se repetem: converter só os valores distintos
+        codes, uniques = pd.factorize(series)
+        parsed = self._parse_uniques(np.asarray(uniques, dtype=object), column)
+
+        values = np.append(parsed.to_numpy(dtype="datetime64[ns]"), np.datetime64("NaT", "ns"))
+        return pd.Series(values[codes], index=series.index, name=series.name)
+
+    def _parse_uniques(self, uniques: np.ndarray, column: str) -> pd.Series:
+        result = pd.Series(pd.NaT, index=range(len(uniques)), dtype="datetime64[ns]")
+        if not len(uniques):
+            return result
+
+        if pd.api.types.infer_dtype(uniques, skipna=False) == "string":
+            result[:] = self._parse_text(pd.Series(uniques, dtype=object), column).to_numpy()
+            return result
+
+        # Planilhas podem misturar células de data com texto e números
+        is_datetime = np.fromiter(
+            (isinstance(value, (datetime, date, np.datetime64)) for value in uniques),
+            dtype=bool, count=len(uniques)
+        )
+        is_number = np.fromiter(
+            (isinstance(value, (int, float, np.number)) and not isinstance(value, bool) for value in uniques),
+            dtype=bool, count=len(uniques)
+        )
+        is_text = ~(is_datetime | is_number)
+
+        if is_datetime.any():
+            result[is_datetime] = pd.to_datetime(list(uniques[is_datetime]), errors="coerce")
+        if is_number.any():
+            result[is_number] = _from_serial(uniques[is_number].astype(float))
+        if is_text.any():
+            text = pd.Series(uniques[is_text], dtype=object).astype(str)
+            result[is_text] = self._parse_text(text, column).to_numpy()
+
+        return result
+
+    def _parse_text(self, text: pd.Series, column: str) -> pd.Series:
+        formats = self._detected.get(column)
+        cached = formats is not None
+        if formats is None:
+            formats = self.detect(text)
+
+        parsed, missing = self._apply_formats(text, formats)
+        if cached and missing.mean() > _MAX_FAILURE_RATIO:
+            logger.info(f"Formato de data da coluna {column!r} mudou; detectando novamente")
+            formats = self.detect(text)
+            parsed, missing = self._apply_formats(text, formats)
+
+        if formats:
+            with self._lock:
+                self._detected[column] = formats
+
+        # Espaços nas bordas são raros: limpar só o que não foi reconhecido
+        if missing.any():
+            stripped = text[missing].str.strip()
+            retry, still_missing = self._apply_formats(stripped, formats)
+            parsed[missing] = retry.to_numpy(dtype="datetime64[ns]")
+            text = text.copy()
+            text[missing] = stripped
+            missing[missing] = still_missing
+
+        # Formatos fora da lista: análise por elemento, só nos valores restantes
+        if missing.any():
+            parsed[missing] = pd.to_datetime(
+                text[missing], format="mixed", dayfirst=True, errors="coerce"
+            ).to_numpy(dtype="datetime64[ns]")
+
+        return parsed
+
+    def detect(self, text: pd.Series) -> Tuple[str, ...]:
+        """
+        Detecta os formatos de uma amostra de textos de data.
+
+        Escolhe primeiro o formato que reconhece mais valores da amostra e
+        depois os que cobrem os valores restantes.
+
+        Returns:
+            Formatos em ordem de aplicação (vazio se nenhum reconhecer a amostra)
+        """
+        remaining = text.iloc[:self.sample_size].str.strip()
+        remaining = remaining[remaining != ""]
+        detected = []
+
+        while len(remaining):
+            best, best_matched = None, None
+            for fmt in self.formats:
+                if fmt in detected:
+                    continue
+                matched = self._convert(remaining, fmt).notna().to_numpy()
+                if matched.any() and (best_matched is None or matched.sum() > best_matched.sum()):
+                    best, best_matched = fmt, matched
+            if best is None:
+                break
+            detected.append(best)
+            remaining = remaining[~best_matched]
+
+        return tuple(detected)
+
+    def _apply_formats(self, text: pd.Series, formats: Sequence[str]) -> Tuple[pd.Series, np.ndarray]:
+        """Aplica os formatos em sequência às linhas ainda não convertidas."""
+        parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+        missing = (text != "").to_numpy()
+
+        for fmt in formats:
+            if not missing.any():
+                break
+            converted = self._convert(text[missing], fmt)
+            parsed[missing] = converted.to_numpy(dtype="datetime64[ns]")
+            missing &= parsed.isna().to_numpy()
+
+        return parsed, missing
+
+    @staticmethod
+    def _convert(text: pd.Series, fmt: str) -> pd.Series:
+        if fmt == EXCEL_SERIAL:
+            numbers = pd.to_numeric(text, errors="coerce").to_numpy(dtype=float)
+            return pd.Series(_from_serial(numbers), index=text.index)
+        return pd.to_datetime(text, format=fmt, errors="coerce")
+
+    def clear(self):
+        """Esquece os formatos memorizados."""
+        with self._lock:
+            self._detected.clear()
+
+
+# Compartilhado entre sessões: exportações costumam repetir o mesmo layout
+DATE_PARSER = DateParser()
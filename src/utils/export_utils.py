@@ -2,12 +2,20 @@
 Utilitários para exportação de dados em diferentes formatos.
 """
 import pandas as pd
+import numpy as np
 from io import BytesIO
 import tempfile
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, List, Optional
 import logging
 
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+from ..config.settings import EXPORT_CONFIG
+
 try:
     from docx import Document
     from docx.shared import Inches
@@ -23,6 +31,41 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+
+def _column_widths(data: pd.DataFrame, sample_rows: int, max_width: int) -> List[float]:
+    """
+    Largura de cada coluna pelo maior texto (cabeçalho incluído), sem percorrer células.
+    
+    Colunas categóricas usam o comprimento das categorias; nas demais, acima
+    de sample_rows linhas, mede-se uma amostra espaçada uniformemente.
+    """
+    step = max(1, -(-len(data) // sample_rows)) if sample_rows else 1
+    widths = []
+    for position, column in enumerate(data.columns):
+        series = data.iloc[:, position]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.cat.categories[np.unique(series.cat.codes[series.cat.codes >= 0])]
+            lengths = pd.Series(values.astype(str)).str.len()
+        else:
+            lengths = series.iloc[::step].dropna().astype(str).str.len()
+        longest = max(len(str(column)), int(lengths.max()) if len(lengths) else 0)
+        widths.append(min(longest + 2, max_width))
+    return widths
+
+
+def _iter_excel_rows(data: pd.DataFrame, chunk_rows: int) -> Iterator[List[tuple]]:
+    """Linhas em tipos nativos do Python (nulos como None), convertidas bloco a bloco."""
+    for start in range(0, len(data), chunk_rows):
+        chunk = data.iloc[start:start + chunk_rows]
+        columns = []
+        for position in range(chunk.shape[1]):
+            series = chunk.iloc[:, position]
+            values = series.to_numpy(dtype=object)  # datas viram Timestamp (subclasse de datetime)
+            values[pd.isna(series).to_numpy()] = None
+            columns.append(values.tolist())
+        yield list(zip(*columns))
+
+
 class ExportManager:
     """Gerenciador de exportação de dados."""
     
@@ -33,6 +76,11 @@ class ExportManager:
         """
         Exporta dados para Excel.
         
+        A planilha é gravada em modo write-only do openpyxl: as linhas são
+        convertidas em blocos e escritas em fluxo, sem manter as células em
+        memória. A largura das colunas é calculada antes, pelo comprimento
+        dos textos no DataFrame, e os metadados vão no mesmo arquivo.
+        
         Args:
             data: DataFrame com os dados
             sheet_name: Nome da planilha
@@ -41,37 +89,35 @@ class ExportManager:
             Buffer com dados do Excel
         """
         buffer = BytesIO()
+        config = EXPORT_CONFIG["excel"]
         
         try:
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                # Planilha principal
-                data.to_excel(writer, sheet_name=sheet_name, index=False)
-                
-                # Formatação básica
-                workbook = writer.book
-                worksheet = writer.sheets[sheet_name]
-                
-                # Ajustar largura das colunas
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-                
-                # Adicionar metadados
-                metadata_sheet = workbook.create_sheet("Informações")
-                metadata_sheet['A1'] = "Relatório LogisticSmart"
-                metadata_sheet['A2'] = f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"
-                metadata_sheet['A3'] = f"Total de registros: {len(data)}"
-                
+            workbook = Workbook(write_only=True)
+            worksheet = workbook.create_sheet(sheet_name)
+            
+            # Larguras precisam ser definidas antes da primeira linha
+            widths = _column_widths(data, config["width_sample_rows"], config["max_column_width"])
+            for position, width in enumerate(widths, start=1):
+                worksheet.column_dimensions[get_column_letter(position)].width = width
+            
+            header = []
+            for column in data.columns:
+                cell = WriteOnlyCell(worksheet, value=str(column))
+                cell.font = Font(bold=True)
+                header.append(cell)
+            worksheet.append(header)
+            
+            for rows in _iter_excel_rows(data, config["write_chunk_rows"]):
+                for row in rows:
+                    worksheet.append(row)
+            
+            # Adicionar metadados
+            metadata_sheet = workbook.create_sheet("Informações")
+            metadata_sheet.append(["Relatório LogisticSmart"])
+            metadata_sheet.append([f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"])
+            metadata_sheet.append([f"Total de registros: {len(data)}"])
+            
+            workbook.save(buffer)
             buffer.seek(0)
             logger.info(f"Excel exportado com sucesso: {len(data)} registros")
             return buffer
@@ -0,0 +1,248 @@
+"""
+Cache em disco, em formato colunar, para arquivos já processados.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from ..config.settings import CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Incrementar sempre que o pré-processamento mudar o formato do DataFrame
+CACHE_FORMAT_VERSION = 5
+
+# Tamanho dos blocos lidos pelo digest incremental
+_DIGEST_BLOCK_SIZE = 8 * 1024 * 1024
+
+_METADATA_KEY = b"logisticsmart"
+
+
+def _arrow_text_types(arrow_type: Any) -> Any:
+    """Mantém colunas de texto como arrays Arrow (sem materializar objetos Python)."""
+    if arrow_type in (pa.string(), pa.large_string()):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def frame_to_buffer(df: pd.DataFrame) -> bytes:
+    """
+    Serializa um DataFrame para transferência entre processos.
+
+    Usa o formato Arrow IPC (colunar, sem conversão por objeto) quando o
+    pyarrow está disponível e pickle caso contrário.
+    """
+    if not PYARROW_AVAILABLE:
+        return pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def frame_from_buffer(buffer: bytes) -> pd.DataFrame:
+    """Reconstrói um DataFrame serializado por frame_to_buffer."""
+    if not PYARROW_AVAILABLE:
+        return pickle.loads(buffer)
+
+    with pa.ipc.open_stream(pa.py_buffer(buffer)) as reader:
+        return reader.read_all().to_pandas()
+
+
+def content_digest(source: Union[bytes, bytearray, memoryview, BinaryIO]) -> str:
+    """
+    Digest incremental (blake2b) do conteúdo de um upload.
+
+    O conteúdo é percorrido em blocos: buffers são lidos sem cópia e arquivos
+    sem carregar tudo em memória.
+
+    Args:
+        source: Conteúdo do arquivo ou objeto de arquivo binário
+
+    Returns:
+        Digest hexadecimal do conteúdo
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), _DIGEST_BLOCK_SIZE):
+            digest.update(view[start:start + _DIGEST_BLOCK_SIZE])
+    elif isinstance(source, BytesIO):
+        with source.getbuffer() as view:
+            for start in range(0, len(view), _DIGEST_BLOCK_SIZE):
+                digest.update(view[start:start + _DIGEST_BLOCK_SIZE])
+    else:
+        position = source.tell()
+        source.seek(0)
+        for block in iter(lambda: source.read(_DIGEST_BLOCK_SIZE), b""):
+            digest.update(block)
+        source.seek(position)
+
+    return digest.hexdigest()
+
+
+def make_cache_key(
+    file_content: Optional[bytes],
+    filename: str,
+    variant: str = "",
+    digest: Optional[str] = None,
+) -> str:
+    """
+    Gera a chave de cache a partir do conteúdo do arquivo.
+
+    Args:
+        file_content: Conteúdo do arquivo (ignorado se digest for informado)
+        filename: Nome do arquivo (apenas a extensão entra na chave)
+        variant: Opções de carregamento que alteram o resultado
+        digest: Digest do conteúdo já calculado por content_digest
+
+    Returns:
+        Chave hexadecimal estável para o conteúdo
+    """
+    digest = digest or content_digest(file_content)
+    key = f"v{CACHE_FORMAT_VERSION}:{Path(filename).suffix.lower()}:{variant}:{digest}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class DiskCache:
+    """
+    Cache LRU de DataFrames pré-processados em arquivos Arrow/Feather.
+
+    Os arquivos são gravados sem compressão e em um único bloco, de modo que
+    a leitura com memory-map devolve colunas numéricas e de datas como visões
+    somente leitura sobre o arquivo (sem cópia para o heap) e colunas de texto
+    como arrays Arrow. As páginas ficam no cache do sistema operacional e são
+    compartilhadas entre processos que abrem o mesmo arquivo.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_entries: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or CACHE_CONFIG["disk_cache_dir"])
+        self.max_entries = max_entries or CACHE_CONFIG["max_entries"]
+        self.enabled = PYARROW_AVAILABLE and CACHE_CONFIG.get("persist", True)
+        self.zero_copy = CACHE_CONFIG.get("memory_map", True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.feather"
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """
+        Lê uma entrada do cache usando memory-map.
+
+        Args:
+            key: Chave gerada por make_cache_key
+
+        Returns:
+            Tupla (dataframe, metadados) ou None se não houver entrada
+        """
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        if not path.exists():
+            return None
+
+        try:
+            table = feather.read_table(str(path), memory_map=True)
+            metadata = json.loads(table.schema.metadata[_METADATA_KEY])
+            if self.zero_copy:
+                df = table.to_pandas(split_blocks=True, types_mapper=_arrow_text_types)
+            else:
+                df = table.to_pandas()
+
+            self._touch(path)
+            return df, metadata
+
+        except Exception as e:
+            logger.warning(f"Entrada de cache inválida {path.name}: {e}")
+            self._remove(path)
+            return None
+
+    def put(self, key: str, df: pd.DataFrame, metadata: Dict[str, Any]) -> bool:
+        """
+        Grava um DataFrame pré-processado no cache.
+
+        Args:
+            key: Chave gerada por make_cache_key
+            df: DataFrame já pré-processado
+            metadata: Informações serializáveis em JSON (colunas detectadas etc.)
+
+        Returns:
+            True se a entrada foi gravada
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            schema_metadata = dict(table.schema.metadata or {})
+            schema_metadata[_METADATA_KEY] = json.dumps(metadata).encode()
+            table = table.replace_schema_metadata(schema_metadata)
+
+            # Gravação atômica para não expor arquivos parciais a outros processos
+            path = self._path(key)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            feather.write_feather(
+                table, str(tmp_path), compression="uncompressed", chunksize=max(table.num_rows, 1)
+            )
+            os.replace(tmp_path, path)
+            self._touch(path)
+
+            self._evict()
+            return True
+
+        except Exception as e:
+            logger.warning(f"Não foi possível gravar cache {key}: {e}")
+            return False
+
+    def _touch(self, path: Path):
+        """Atualiza o horário de acesso usado pela política LRU."""
+        # Horário explícito em ns: o relógio do sistema de arquivos é grosseiro demais
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _evict(self):
+        """Remove as entradas menos usadas recentemente além do limite."""
+        entries = sorted(
+            self.cache_dir.glob("*.feather"),
+            key=lambda p: p.stat().st_mtime_ns,
+            reverse=True
+        )
+
+        for path in entries[self.max_entries:]:
+            self._remove(path)
+            logger.debug(f"Entrada de cache removida: {path.name}")
+
+    def _remove(self, path: Path):
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            # No Windows um arquivo mapeado em memória não pode ser removido
+            logger.debug(f"Entrada de cache em uso {path.name}: {e}")
+
+    def clear(self):
+        """Remove todas as entradas do cache."""
+        if not self.cache_dir.exists():
+            return
+
+        for path in self.cache_dir.glob("*.feather"):
+            self._remove(path)
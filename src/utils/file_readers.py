@@ -0,0 +1,141 @@
+"""
+Leitores de arquivos com consumo de memória limitado.
+"""
+import codecs
+import csv
+import logging
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from ..config.settings import INGESTION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CSV_DELIMITERS = ";,\t|"
+
+# Encoding usado quando o arquivo não é UTF-8 (decodifica qualquer sequência de bytes)
+FALLBACK_ENCODING = "latin-1"
+
+# Conteúdo em memória ou caminho de um arquivo grande lido direto do disco
+CsvSource = Union[bytes, str, Path]
+
+
+def _open_source(source: CsvSource):
+    return BytesIO(source) if isinstance(source, bytes) else source
+
+
+def sniff_csv_format(file_content: CsvSource, sample_size: Optional[int] = None) -> Tuple[str, str]:
+    """
+    Detecta encoding e separador a partir de um prefixo do arquivo.
+
+    Args:
+        file_content: Conteúdo do arquivo (ou caminho)
+        sample_size: Quantidade de bytes analisados
+
+    Returns:
+        Tupla (encoding, separador)
+    """
+    sample_size = sample_size or INGESTION_CONFIG["sniff_bytes"]
+    if isinstance(file_content, bytes):
+        prefix = file_content[:sample_size]
+    else:
+        with open(file_content, "rb") as f:
+            prefix = f.read(sample_size)
+
+    if prefix.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    else:
+        encoding = "utf-8"
+
+    # Decodificador incremental tolera caractere multibyte cortado no fim do prefixo
+    try:
+        text = codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+    except UnicodeDecodeError:
+        encoding = FALLBACK_ENCODING
+        text = prefix.decode(encoding)
+
+    lines = text.splitlines()
+    # Última linha pode estar incompleta
+    sample = "\n".join(lines[:-1] if len(lines) > 1 else lines)
+
+    try:
+        separator = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        header = lines[0] if lines else ""
+        separator = ";" if header.count(";") >= header.count(",") else ","
+
+    return encoding, separator
+
+
+def read_csv_columns(file_content: CsvSource, encoding: str, separator: str) -> List[str]:
+    """Lê apenas o cabeçalho do CSV."""
+    header = pd.read_csv(_open_source(file_content), encoding=encoding, sep=separator, nrows=0)
+    return header.columns.tolist()
+
+
+def iter_csv_chunks(
+    file_content: CsvSource,
+    encoding: str,
+    separator: str,
+    chunk_size: Optional[int] = None,
+    dtype: Optional[Dict[str, type]] = None,
+    usecols: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lê o CSV em blocos de tamanho fixo.
+
+    O encoding vem de um prefixo do arquivo; se um byte inválido aparecer
+    depois dele, a leitura continua em FALLBACK_ENCODING a partir da linha
+    em que parou.
+
+    Args:
+        file_content: Conteúdo do arquivo (ou caminho, lido do disco bloco a bloco)
+        encoding: Encoding detectado
+        separator: Separador detectado
+        chunk_size: Número de linhas por bloco
+        dtype: Tipos explícitos por coluna
+        usecols: Colunas a carregar (None carrega todas)
+
+    Yields:
+        DataFrames com no máximo chunk_size linhas
+    """
+    chunk_size = chunk_size or INGESTION_CONFIG["csv_chunk_size"]
+
+    def read(encoding: str):
+        return pd.read_csv(
+            _open_source(file_content),
+            encoding=encoding,
+            sep=separator,
+            dtype=dtype,
+            usecols=usecols,
+            chunksize=chunk_size,
+        )
+
+    rows_read = 0
+    columns = None
+    try:
+        with read(encoding) as reader:
+            for chunk in reader:
+                rows_read += len(chunk)
+                columns = chunk.columns
+                yield chunk
+        return
+    except UnicodeDecodeError as e:
+        if encoding == FALLBACK_ENCODING:
+            raise
+        # O prefixo analisado era UTF-8 válido, mas o restante do arquivo não é
+        logger.warning(f"CSV não é {encoding} após {rows_read} linhas ({e}); relendo como {FALLBACK_ENCODING}")
+
+    # Relê desde o início, descartando as linhas já entregues (cabeçalho como lido antes, ex.: sem BOM)
+    skip = rows_read
+    with read(FALLBACK_ENCODING) as reader:
+        for chunk in reader:
+            if skip >= len(chunk):
+                skip -= len(chunk)
+                continue
+            chunk = chunk.iloc[skip:] if skip else chunk
+            yield chunk if columns is None else chunk.set_axis(columns, axis=1)
+            skip = 0
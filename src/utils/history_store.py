@@ -0,0 +1,287 @@
+"""
+Histórico local de entregas em Parquet particionado por dia.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from ..config.settings import HISTORY_DIR
+from .indexes import day_values, row_fingerprints, to_day
+from .sketches import StatisticsSketch, new_statistics_sketch
+
+logger = logging.getLogger(__name__)
+
+# Hash do conteúdo de cada linha, gravado junto com os dados
+ROW_KEY_COLUMN = "_row_key"
+
+_PARTITION_PREFIX = "dia="
+_PARTITION_FILE = "dados.parquet"
+_SKETCH_FILE = "resumo.json"
+_METADATA_FILE = "_metadata.json"
+
+DayLike = Union[date, np.datetime64, str]
+
+
+def partition_day(path: Path) -> np.datetime64:
+    """Dia de uma partição a partir do caminho do arquivo."""
+    return np.datetime64(path.parent.name[len(_PARTITION_PREFIX):], "D")
+
+
+def row_keys(df: pd.DataFrame) -> np.ndarray:
+    """Chave de 64 bits de cada linha, calculada a partir dos valores (não do índice)."""
+    return row_fingerprints(df)
+
+
+class HistoryStore:
+    """
+    Histórico com uma partição Parquet por dia de entrega.
+
+    Cada upload é a versão completa dos dias que contém: os dias são
+    comparados com o histórico pelas chaves das linhas, e um dia alterado
+    tem a partição inteira substituída pelas linhas do upload (status
+    atualizados não viram linhas duplicadas). Os dias ausentes do upload
+    são mantidos. Uploads sem alguma coluna já gravada são recusados, para
+    que uma projeção não apague colunas do histórico. Leituras por período
+    abrem somente as partições dos dias pedidos. Cada partição tem ainda um
+    resumo de tamanho fixo (StatisticsSketch) para estatísticas aproximadas
+    sem ler as linhas.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or HISTORY_DIR)
+        self.enabled = PYARROW_AVAILABLE
+
+    def _partition_path(self, day: np.datetime64) -> Path:
+        return self.root / f"{_PARTITION_PREFIX}{day}" / _PARTITION_FILE
+
+    def partitions(self, start: Optional[DayLike] = None, end: Optional[DayLike] = None) -> List[Path]:
+        """Arquivos das partições no período (inclusive), em ordem de data."""
+        if not self.root.is_dir():
+            return []
+
+        lower = to_day(start) if start is not None else None
+        upper = to_day(end) if end is not None else None
+
+        partitions = []
+        for directory in sorted(self.root.glob(f"{_PARTITION_PREFIX}*")):
+            path = directory / _PARTITION_FILE
+            day = partition_day(path)
+            if (lower is None or day >= lower) and (upper is None or day <= upper) and path.exists():
+                partitions.append(path)
+        return partitions
+
+    def days(self) -> List[date]:
+        """Dias presentes no histórico."""
+        return [partition_day(path).astype(date) for path in self.partitions()]
+
+    def row_count(self, start: Optional[DayLike] = None, end: Optional[DayLike] = None) -> int:
+        """Número de linhas do período, lido dos metadados das partições."""
+        if not self.enabled:
+            return 0
+        return sum(pq.read_metadata(path).num_rows for path in self.partitions(start, end))
+
+    def schema(self, start: Optional[DayLike] = None, end: Optional[DayLike] = None) -> Optional["pa.Schema"]:
+        """Esquema unificado das partições do período (sem a chave das linhas)."""
+        partitions = self.partitions(start, end)
+        if not self.enabled or not partitions:
+            return None
+        schema = pa.unify_schemas(
+            [pq.read_schema(path) for path in partitions], promote_options="permissive"
+        )
+        if ROW_KEY_COLUMN in schema.names:
+            schema = schema.remove(schema.get_field_index(ROW_KEY_COLUMN))
+        return schema.remove_metadata()
+
+    def metadata(self) -> Dict[str, Any]:
+        """Metadados do último upload gravado (colunas originais e detectadas)."""
+        path = self.root / _METADATA_FILE
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def fingerprint(self, start: Optional[DayLike] = None, end: Optional[DayLike] = None) -> str:
+        """Identificador das partições do período (muda quando alguma é regravada)."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"history:{self.root.resolve()}".encode())
+        for path in self.partitions(start, end):
+            stat = path.stat()
+            digest.update(f"\0{path.parent.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    def ingest(
+        self,
+        df: pd.DataFrame,
+        date_column: str,
+        metadata: Dict[str, Any],
+        keys: Optional[np.ndarray] = None,
+    ) -> Dict[str, int]:
+        """
+        Incorpora um upload ao histórico, substituindo os dias alterados.
+
+        Args:
+            df: DataFrame pré-processado
+            date_column: Coluna de data que define a partição
+            metadata: Colunas originais e detectadas do upload
+            keys: Chaves das linhas já calculadas (padrão: row_keys(df))
+
+        Returns:
+            Contagem de dias novos, alterados e inalterados e de linhas gravadas
+
+        Raises:
+            ValueError: Se faltarem no upload colunas gravadas nos dias que ele substituiria
+        """
+        summary = {'added': 0, 'changed': 0, 'unchanged': 0, 'rows_written': 0}
+        if not self.enabled or df.empty:
+            return summary
+
+        days = day_values(df[date_column])
+        detected_columns = metadata.get('detected_columns', {})
+        if keys is None:
+            keys = row_keys(df)
+
+        order = np.argsort(days, kind="stable")
+        sorted_days = days[order]
+        valid = ~np.isnat(sorted_days)
+        order, sorted_days = order[valid], sorted_days[valid]
+        unique_days, starts = np.unique(sorted_days, return_index=True)
+        bounds = np.append(starts, len(order))
+
+        # Verificado antes de gravar: nenhum dia é substituído se o upload for recusado
+        columns = {str(column) for column in df.columns}
+        for day in unique_days:
+            path = self._partition_path(day)
+            if path.exists():
+                missing = set(pq.read_schema(path).names) - columns - {ROW_KEY_COLUMN}
+                if missing:
+                    raise ValueError(
+                        f"Colunas do histórico ausentes no upload ({day}): {', '.join(sorted(missing))}"
+                    )
+
+        for day, lower, upper in zip(unique_days, bounds[:-1], bounds[1:]):
+            positions = np.sort(order[lower:upper])
+            day_keys = keys[positions]
+            path = self._partition_path(day)
+
+            if path.exists():
+                stored = pq.read_table(path, columns=[ROW_KEY_COLUMN]).column(0).to_numpy()
+                if len(stored) == len(day_keys) and np.array_equal(np.sort(stored), np.sort(day_keys)):
+                    summary['unchanged'] += 1
+                    # Partições gravadas antes dos resumos recebem o seu aqui
+                    if not path.with_name(_SKETCH_FILE).exists():
+                        self._write_sketch(path, df.take(positions), detected_columns)
+                    continue
+                summary['changed'] += 1
+            else:
+                summary['added'] += 1
+
+            partition = df.take(positions).assign(**{ROW_KEY_COLUMN: day_keys})
+            self._write(path, partition)
+            self._write_sketch(path, partition, detected_columns)
+            summary['rows_written'] += len(partition)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / _METADATA_FILE).write_text(json.dumps(metadata), encoding="utf-8")
+
+        logger.info(f"Histórico atualizado: {summary}")
+        return summary
+
+    def _write(self, path: Path, partition: pd.DataFrame):
+        """Grava uma partição de forma atômica."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(partition, preserve_index=False)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table, str(tmp_path))
+        os.replace(tmp_path, path)
+
+    def _write_sketch(self, path: Path, partition: pd.DataFrame, detected_columns: Dict[str, str]):
+        """Grava o resumo das estatísticas de uma partição."""
+        sketch = new_statistics_sketch(detected_columns)
+        sketch.update(partition)
+        sketch_path = path.with_name(_SKETCH_FILE)
+        tmp_path = sketch_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(sketch.to_dict()), encoding="utf-8")
+        os.replace(tmp_path, sketch_path)
+
+    def sketch(self, start: Optional[DayLike] = None, end: Optional[DayLike] = None) -> Optional[StatisticsSketch]:
+        """
+        Resumo das estatísticas do período, combinando os resumos diários.
+
+        O custo depende do número de dias, não do número de linhas.
+
+        Returns:
+            StatisticsSketch do período ou None se alguma partição não tiver resumo
+        """
+        partitions = self.partitions(start, end)
+        if not partitions:
+            return None
+
+        merged: Optional[StatisticsSketch] = None
+        for path in partitions:
+            sketch_path = path.with_name(_SKETCH_FILE)
+            if not sketch_path.exists():
+                return None
+            sketch = StatisticsSketch.from_dict(json.loads(sketch_path.read_text(encoding="utf-8")))
+            if merged is None:
+                merged = sketch
+            else:
+                merged.merge(sketch)
+        return merged
+
+    def read(
+        self,
+        start: Optional[DayLike] = None,
+        end: Optional[DayLike] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Lê o histórico de um período.
+
+        Args:
+            start: Primeiro dia (None = desde o início)
+            end: Último dia (None = até o fim)
+            columns: Colunas a ler (None = todas)
+
+        Returns:
+            DataFrame com as linhas do período ou None se não houver partições
+        """
+        partitions = self.partitions(start, end)
+        if not self.enabled or not partitions:
+            return None
+
+        tables = []
+        for path in partitions:
+            schema_names = pq.read_schema(path).names
+            selected = None if columns is None else [c for c in columns if c in schema_names]
+            tables.append(pq.read_table(path, columns=selected))
+
+        table = pa.concat_tables(tables, promote_options="permissive")
+        df = table.to_pandas(coerce_temporal_nanoseconds=True)
+        df = df.drop(columns=[ROW_KEY_COLUMN], errors="ignore")
+
+        # Partições têm dicionários próprios: manter só as categorias do período, em ordem alfabética
+        for column in df.columns:
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                series = df[column].cat.remove_unused_categories()
+                df[column] = series.cat.set_categories(sorted(series.cat.categories))
+
+        return df
+
+    def clear(self):
+        """Remove todo o histórico."""
+        if self.root.exists():
+            shutil.rmtree(self.root)
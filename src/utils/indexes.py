@@ -0,0 +1,370 @@
+"""
+Índices construídos no carregamento para acelerar filtros.
+"""
+import logging
+import weakref
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .status import STATUS_UNKNOWN, StatusClassifier, status_mask
+
+logger = logging.getLogger(__name__)
+
+
+def _position_dtype(length: int) -> type:
+    return np.int32 if length < np.iinfo(np.int32).max else np.int64
+
+
+def to_day(value: Union[date, datetime, str]) -> np.datetime64:
+    """Converte datas do Python/pandas para datetime64 com resolução de dia."""
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def day_values(series: pd.Series) -> np.ndarray:
+    """Datas da coluna como datetime64[D] (NaT para nulos)."""
+    if getattr(series.dtype, "tz", None) is not None:
+        series = series.dt.tz_localize(None)
+    return series.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+
+
+def row_fingerprints(df: pd.DataFrame) -> np.ndarray:
+    """
+    Fingerprint de 64 bits de cada linha, calculado a partir dos valores (não do índice).
+
+    Combina os hashes vetorizados de cada coluna; colunas de texto e
+    categóricas são hasheadas por valor distinto.
+    """
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class _Postings:
+    """Posições das linhas agrupadas por valor (layout CSR)."""
+
+    def __init__(self, series: pd.Series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            labels = series.cat.categories.astype(str)
+        else:
+            codes, uniques = pd.factorize(series)
+            labels = pd.Index(uniques).astype(str)
+
+        self.codes = codes
+        self.labels = pd.Index(labels)
+
+        # Nulos (código -1) ficam no início da ordenação e são ignorados
+        self.order = np.argsort(codes, kind="stable").astype(_position_dtype(len(codes)))
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        first = len(codes) - counts.sum()
+        self.offsets = np.concatenate([[first], first + np.cumsum(counts)])
+
+    def value_codes(self, values: Sequence[str]) -> np.ndarray:
+        codes = self.labels.get_indexer(list(values))
+        return codes[codes >= 0]
+
+    def size(self, codes: np.ndarray) -> int:
+        return int((self.offsets[codes + 1] - self.offsets[codes]).sum())
+
+    def positions(self, codes: np.ndarray) -> np.ndarray:
+        postings = [self.order[self.offsets[c]:self.offsets[c + 1]] for c in codes]
+        if len(postings) == 1:
+            return postings[0]
+        return np.sort(np.concatenate(postings)) if postings else self.order[:0]
+
+
+class _FrameIndex:
+    """Base para índices ligados a um DataFrame específico."""
+
+    def __init__(self, df: pd.DataFrame):
+        self._frame = weakref.ref(df)
+        self.length = len(df)
+
+    def is_current(self, df: Optional[pd.DataFrame]) -> bool:
+        """Indica se o índice foi construído para este DataFrame."""
+        return df is not None and self._frame() is df and len(df) == self.length
+
+
+class DateIndex(_FrameIndex):
+    """
+    Índice ordenado da coluna de data.
+
+    Guarda as posições das linhas ordenadas por dia; filtros por dia ou por
+    período são localizados com busca binária (searchsorted) e resolvidos
+    como uma fatia dessas posições.
+    """
+
+    def __init__(self, df: pd.DataFrame, column: str):
+        super().__init__(df)
+        self.column = column
+
+        days = day_values(df[column])
+        # NaT fica no fim da ordenação e nunca entra nas fatias
+        self.order = np.argsort(days, kind="stable").astype(_position_dtype(len(days)))
+        self.sorted_days = days[self.order]
+
+    def positions(self, start: Union[date, datetime], end: Union[date, datetime]) -> np.ndarray:
+        """
+        Posições das linhas com data entre start e end (inclusive).
+
+        Returns:
+            Posições em ordem crescente
+        """
+        lower = np.searchsorted(self.sorted_days, to_day(start), side="left")
+        upper = np.searchsorted(self.sorted_days, to_day(end), side="right")
+        return np.sort(self.order[lower:upper])
+
+
+class FilterIndex(_FrameIndex):
+    """
+    Índice invertido valor → posições das linhas para as colunas detectadas.
+
+    Cada valor guarda a lista ordenada das posições das suas linhas. Uma
+    seleção com vários filtros parte da menor lista candidata e descarta as
+    posições que não atendem aos demais filtros consultando apenas os códigos
+    dessas posições, sem percorrer o DataFrame inteiro.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Sequence[str]):
+        super().__init__(df)
+        self._postings: Dict[str, _Postings] = {
+            column: _Postings(df[column]) for column in columns if column in df.columns
+        }
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._postings
+
+    def select(
+        self,
+        selections: Dict[str, List[str]],
+        candidates: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Resolve a interseção de filtros por valores.
+
+        Args:
+            selections: {coluna: valores aceitos}, todas indexadas
+            candidates: Posições ordenadas já selecionadas (ex.: pelo DateIndex)
+
+        Returns:
+            Posições ordenadas das linhas que atendem a todos os filtros
+        """
+        resolved = []
+        for column, values in selections.items():
+            postings = self._postings[column]
+            codes = postings.value_codes(values)
+            resolved.append((postings.size(codes), postings, codes))
+
+        # Começar pelo filtro mais seletivo
+        resolved.sort(key=lambda item: item[0])
+
+        if candidates is not None and (not resolved or len(candidates) <= resolved[0][0]):
+            positions = candidates
+        else:
+            _, postings, codes = resolved.pop(0)
+            positions = postings.positions(codes)
+            if candidates is not None:
+                positions = np.intersect1d(positions, candidates, assume_unique=True)
+
+        for _, postings, codes in resolved:
+            if len(positions) == 0:
+                break
+            positions = positions[np.isin(postings.codes[positions], codes)]
+
+        return positions
+
+
+class StatusIndex(_FrameIndex):
+    """Códigos de status (int8) de todas as linhas, calculados no carregamento."""
+
+    def __init__(self, df: pd.DataFrame, column: str, classifier: StatusClassifier):
+        super().__init__(df)
+        self.column = column
+        self.codes = classifier.codes(df[column])
+
+
+class RowFingerprints(_FrameIndex):
+    """
+    Fingerprints das linhas calculados no carregamento.
+
+    `rows` identifica a linha inteira (duplicatas exatas) e `near` combina só
+    as colunas-chave (ex.: pedido, dia e entregador), com datas reduzidas ao
+    dia, para apontar registros que provavelmente descrevem a mesma entrega.
+    Linhas com alguma coluna-chave nula não entram na verificação aproximada.
+    """
+
+    def __init__(self, df: pd.DataFrame, key_columns: Sequence[str] = (), date_column: Optional[str] = None):
+        super().__init__(df)
+        self.rows = row_fingerprints(df)
+        self.key_columns = tuple(key_columns)
+        self.near: Optional[np.ndarray] = None
+        self._near_valid: Optional[np.ndarray] = None
+        self._counts: Dict[bool, int] = {}
+
+        if self.key_columns:
+            keys = pd.DataFrame({
+                f"k{position}": (
+                    pd.Series(day_values(df[column]), index=df.index) if column == date_column else df[column]
+                )
+                for position, column in enumerate(self.key_columns)
+            }, copy=False)
+            self.near = row_fingerprints(keys)
+            self._near_valid = keys.notna().all(axis=1).to_numpy()
+
+    def duplicated(self, near: bool = False) -> Optional[np.ndarray]:
+        """Máscara das repetições (a primeira ocorrência de cada linha fica de fora)."""
+        if not near:
+            return pd.Series(self.rows).duplicated().to_numpy()
+        if self.near is None:
+            return None
+        mask = np.zeros(self.length, dtype=bool)
+        mask[self._near_valid] = pd.Series(self.near[self._near_valid]).duplicated().to_numpy()
+        return mask
+
+    def duplicate_count(self, near: bool = False) -> Optional[int]:
+        """Número de repetições exatas ou aproximadas (None sem colunas-chave)."""
+        if near and self.near is None:
+            return None
+        if near not in self._counts:
+            keys = self.near[self._near_valid] if near else self.rows
+            self._counts[near] = len(keys) - len(pd.unique(keys))
+        return self._counts[near]
+
+
+class AggregationCube(_FrameIndex):
+    """
+    Contagens pré-agregadas por (dia, colunas categóricas).
+
+    Cada célula guarda os códigos das dimensões e o número de linhas com essa
+    combinação. Filtros por valores, por período e por modo de status viram
+    uma máscara sobre as células, e contagens, totais e valores distintos são
+    somas dessas células em vez de varreduras das linhas.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        date_column: Optional[str],
+        columns: Sequence[str],
+        status_column: Optional[str] = None,
+        classifier: Optional[StatusClassifier] = None,
+    ):
+        super().__init__(df)
+        self.date_column = date_column
+        self.status_column = status_column
+
+        keys: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, Union[pd.Index, np.ndarray]] = {}
+
+        if date_column is not None:
+            codes, uniques = pd.factorize(day_values(df[date_column]))
+            keys[date_column] = codes
+            self.labels[date_column] = np.asarray(uniques, dtype="datetime64[D]")
+
+        for column in columns:
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                labels = series.cat.categories.astype(str)
+            else:
+                codes, uniques = pd.factorize(series)
+                labels = pd.Index(uniques).astype(str)
+            keys[column] = codes
+            self.labels[column] = pd.Index(labels)
+
+        cells = pd.DataFrame(keys).groupby(list(keys), sort=False).size()
+        cells = cells.reset_index(name="count")
+
+        self.codes: Dict[str, np.ndarray] = {
+            column: cells[column].to_numpy() for column in keys
+        }
+        self.counts = cells["count"].to_numpy(dtype=np.int64)
+
+        if date_column is not None:
+            day_codes = self.codes[date_column]
+            days = self.labels[date_column][np.maximum(day_codes, 0)]
+            self.days = np.where(day_codes >= 0, days, np.datetime64("NaT"))
+
+        # Código de status de cada célula, derivado da categoria
+        self.status_codes = None
+        if status_column in self.codes:
+            classifier = classifier or StatusClassifier()
+            lookup = np.fromiter(
+                (classifier.classify(label) for label in self.labels[status_column]),
+                dtype=np.int8,
+                count=len(self.labels[status_column])
+            )
+            lookup = np.append(lookup, np.int8(STATUS_UNKNOWN))
+            self.status_codes = lookup[self.codes[status_column]]
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def covers(self, columns: Sequence[str]) -> bool:
+        """Indica se todas as colunas são dimensões do cubo."""
+        return all(column in self.codes for column in columns)
+
+    def mask(
+        self,
+        values: Optional[Dict[str, List[str]]] = None,
+        day_bounds: Optional[Tuple[np.datetime64, np.datetime64]] = None,
+        status_type: str = "all",
+    ) -> np.ndarray:
+        """
+        Seleciona as células que atendem aos filtros.
+
+        Args:
+            values: {coluna: valores aceitos}, todas dimensões do cubo
+            day_bounds: Período (início, fim) inclusive
+            status_type: Modo de análise ('all', 'delivered' ou 'pending')
+
+        Returns:
+            Máscara booleana sobre as células
+        """
+        mask = np.ones(len(self.counts), dtype=bool)
+
+        for column, accepted in (values or {}).items():
+            codes = self.labels[column].get_indexer(list(accepted))
+            mask &= np.isin(self.codes[column], codes[codes >= 0])
+
+        if day_bounds is not None and self.date_column is not None:
+            start, end = day_bounds
+            mask &= (self.days >= start) & (self.days <= end)
+
+        if status_type != "all" and self.status_codes is not None:
+            mask &= status_mask(self.status_codes, status_type)
+
+        return mask
+
+    def total(self, mask: np.ndarray) -> int:
+        """Número de linhas nas células selecionadas."""
+        return int(self.counts[mask].sum())
+
+    def value_counts(self, column: str, mask: np.ndarray) -> pd.Series:
+        """Linhas por valor da coluna (na ordem das categorias, sem zeros)."""
+        codes = self.codes[column]
+        selected = mask & (codes >= 0)
+        counts = np.bincount(
+            codes[selected],
+            weights=self.counts[selected],
+            minlength=len(self.labels[column])
+        ).astype(np.int64)
+        result = pd.Series(counts, index=self.labels[column])
+        return result[result > 0]
+
+    def nunique(self, column: str, mask: np.ndarray) -> int:
+        """Número de valores distintos (não nulos) da coluna."""
+        codes = self.codes[column][mask]
+        present = np.bincount(codes[codes >= 0], minlength=len(self.labels[column]))
+        return int(np.count_nonzero(present))
+
+    def day_range(self, mask: np.ndarray) -> Optional[Tuple[np.datetime64, np.datetime64]]:
+        """Menor e maior dia entre as células selecionadas."""
+        if self.date_column is None:
+            return None
+        days = self.days[mask]
+        days = days[~np.isnat(days)]
+        if len(days) == 0:
+            return None
+        return days.min(), days.max()
@@ -0,0 +1,204 @@
+"""
+Varredura de qualidade dos dados em uma única passada por blocos.
+"""
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import INGESTION_CONFIG, QUALITY_CONFIG
+from .indexes import RowFingerprints, row_fingerprints
+from .sketches import BloomFilter, HyperLogLog
+
+
+class NumericMoments:
+    """Contagem, média e soma dos quadrados dos desvios, combináveis por bloco."""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray):
+        """Acrescenta um bloco de valores (NaN são ignorados)."""
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+
+        block = NumericMoments()
+        block.count = len(values)
+        block.mean = float(values.mean())
+        block.m2 = float(np.square(values - block.mean).sum())
+        self.merge(block)
+
+    def merge(self, other: "NumericMoments"):
+        """Combina momentos parciais (fórmula de Chan et al.)."""
+        if not other.count:
+            return
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        """Desvio padrão amostral (NaN com menos de dois valores, como no pandas)."""
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float('nan')
+
+
+class QualityScan:
+    """Métricas brutas de qualidade de um DataFrame."""
+
+    def __init__(self, rows: int, columns: List[str]):
+        self.rows = rows
+        self.columns = columns
+        self.null_counts = np.zeros(len(columns), dtype=np.int64)
+        self.duplicate_rows = 0
+        self.future_dates = 0
+        self.moments: Dict[str, NumericMoments] = {}
+
+    @property
+    def missing_cells(self) -> int:
+        return int(self.null_counts.sum())
+
+
+def scan_quality(
+    df: pd.DataFrame,
+    date_column: Optional[str] = None,
+    reference: Optional[pd.Timestamp] = None,
+    chunk_rows: Optional[int] = None,
+    fingerprints: Optional[RowFingerprints] = None,
+) -> QualityScan:
+    """
+    Calcula as métricas de qualidade percorrendo o DataFrame uma única vez.
+
+    Cada bloco de linhas é lido enquanto está no cache do processador:
+    nulos por coluna, hash de 64 bits por linha (duplicatas contadas no fim
+    sobre os hashes, sem comparar linhas inteiras), datas posteriores à
+    referência e momentos das colunas numéricas.
+
+    Args:
+        df: DataFrame a avaliar
+        date_column: Coluna de data de entrega
+        reference: Instante a partir do qual uma data é futura (padrão: agora)
+        chunk_rows: Linhas por bloco (padrão: INGESTION_CONFIG["quality_chunk_rows"])
+        fingerprints: Fingerprints calculados no carregamento (dispensam o hash das linhas)
+
+    Returns:
+        QualityScan com as métricas acumuladas
+    """
+    chunk_rows = chunk_rows or INGESTION_CONFIG['quality_chunk_rows']
+    reference = reference if reference is not None else pd.Timestamp.now()
+    if date_column not in df.columns:
+        date_column = None
+
+    scan = QualityScan(len(df), list(df.columns))
+    numeric_columns = list(df.select_dtypes(include=[np.number]).columns)
+    scan.moments = {col: NumericMoments() for col in numeric_columns}
+    hashes = None if fingerprints is not None else np.empty(len(df), dtype=np.uint64)
+
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+
+        scan.null_counts += chunk.isna().sum().to_numpy(dtype=np.int64)
+        if hashes is not None:
+            hashes[start:start + len(chunk)] = row_fingerprints(chunk)
+
+        if date_column is not None:
+            scan.future_dates += int((chunk[date_column] > reference).sum())
+
+        for col in numeric_columns:
+            scan.moments[col].update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+
+    if fingerprints is not None:
+        scan.duplicate_rows = fingerprints.duplicate_count()
+    else:
+        scan.duplicate_rows = len(hashes) - len(pd.unique(hashes))
+    return scan
+
+
+class QualityProfile:
+    """
+    Acumuladores de qualidade para arquivos lidos em blocos, com memória limitada.
+
+    Cada bloco atualiza nulos por coluna, momentos numéricos (Welford/Chan),
+    um HyperLogLog de valores distintos por coluna e um filtro de Bloom com
+    os fingerprints das linhas: repetições dentro do bloco são exatas e entre
+    blocos podem incluir uma fração de falsos positivos (duplicate_error,
+    que passa de error_rate quando o arquivo excede a capacidade do filtro).
+    """
+
+    def __init__(
+        self,
+        date_column: Optional[str] = None,
+        reference: Optional[pd.Timestamp] = None,
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        precision: Optional[int] = None,
+    ):
+        self.date_column = date_column
+        self.reference = reference if reference is not None else pd.Timestamp.now()
+        self.precision = precision or QUALITY_CONFIG['profile_hll_precision']
+        self.seen_rows = BloomFilter(
+            capacity or QUALITY_CONFIG['profile_bloom_rows'],
+            error_rate or QUALITY_CONFIG['profile_bloom_error'],
+        )
+        self.scan: Optional[QualityScan] = None
+        self.distinct: Dict[str, HyperLogLog] = {}
+        self._non_numeric: Set[str] = set()
+
+    def update(self, chunk: pd.DataFrame):
+        """Acrescenta um bloco já pré-processado."""
+        if self.scan is None:
+            self.scan = QualityScan(0, list(chunk.columns))
+            self.distinct = {col: HyperLogLog(self.precision) for col in chunk.columns}
+
+        scan = self.scan
+        scan.rows += len(chunk)
+        scan.null_counts += chunk.isna().sum().to_numpy(dtype=np.int64)
+        scan.duplicate_rows += self.seen_rows.add_new(row_fingerprints(chunk))
+
+        if self.date_column in chunk.columns:
+            scan.future_dates += int((chunk[self.date_column] > self.reference).sum())
+
+        numeric_columns = set(chunk.select_dtypes(include=[np.number]).columns)
+        for col in chunk.columns:
+            self.distinct[col].add(chunk[col])
+            # Como no DataFrame completo: um bloco não numérico torna a coluna não numérica
+            if col in numeric_columns:
+                moments = scan.moments.setdefault(col, NumericMoments())
+                moments.update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+            else:
+                self._non_numeric.add(col)
+
+    def result(self) -> QualityScan:
+        """Métricas acumuladas, no mesmo formato da varredura do DataFrame carregado."""
+        scan = self.scan or QualityScan(0, [])
+        scan.moments = {
+            col: scan.moments[col] for col in scan.columns
+            if col in scan.moments and col not in self._non_numeric
+        }
+        return scan
+
+    def distinct_counts(self) -> Dict[str, int]:
+        """Estimativa de valores distintos por coluna."""
+        return {col: sketch.estimate() for col, sketch in self.distinct.items()}
+
+    @property
+    def distinct_error(self) -> float:
+        """Erro padrão relativo das estimativas de distintos."""
+        return float(1.04 / np.sqrt(1 << self.precision))
+
+    @property
+    def duplicate_error(self) -> float:
+        """Taxa de falsos positivos das duplicatas entre blocos, pelas linhas já inseridas."""
+        return self.seen_rows.expected_error
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memória ocupada pelos sketches (não depende do número de linhas)."""
+        return self.seen_rows.memory_bytes + sum(sketch.registers.nbytes for sketch in self.distinct.values())
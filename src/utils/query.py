@@ -0,0 +1,201 @@
+"""
+Consultas preguiçosas sobre o DataFrame carregado.
+"""
+import copy
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import STATISTICS_CONFIG
+from .result_cache import canonical_key
+
+DayBounds = Tuple[np.datetime64, np.datetime64]
+
+
+class FilterQuery:
+    """
+    Consulta preguiçosa sobre os dados do DataProcessor.
+
+    Acumula predicados (período, valores por coluna, modo de status e faixas
+    numéricas) sem tocar nos dados. Na execução, período e categorias são
+    resolvidos pelos índices e os demais predicados são combinados numa única
+    máscara sobre as posições candidatas; só as colunas pedidas pela
+    agregação final são materializadas.
+
+    Com um backend SQL ativo no processador, a execução é delegada a ele.
+
+    Os métodos de construção devolvem uma nova consulta, sem alterar a atual.
+    """
+
+    def __init__(
+        self,
+        processor: Any,
+        values: Optional[Dict[str, List[str]]] = None,
+        day_bounds: Optional[DayBounds] = None,
+        status_type: str = 'all',
+        ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ):
+        self._processor = processor
+        self.values = dict(values or {})
+        self.day_bounds = day_bounds
+        self.status_type = status_type
+        self.ranges = dict(ranges or {})
+        self.columns = list(columns) if columns is not None else None
+        self._positions: Optional[np.ndarray] = None
+        self._executed = False
+
+    def _derive(self, **changes) -> 'FilterQuery':
+        params = {
+            'values': self.values,
+            'day_bounds': self.day_bounds,
+            'status_type': self.status_type,
+            'ranges': self.ranges,
+            'columns': self.columns,
+        }
+        params.update(changes)
+        return FilterQuery(self._processor, **params)
+
+    def signature(self) -> str:
+        """Hash canônico dos predicados (a projeção não altera as linhas)."""
+        return canonical_key({
+            'values': self.values,
+            'day_bounds': self.day_bounds,
+            'status_type': self.status_type,
+            'ranges': self.ranges,
+        })
+
+    # Construção
+
+    def where(self, column: str, values: Sequence[Any]) -> 'FilterQuery':
+        """Mantém as linhas cuja coluna está entre os valores informados."""
+        return self._derive(values=dict(self.values, **{column: [str(v) for v in values]}))
+
+    def between(self, start: np.datetime64, end: np.datetime64) -> 'FilterQuery':
+        """Mantém as linhas com data entre start e end (inclusive)."""
+        if self.day_bounds is not None:
+            start, end = max(start, self.day_bounds[0]), min(end, self.day_bounds[1])
+        return self._derive(day_bounds=(start, end))
+
+    def with_status(self, status_type: str) -> 'FilterQuery':
+        """Define o modo de análise ('all', 'delivered' ou 'pending')."""
+        return self._derive(status_type=status_type)
+
+    def where_range(self, column: str, low: float, high: float) -> 'FilterQuery':
+        """Mantém as linhas cuja coluna numérica está na faixa (inclusive)."""
+        return self._derive(ranges=dict(self.ranges, **{column: (float(low), float(high))}))
+
+    def select(self, columns: Sequence[str]) -> 'FilterQuery':
+        """Define as colunas materializadas por collect()."""
+        return self._derive(columns=columns)
+
+    # Execução
+
+    def positions(self) -> Optional[np.ndarray]:
+        """
+        Posições das linhas selecionadas (executadas uma única vez).
+
+        Returns:
+            Posições em ordem crescente ou None quando todas as linhas atendem
+        """
+        if not self._executed:
+            self._positions = self._processor._cached_result(
+                'positions', self, lambda: self._processor._select_positions(self)
+            )
+            self._executed = True
+        return self._positions
+
+    def count(self) -> int:
+        """Número de linhas selecionadas."""
+        return self._processor._cached_result('count', self, self._count)
+
+    def _count(self) -> int:
+        if self._processor.backend is not None:
+            return self._processor.backend.count(self)
+
+        cells = self._processor._cube_mask(self)
+        if cells is not None:
+            return self._processor.cube.total(cells)
+
+        positions = self.positions()
+        return len(self._processor.df) if positions is None else len(positions)
+
+    def collect(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Materializa o resultado.
+
+        Args:
+            columns: Colunas a materializar (padrão: as de select() ou todas)
+
+        Returns:
+            Novo DataFrame com as linhas selecionadas
+        """
+        df = self._processor.df
+        if df is None:
+            return pd.DataFrame()
+
+        columns = columns if columns is not None else self.columns
+        if self._processor.backend is not None:
+            return self._processor.backend.fetch(self, columns)
+
+        if columns is not None:
+            df = df[[column for column in columns if column in df.columns]]
+
+        positions = self.positions()
+        return df.copy() if positions is None else df.take(positions)
+
+    def group_by_deliverer(self) -> pd.DataFrame:
+        """Entregas por entregador, somando o cubo quando possível."""
+        return self._processor._cached_result('group_by_deliverer', self, self._group_by_deliverer).copy()
+
+    def _group_by_deliverer(self) -> pd.DataFrame:
+        processor = self._processor
+        deliverer_col = processor.detected_columns.get('entregador')
+
+        if processor.backend is not None and deliverer_col in processor.backend.schema:
+            return processor._deliverer_table(processor.backend.value_counts(deliverer_col, self))
+
+        cells = processor._cube_mask(self)
+        if cells is not None and processor.cube.covers([deliverer_col]):
+            return processor._deliverer_table(processor.cube.value_counts(deliverer_col, cells))
+
+        return processor.group_by_deliverer(self.collect([deliverer_col]))
+
+    def statistics(self, approximate: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Estatísticas do resultado, somando o cubo quando possível.
+
+        Args:
+            approximate: Responder pelos resumos de tamanho fixo quando a
+                consulta não tem filtros além do período (padrão:
+                STATISTICS_CONFIG["approximate"])
+        """
+        if approximate is None:
+            approximate = STATISTICS_CONFIG['approximate']
+        if approximate and not self.values and not self.ranges and self.status_type == 'all':
+            stats = self._processor._cached_result(
+                'approximate_statistics', self, lambda: self._processor._sketch_statistics(self.day_bounds)
+            )
+            if stats is not None:
+                return copy.deepcopy(stats)
+        return copy.deepcopy(self._processor._cached_result('statistics', self, self._statistics))
+
+    def _statistics(self) -> Dict[str, Any]:
+        processor = self._processor
+
+        if processor.backend is not None:
+            return processor.backend.statistics(self)
+
+        cells = processor._cube_mask(self)
+        if cells is not None:
+            total = processor.cube.total(cells)
+            if total == 0:
+                return {}
+            return processor._cube_statistics(processor._empty_statistics(total), cells)
+
+        columns = [
+            processor.detected_columns.get(column)
+            for column in ('data_entrega', 'entregador', 'cidade', 'status')
+        ]
+        return processor.get_statistics(self.collect([c for c in columns if c]))
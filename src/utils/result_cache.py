@@ -0,0 +1,145 @@
+"""
+Cache em memória dos resultados de consultas sobre o dataset carregado.
+"""
+import hashlib
+import json
+import logging
+import sys
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def _canonical(value: Any) -> Any:
+    """Converte filtros em uma estrutura JSON estável (ordem e tipos normalizados)."""
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_canonical(item) for item in value]
+        # Conjuntos de valores não dependem da ordem de seleção
+        return sorted(items, key=repr) if isinstance(value, (list, set, frozenset)) else items
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return value.isoformat()
+    if isinstance(value, np.datetime64):
+        return str(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def canonical_key(value: Any) -> str:
+    """
+    Gera o hash canônico de uma estrutura de filtros.
+
+    Listas e conjuntos são ordenados; tuplas (faixas e períodos) mantêm a ordem.
+
+    Args:
+        value: Dicionário de filtros ou estrutura equivalente
+
+    Returns:
+        Hash hexadecimal estável
+    """
+    payload = json.dumps(_canonical(value), sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Fingerprint do conteúdo de um DataFrame (colunas, tipos e valores)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _estimate_size(value: Any) -> int:
+    """Estimativa do espaço ocupado por um resultado, em bytes."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _estimate_size(key) + _estimate_size(item) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Cache LRU limitado por memória, com contadores de acertos e falhas."""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes or CACHE_CONFIG["result_cache_bytes"]
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, int]]' = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Retorna o resultado em cache ou calcula e guarda.
+
+        Args:
+            key: Chave do resultado (inclui o fingerprint do dataset)
+            compute: Função que produz o resultado
+
+        Returns:
+            Resultado (compartilhado entre chamadas: não deve ser alterado)
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        value = compute()
+        self._store(key, value)
+        return value
+
+    def _store(self, key: Hashable, value: Any):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Resultado de {size} bytes não cabe no cache")
+            return
+
+        self._entries[key] = (value, size)
+        self.total_bytes += size
+
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso do cache."""
+        requests = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / requests if requests else 0.0,
+        }
+
+    def clear(self):
+        """Remove todos os resultados (os contadores são mantidos)."""
+        self._entries.clear()
+        self.total_bytes = 0
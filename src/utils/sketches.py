@@ -0,0 +1,334 @@
+"""
+Estruturas probabilísticas de memória limitada para dados em fluxo.
+"""
+import base64
+import math
+import zlib
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import STATISTICS_CONFIG
+
+_U64 = np.uint64
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """Hash de 64 bits de cada valor não nulo (o mesmo para o mesmo valor em qualquer bloco)."""
+    values = values[values.notna()]
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Número de bits significativos de cada inteiro sem sinal (0 para zero)."""
+    _, length = np.frexp(values.astype(np.float64))
+    length = length.astype(np.int64)
+
+    # Acima de 2**53 a conversão para float pode arredondar para a próxima potência de 2
+    rounded_up = (values >> np.maximum(length - 1, 0).astype(np.uint64)) == 0
+    return length - (rounded_up & (values > 0))
+
+
+class HyperLogLog:
+    """
+    Contagem aproximada de valores distintos (HyperLogLog).
+
+    Usa 2**precision registradores de um byte; o erro padrão relativo é
+    1.04 / sqrt(2**precision) (1,6% com a precisão padrão 12, em 4 KB).
+    Sketches com a mesma precisão podem ser combinados com merge.
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision deve estar entre 4 e 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """Erro padrão relativo da estimativa."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add_hashes(self, hashes: np.ndarray):
+        """Acrescenta valores já convertidos em hashes de 64 bits."""
+        if not len(hashes):
+            return
+
+        hashes = hashes.astype(np.uint64, copy=False)
+        suffix_bits = 64 - self.precision
+        buckets = (hashes >> _U64(suffix_bits)).astype(np.intp)
+        suffix = hashes & _U64((1 << suffix_bits) - 1)
+
+        # Posição do primeiro bit 1 no sufixo (suffix_bits + 1 quando o sufixo é zero)
+        ranks = (suffix_bits - _bit_length(suffix) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def add(self, values: pd.Series):
+        """Acrescenta os valores não nulos de uma coluna."""
+        self.add_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog"):
+        """Combina outro sketch (mesma precisão) neste."""
+        if other.precision != self.precision:
+            raise ValueError("Sketches com precisões diferentes")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """Estimativa do número de valores distintos."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+
+        # Correção para poucos valores: contagem linear sobre registradores vazios
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom para pertinência aproximada de hashes de 64 bits.
+
+    Não tem falsos negativos; a taxa de falsos positivos fica perto de
+    error_rate enquanto o número de itens não passar de capacity e cresce
+    depois disso (ver expected_error).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.size = max(bits, 64)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        # Hashing duplo: posição i = h1 + i * h2, com as metades do hash de 64 bits
+        hashes = hashes.astype(np.uint64, copy=False)
+        first = hashes & _U64(0xFFFFFFFF)
+        second = (hashes >> _U64(32)) | _U64(1)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        return ((first[:, None] + steps[None, :] * second[:, None]) % _U64(self.size)).astype(np.int64)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Máscara dos hashes provavelmente já inseridos."""
+        positions = self._positions(hashes)
+        present = (self.bits[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1
+        return present.all(axis=1)
+
+    def add(self, hashes: np.ndarray):
+        """Insere hashes no filtro."""
+        if not len(hashes):
+            return
+        positions = self._positions(hashes).ravel()
+        np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        self.count += len(hashes)
+
+    def add_new(self, hashes: np.ndarray) -> int:
+        """
+        Insere hashes e conta os que provavelmente já tinham sido vistos.
+
+        Repetições dentro do próprio bloco são contadas de forma exata.
+
+        Returns:
+            Número de repetições (exatas no bloco, aproximadas entre blocos)
+        """
+        unique = pd.unique(hashes)
+        repeated = len(hashes) - len(unique)
+        seen = self.contains(unique) if len(unique) else np.zeros(0, dtype=bool)
+        self.add(unique[~seen])
+        return repeated + int(seen.sum())
+
+    @property
+    def expected_error(self) -> float:
+        """Taxa de falsos positivos esperada com os itens já inseridos."""
+        return float((1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count)
+
+    @property
+    def memory_bytes(self) -> int:
+        return int(self.bits.nbytes)
+
+
+class SpaceSaving:
+    """
+    Valores mais frequentes aproximados (Space-Saving) em memória limitada.
+
+    Guarda no máximo capacity valores com contagem e erro: a contagem real
+    fica entre count - error e count. `floor` limita a contagem de qualquer
+    valor descartado. Resumos podem ser combinados com merge (mergeable
+    summaries), então cada bloco ou dia pode ser resumido separadamente.
+    """
+
+    def __init__(self, capacity: int = 32):
+        self.capacity = max(int(capacity), 1)
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.floor = 0
+
+    def add(self, values: pd.Series):
+        """Acrescenta os valores não nulos de uma coluna."""
+        counts = values.value_counts(sort=False)
+        counts = counts[counts > 0]
+        block = SpaceSaving(self.capacity)
+        block.counts = {str(value): int(count) for value, count in counts.items()}
+        block.errors = dict.fromkeys(block.counts, 0)
+        block._truncate()
+        self.merge(block)
+
+    def merge(self, other: "SpaceSaving"):
+        """Combina outro resumo neste (valores ausentes de um lado contam como o floor dele)."""
+        items = set(self.counts) | set(other.counts)
+        self.counts = {
+            item: self.counts.get(item, self.floor) + other.counts.get(item, other.floor) for item in items
+        }
+        self.errors = {
+            item: self.errors.get(item, self.floor) + other.errors.get(item, other.floor) for item in items
+        }
+        self.floor += other.floor
+        self._truncate()
+
+    def _truncate(self):
+        if len(self.counts) <= self.capacity:
+            return
+        ranked = sorted(self.counts, key=lambda item: (-self.counts[item], item))
+        kept, dropped = ranked[:self.capacity], ranked[self.capacity:]
+        self.floor = max(self.floor, self.counts[dropped[0]])
+        self.counts = {item: self.counts[item] for item in kept}
+        self.errors = {item: self.errors[item] for item in kept}
+
+    def top(self, k: Optional[int] = None) -> pd.Series:
+        """Contagens estimadas dos valores mais frequentes, em ordem decrescente."""
+        ranked = sorted(self.counts, key=lambda item: (-self.counts[item], item))[:k]
+        return pd.Series({item: self.counts[item] for item in ranked}, dtype=np.int64)
+
+    @property
+    def max_error(self) -> int:
+        """Maior erro possível das contagens do resumo."""
+        return max(self.errors.values(), default=0)
+
+
+class StatisticsSketch:
+    """
+    Resumo de tamanho fixo para as estatísticas do painel.
+
+    Total de linhas e período são exatos; valores distintos vêm de um
+    HyperLogLog por coluna e os valores mais frequentes de um Space-Saving.
+    Pode ser construído bloco a bloco, combinado com outros resumos (ex.:
+    um por dia do histórico) e gravado em JSON.
+    """
+
+    def __init__(
+        self,
+        distinct_columns: Sequence[str] = (),
+        top_columns: Sequence[str] = (),
+        date_column: Optional[str] = None,
+        precision: int = 12,
+        capacity: int = 32,
+    ):
+        self.rows = 0
+        self.undated = 0  # linhas sem data (fora de qualquer filtro de período)
+        self.date_column = date_column
+        self.min_day: Optional[np.datetime64] = None
+        self.max_day: Optional[np.datetime64] = None
+        self.distinct = {column: HyperLogLog(precision) for column in distinct_columns}
+        self.top = {column: SpaceSaving(capacity) for column in top_columns}
+
+    def update(self, df: pd.DataFrame):
+        """Acrescenta um bloco de linhas."""
+        self.rows += len(df)
+
+        if self.date_column in df.columns:
+            days = df[self.date_column].dropna()
+            self.undated += len(df) - len(days)
+            if not days.empty:
+                low = days.min().to_datetime64().astype('datetime64[D]')
+                high = days.max().to_datetime64().astype('datetime64[D]')
+                self.min_day = low if self.min_day is None else min(self.min_day, low)
+                self.max_day = high if self.max_day is None else max(self.max_day, high)
+
+        for column, sketch in self.distinct.items():
+            if column in df.columns:
+                sketch.add(df[column])
+        for column, summary in self.top.items():
+            if column in df.columns:
+                summary.add(df[column])
+
+    def merge(self, other: "StatisticsSketch"):
+        """Combina outro resumo (mesmas colunas) neste."""
+        self.rows += other.rows
+        self.undated += other.undated
+        for day in (other.min_day, other.max_day):
+            if day is not None:
+                self.min_day = day if self.min_day is None else min(self.min_day, day)
+                self.max_day = day if self.max_day is None else max(self.max_day, day)
+
+        for column, sketch in other.distinct.items():
+            self.distinct.setdefault(column, HyperLogLog(sketch.precision)).merge(sketch)
+        for column, summary in other.top.items():
+            self.top.setdefault(column, SpaceSaving(summary.capacity)).merge(summary)
+
+    @property
+    def relative_error(self) -> float:
+        """Erro padrão relativo das contagens de distintos."""
+        return max((sketch.relative_error for sketch in self.distinct.values()), default=0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação serializável em JSON."""
+        return {
+            'rows': self.rows,
+            'undated': self.undated,
+            'date_column': self.date_column,
+            'min_day': None if self.min_day is None else str(self.min_day),
+            'max_day': None if self.max_day is None else str(self.max_day),
+            'distinct': {
+                column: {
+                    'precision': sketch.precision,
+                    'registers': base64.b64encode(zlib.compress(sketch.registers.tobytes())).decode('ascii'),
+                }
+                for column, sketch in self.distinct.items()
+            },
+            'top': {
+                column: {
+                    'capacity': summary.capacity, 'floor': summary.floor,
+                    'counts': summary.counts, 'errors': summary.errors,
+                }
+                for column, summary in self.top.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StatisticsSketch":
+        """Reconstrói um resumo gravado com to_dict."""
+        sketch = cls(date_column=data.get('date_column'))
+        sketch.rows = int(data['rows'])
+        sketch.undated = int(data.get('undated', 0))
+        sketch.min_day = np.datetime64(data['min_day'], 'D') if data.get('min_day') else None
+        sketch.max_day = np.datetime64(data['max_day'], 'D') if data.get('max_day') else None
+
+        for column, entry in data.get('distinct', {}).items():
+            hll = HyperLogLog(entry['precision'])
+            hll.registers = np.frombuffer(zlib.decompress(base64.b64decode(entry['registers'])), dtype=np.uint8).copy()
+            sketch.distinct[column] = hll
+
+        for column, entry in data.get('top', {}).items():
+            summary = SpaceSaving(entry['capacity'])
+            summary.floor = int(entry['floor'])
+            summary.counts = {item: int(count) for item, count in entry['counts'].items()}
+            summary.errors = {item: int(error) for item, error in entry['errors'].items()}
+            sketch.top[column] = summary
+
+        return sketch
+
+
+def new_statistics_sketch(detected_columns: Mapping[str, str]) -> StatisticsSketch:
+    """Resumo vazio com as colunas do painel (entregadores, cidades e status)."""
+    return StatisticsSketch(
+        distinct_columns=[detected_columns[t] for t in ('entregador', 'cidade') if detected_columns.get(t)],
+        top_columns=[detected_columns['status']] if detected_columns.get('status') else [],
+        date_column=detected_columns.get('data_entrega'),
+        precision=STATISTICS_CONFIG['hll_precision'],
+        capacity=STATISTICS_CONFIG['top_values'],
+    )
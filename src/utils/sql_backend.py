@@ -0,0 +1,434 @@
+"""
+Consultas SQL sobre o histórico local, sem carregar as linhas na sessão.
+"""
+import logging
+import sqlite3
+from abc import ABC, abstractmethod
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+from .history_store import PYARROW_AVAILABLE, ROW_KEY_COLUMN, HistoryStore, partition_day
+from .indexes import day_values
+from .status import STATUS_MODES, StatusClassifier
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = "entregas"
+
+# Dia de cada linha (dias desde 1970-01-01), usado nos filtros de período
+DAY_COLUMN = "_dia"
+
+_SQLITE_FILE = "_consulta.sqlite"
+_SQLITE_INSERT_ROWS = 50_000
+
+DayBounds = Tuple[np.datetime64, np.datetime64]
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _column_kind(arrow_type: Any) -> str:
+    """Tipo lógico de uma coluna do histórico: category, datetime, number ou text."""
+    if pa.types.is_dictionary(arrow_type):
+        return 'category'
+    if pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+        return 'datetime'
+    if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_boolean(arrow_type):
+        return 'number'
+    return 'text'
+
+
+def _sqlite_type(arrow_type: Any) -> str:
+    """Afinidade SQLite da coluna (datas gravadas como inteiros em ns)."""
+    kind = _column_kind(arrow_type)
+    if kind == 'datetime' or (kind == 'number' and not pa.types.is_floating(arrow_type)):
+        return 'INTEGER'
+    return 'REAL' if kind == 'number' else 'TEXT'
+
+
+def _day_number(day: np.datetime64) -> int:
+    return int(np.datetime64(day, "D").astype(np.int64))
+
+
+class SQLBackend(ABC):
+    """
+    Executa as consultas do DataProcessor em SQL sobre um período do histórico.
+
+    Os predicados de uma FilterQuery (período, valores por coluna, modo de
+    status e faixas numéricas) viram uma cláusula WHERE com a mesma semântica
+    da execução em memória; contagens, agrupamentos e estatísticas são
+    calculados pelo motor e só o resultado chega ao pandas.
+    """
+
+    engine = "sql"
+    text_type = "TEXT"
+
+    def __init__(
+        self,
+        schema: Dict[str, str],
+        detected_columns: Dict[str, str],
+        day_bounds: Optional[DayBounds] = None,
+        classifier: Optional[StatusClassifier] = None,
+    ):
+        self.schema = dict(schema)
+        self.detected_columns = dict(detected_columns)
+        self.day_bounds = day_bounds
+        self.classifier = classifier or StatusClassifier()
+        self._lock = threading.Lock()
+        self._status_values: Optional[List[Tuple[str, int]]] = None
+
+    # Motor
+
+    @abstractmethod
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        """Executa a consulta e devolve as linhas."""
+
+    @abstractmethod
+    def _fetch_frame(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        """Executa a consulta e devolve o resultado como DataFrame."""
+
+    def close(self):
+        """Fecha a conexão com o motor."""
+
+    # Predicados
+
+    def _where(self, query: Optional[Any]) -> Tuple[str, List[Any]]:
+        """Cláusula WHERE (com parâmetros) equivalente à consulta."""
+        clauses: List[str] = []
+        params: List[Any] = []
+
+        bounds = [self.day_bounds] if self.day_bounds is not None else []
+        if query is not None and query.day_bounds is not None:
+            bounds.append(query.day_bounds)
+        if bounds:
+            clauses.append(f"{DAY_COLUMN} BETWEEN ? AND ?")
+            params.extend([
+                max(_day_number(lower) for lower, _ in bounds),
+                min(_day_number(upper) for _, upper in bounds),
+            ])
+
+        if query is not None:
+            for column, values in query.values.items():
+                if column not in self.schema:
+                    continue
+                clauses.append(f"{self._text(column)} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+
+            for column, (low, high) in query.ranges.items():
+                if column in self.schema:
+                    clauses.append(f"{_quote(column)} BETWEEN ? AND ?")
+                    params.extend([low, high])
+
+            status_col = self.detected_columns.get('status')
+            if query.status_type in STATUS_MODES and status_col in self.schema:
+                accepted = self._status_matches(status_col, query.status_type)
+                if accepted:
+                    clauses.append(f"{_quote(status_col)} IN ({', '.join('?' * len(accepted))})")
+                    params.extend(accepted)
+                else:
+                    clauses.append("1 = 0")
+
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _text(self, column: str) -> str:
+        """Expressão da coluna como texto (filtros comparam valores em texto)."""
+        if self.schema[column] in ('category', 'text'):
+            return _quote(column)
+        return f"CAST({_quote(column)} AS {self.text_type})"
+
+    def _status_matches(self, status_col: str, status_type: str) -> List[str]:
+        """Valores distintos de status que atendem ao modo (classificados uma única vez)."""
+        if self._status_values is None:
+            where, params = self._where(None)
+            rows = self._execute(
+                f"SELECT DISTINCT {_quote(status_col)} FROM {TABLE_NAME}{where}"
+                f"{' AND' if where else ' WHERE'} {_quote(status_col)} IS NOT NULL",
+                params,
+            )
+            self._status_values = [(value, self.classifier.classify(str(value))) for value, in rows]
+
+        flag = STATUS_MODES[status_type]
+        return [value for value, code in self._status_values if code & flag]
+
+    # Consultas
+
+    def count(self, query: Optional[Any] = None) -> int:
+        """Número de linhas que atendem à consulta."""
+        where, params = self._where(query)
+        return int(self._execute(f"SELECT COUNT(*) FROM {TABLE_NAME}{where}", params)[0][0])
+
+    def value_counts(self, column: str, query: Optional[Any] = None) -> pd.Series:
+        """Contagem por valor da coluna (valores em ordem alfabética, sem nulos)."""
+        where, params = self._where(query)
+        rows = self._execute(
+            f"SELECT {_quote(column)}, COUNT(*) FROM {TABLE_NAME}{where}"
+            f"{' AND' if where else ' WHERE'} {_quote(column)} IS NOT NULL"
+            f" GROUP BY {_quote(column)} ORDER BY {_quote(column)}",
+            params,
+        )
+        return pd.Series(
+            [count for _, count in rows],
+            index=pd.Index([value for value, _ in rows], name=column),
+            dtype=np.int64,
+        )
+
+    def distinct(self, column: str) -> List[str]:
+        """Valores distintos da coluna no período, como texto ordenado."""
+        if column not in self.schema:
+            return []
+        where, params = self._where(None)
+        rows = self._execute(
+            f"SELECT DISTINCT {self._text(column)} FROM {TABLE_NAME}{where}"
+            f"{' AND' if where else ' WHERE'} {_quote(column)} IS NOT NULL",
+            params,
+        )
+        return sorted(str(value) for value, in rows)
+
+    def statistics(self, query: Optional[Any] = None) -> Dict[str, Any]:
+        """Estatísticas no formato de DataProcessor.get_statistics."""
+        where, params = self._where(query)
+
+        deliverer_col = self.detected_columns.get('entregador')
+        city_col = self.detected_columns.get('cidade')
+        status_col = self.detected_columns.get('status')
+
+        select = ["COUNT(*)", f"MIN({DAY_COLUMN})", f"MAX({DAY_COLUMN})"]
+        for column in (deliverer_col, city_col):
+            select.append(f"COUNT(DISTINCT {_quote(column)})" if column in self.schema else "0")
+
+        total, min_day, max_day, deliverers, cities = self._execute(
+            f"SELECT {', '.join(select)} FROM {TABLE_NAME}{where}", params
+        )[0]
+        if not total:
+            return {}
+
+        stats = {
+            'total_records': int(total),
+            'date_range': None,
+            'unique_deliverers': int(deliverers),
+            'unique_cities': int(cities),
+            'status_distribution': {},
+        }
+
+        if min_day is not None:
+            stats['date_range'] = {
+                'min': np.datetime64(int(min_day), "D").astype(object),
+                'max': np.datetime64(int(max_day), "D").astype(object),
+            }
+
+        if status_col in self.schema:
+            counts = self.value_counts(status_col, query)
+            stats['status_distribution'] = counts.sort_values(ascending=False, kind='stable').to_dict()
+
+        return stats
+
+    def fetch(
+        self,
+        query: Optional[Any] = None,
+        columns: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Materializa as linhas da consulta.
+
+        Args:
+            query: Consulta (None = todo o período)
+            columns: Colunas a ler (None = todas)
+            limit: Número máximo de linhas
+
+        Returns:
+            DataFrame com os tipos do histórico (datas e categorias restaurados)
+        """
+        columns = [c for c in (columns if columns is not None else self.schema) if c in self.schema]
+        if not columns:
+            return pd.DataFrame()
+
+        where, params = self._where(query)
+        sql = f"SELECT {', '.join(_quote(c) for c in columns)} FROM {TABLE_NAME}{where}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        df = self._fetch_frame(sql, params)
+        for column in df.columns:
+            kind = self.schema[column]
+            if kind == 'datetime' and not pd.api.types.is_datetime64_any_dtype(df[column]):
+                df[column] = pd.to_datetime(df[column], unit='ns')
+            elif kind == 'category':
+                series = df[column].astype('category')
+                df[column] = series.cat.set_categories(sorted(series.cat.categories))
+        return df
+
+
+class DuckDBBackend(SQLBackend):
+    """Consultas DuckDB direto sobre as partições Parquet do histórico."""
+
+    engine = "duckdb"
+    text_type = "VARCHAR"
+
+    def __init__(
+        self,
+        history: HistoryStore,
+        date_column: str,
+        detected_columns: Dict[str, str],
+        day_bounds: Optional[DayBounds] = None,
+        classifier: Optional[StatusClassifier] = None,
+    ):
+        arrow_schema = history.schema(*(day_bounds or (None, None)))
+        schema = {field.name: _column_kind(field.type) for field in arrow_schema}
+        super().__init__(schema, detected_columns, day_bounds, classifier)
+
+        files = [str(path) for path in history.partitions(*(day_bounds or (None, None)))]
+        file_list = ", ".join("'" + path.replace("'", "''") + "'" for path in files)
+
+        self._connection = duckdb.connect()
+        self._connection.execute(
+            f"CREATE VIEW {TABLE_NAME} AS SELECT * EXCLUDE ({_quote(ROW_KEY_COLUMN)}), "
+            f"datediff('day', DATE '1970-01-01', CAST({_quote(date_column)} AS DATE)) AS {DAY_COLUMN} "
+            f"FROM read_parquet([{file_list}], union_by_name = true)"
+        )
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._connection.execute(sql, list(params)).fetchall()
+
+    def _fetch_frame(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        with self._lock:
+            return self._connection.execute(sql, list(params)).df()
+
+    def close(self):
+        self._connection.close()
+
+
+class SQLiteBackend(SQLBackend):
+    """
+    Consultas SQLite sobre uma cópia do histórico em historico/_consulta.sqlite.
+
+    A cópia é sincronizada por partição: só os dias cujo arquivo Parquet mudou
+    desde a última sincronização são regravados.
+    """
+
+    engine = "sqlite"
+
+    def __init__(
+        self,
+        history: HistoryStore,
+        date_column: str,
+        detected_columns: Dict[str, str],
+        day_bounds: Optional[DayBounds] = None,
+        classifier: Optional[StatusClassifier] = None,
+    ):
+        self._connection = sqlite3.connect(
+            str(history.root / _SQLITE_FILE), timeout=30, check_same_thread=False
+        )
+        schema = self._sync(history, date_column, day_bounds)
+        super().__init__(schema, detected_columns, day_bounds, classifier)
+
+    def _sync(
+        self,
+        history: HistoryStore,
+        date_column: str,
+        day_bounds: Optional[DayBounds],
+    ) -> Dict[str, str]:
+        """Atualiza a cópia com as partições do período e retorna o esquema."""
+        connection = self._connection
+        arrow_schema = history.schema(*(day_bounds or (None, None)))
+
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS _particoes (dia INTEGER PRIMARY KEY, assinatura TEXT)")
+            connection.execute("CREATE TABLE IF NOT EXISTS _colunas (nome TEXT PRIMARY KEY, tipo TEXT)")
+            connection.execute(f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} ({DAY_COLUMN} INTEGER)")
+            connection.execute(f"CREATE INDEX IF NOT EXISTS ix_{TABLE_NAME}_dia ON {TABLE_NAME} ({DAY_COLUMN})")
+
+            existing = {row[1] for row in connection.execute(f"PRAGMA table_info({TABLE_NAME})")}
+            for field in arrow_schema:
+                kind = _column_kind(field.type)
+                if field.name not in existing:
+                    connection.execute(f"ALTER TABLE {TABLE_NAME} ADD COLUMN {_quote(field.name)} {_sqlite_type(field.type)}")
+                connection.execute("INSERT OR REPLACE INTO _colunas VALUES (?, ?)", (field.name, kind))
+
+            synced = dict(connection.execute("SELECT dia, assinatura FROM _particoes"))
+            for path in history.partitions(*(day_bounds or (None, None))):
+                stat = path.stat()
+                signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+                day = _day_number(partition_day(path))
+                if synced.get(day) == signature:
+                    continue
+
+                connection.execute(f"DELETE FROM {TABLE_NAME} WHERE {DAY_COLUMN} = ?", (day,))
+                self._insert(pq.read_table(path).to_pandas(), date_column)
+                connection.execute("INSERT OR REPLACE INTO _particoes VALUES (?, ?)", (day, signature))
+                logger.debug(f"Partição {path.parent.name} copiada para o SQLite")
+
+        return dict(connection.execute("SELECT nome, tipo FROM _colunas"))
+
+    def _insert(self, df: pd.DataFrame, date_column: str):
+        """Insere uma partição convertendo datas para inteiros (ns) e categorias para texto."""
+        df = df.drop(columns=[ROW_KEY_COLUMN], errors="ignore")
+        days = day_values(df[date_column]).astype(np.int64)
+
+        for column in df.columns:
+            series = df[column]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                values = series.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+                df[column] = pd.Series(values, index=df.index, dtype=object).where(series.notna(), None)
+            elif isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+                df[column] = series.astype(object).where(series.notna(), None)
+        df[DAY_COLUMN] = days
+
+        columns = ", ".join(_quote(c) for c in df.columns)
+        placeholders = ", ".join("?" * len(df.columns))
+        sql = f"INSERT INTO {TABLE_NAME} ({columns}) VALUES ({placeholders})"
+        for start in range(0, len(df), _SQLITE_INSERT_ROWS):
+            chunk = df.iloc[start:start + _SQLITE_INSERT_ROWS]
+            self._connection.executemany(sql, chunk.itertuples(index=False, name=None))
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._connection.execute(sql, list(params)).fetchall()
+
+    def _fetch_frame(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        with self._lock:
+            cursor = self._connection.execute(sql, list(params))
+            return pd.DataFrame.from_records(
+                cursor.fetchall(), columns=[description[0] for description in cursor.description]
+            )
+
+    def close(self):
+        self._connection.close()
+
+
+def open_backend(
+    history: HistoryStore,
+    date_column: str,
+    detected_columns: Dict[str, str],
+    day_bounds: Optional[DayBounds] = None,
+    classifier: Optional[StatusClassifier] = None,
+) -> Optional[SQLBackend]:
+    """
+    Abre o backend SQL disponível para um período do histórico.
+
+    Usa DuckDB direto sobre o Parquet quando instalado; caso contrário, a
+    cópia SQLite do histórico.
+
+    Returns:
+        Backend pronto ou None se o histórico estiver indisponível
+    """
+    if not history.enabled or not history.partitions(*(day_bounds or (None, None))):
+        return None
+
+    backend_class = DuckDBBackend if DUCKDB_AVAILABLE else SQLiteBackend
+    return backend_class(history, date_column, detected_columns, day_bounds, classifier)
@@ -0,0 +1,77 @@
+"""
+Classificação de status de entrega em códigos compactos.
+"""
+import re
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import STATUS_CONFIG
+
+# Códigos em bits: um status pode atender aos dois grupos de indicadores
+STATUS_OTHER = 0
+STATUS_DELIVERED = 1
+STATUS_PENDING = 2
+STATUS_UNKNOWN = 4  # status ausente
+
+STATUS_MODES = {
+    'delivered': STATUS_DELIVERED,
+    'pending': STATUS_PENDING,
+}
+
+
+class StatusClassifier:
+    """Classifica textos de status, memorizando o resultado por valor distinto."""
+
+    def __init__(
+        self,
+        delivered_indicators: Optional[Iterable[str]] = None,
+        pending_indicators: Optional[Iterable[str]] = None,
+    ):
+        delivered = delivered_indicators or STATUS_CONFIG["delivered_indicators"]
+        pending = pending_indicators or STATUS_CONFIG["pending_indicators"]
+
+        self._delivered = re.compile("|".join(re.escape(i.lower()) for i in delivered))
+        self._pending = re.compile("|".join(re.escape(i.lower()) for i in pending))
+        self._memo: Dict[str, int] = {}
+
+    def classify(self, value: str) -> int:
+        """Retorna o código de um texto de status."""
+        code = self._memo.get(value)
+        if code is None:
+            text = value.lower()
+            code = STATUS_OTHER
+            if self._delivered.search(text):
+                code |= STATUS_DELIVERED
+            if self._pending.search(text):
+                code |= STATUS_PENDING
+            self._memo[value] = code
+        return code
+
+    def codes(self, series: pd.Series) -> np.ndarray:
+        """
+        Códigos int8 de uma coluna de status.
+
+        A classificação é feita uma vez por valor distinto (categoria) e
+        espalhada para as linhas com um único take.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series)
+
+        # Última posição da tabela atende o código -1 (nulo)
+        lookup = np.fromiter(
+            (self.classify(str(value)) for value in uniques),
+            dtype=np.int8,
+            count=len(uniques)
+        )
+        lookup = np.append(lookup, np.int8(STATUS_UNKNOWN))
+        return lookup[codes]
+
+
+def status_mask(codes: np.ndarray, status_type: str) -> np.ndarray:
+    """Máscara booleana das linhas que atendem ao modo de análise."""
+    return (codes & STATUS_MODES[status_type]) != 0
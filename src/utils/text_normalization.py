@@ -0,0 +1,93 @@
+"""
+Normalização vetorizada de texto sobre os valores distintos de cada coluna.
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# Marcas diacríticas separadas pela decomposição NFKD ('ã' -> 'a' + '~')
+_COMBINING_MARKS = r"[\u0300-\u036f]"
+
+
+def fold_text(values: pd.Index) -> pd.Index:
+    """Remove acentos e diferenças de caixa ('SÃO Paulo' -> 'sao paulo')."""
+    return (
+        values.str.normalize("NFKD")
+        .str.replace(_COMBINING_MARKS, "", regex=True)
+        .str.casefold()
+    )
+
+
+def clean_values(values: pd.Index, collapse_spaces: bool = False) -> pd.Index:
+    """
+    Converte valores distintos (sem nulos) em texto sem espaços nas bordas.
+
+    Args:
+        values: Valores distintos da coluna
+        collapse_spaces: Colapsar espaços internos repetidos
+    """
+    text = values.astype(str)
+    if collapse_spaces:
+        text = text.str.replace(r"\s+", " ", regex=True)
+    return text.str.strip()
+
+
+def normalize_strings(series: pd.Series, fold: bool = False) -> pd.Series:
+    """
+    Limpa uma coluna de texto numa única passada sobre os valores distintos.
+
+    Nulos viram texto vazio (sem passar pelo literal 'nan') e os demais
+    valores são convertidos em texto sem espaços nas bordas; o custo depende
+    da cardinalidade da coluna, não do número de linhas.
+
+    Args:
+        series: Coluna de objetos
+        fold: Remover também acentos e diferenças de caixa (chaves de comparação)
+
+    Returns:
+        Série de objetos com o mesmo índice
+    """
+    codes, uniques = pd.factorize(series)
+    cleaned = clean_values(pd.Index(uniques, dtype=object))
+    if fold:
+        cleaned = fold_text(cleaned)
+
+    # Código -1 (nulo) aponta para o texto vazio no fim do vetor
+    values = np.append(cleaned.to_numpy(dtype=object), "")
+    return pd.Series(values[codes], index=series.index, name=series.name)
+
+
+def merge_labels(labels: pd.Index, counts: np.ndarray, fold: bool = False) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Unifica rótulos equivalentes mantendo a grafia mais frequente.
+
+    Args:
+        labels: Rótulos já limpos
+        counts: Ocorrências de cada rótulo
+        fold: Considerar equivalentes rótulos que diferem só em acentos ou caixa
+
+    Returns:
+        Tupla (remap, categorias): remap[i] é a posição do rótulo i nas
+        categorias resultantes, ordenadas alfabeticamente
+    """
+    if not len(labels):
+        return np.empty(0, dtype=np.intp), labels
+
+    keys = fold_text(labels) if fold else labels
+    groups, _ = pd.factorize(keys)
+
+    # Rótulos repetidos somam as ocorrências antes da escolha da grafia
+    exact, _ = pd.factorize(labels)
+    totals = np.bincount(exact, weights=counts)[exact]
+
+    # Dentro de cada grupo, o rótulo mais frequente (empate: o que aparece antes)
+    order = np.lexsort((-totals, groups))
+    first = order[np.r_[True, groups[order][1:] != groups[order][:-1]]]
+    chosen = labels[first]
+
+    rank = np.empty(len(chosen), dtype=np.intp)
+    sort_order = np.argsort(chosen.to_numpy(dtype=object).astype(str), kind="stable")
+    rank[sort_order] = np.arange(len(chosen))
+
+    return rank[groups], chosen[sort_order]
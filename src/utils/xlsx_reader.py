@@ -0,0 +1,421 @@
+"""
+Leitor XLSX em streaming, direto do XML da planilha.
+"""
+import logging
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_datetime, is_timedelta_format
+from openpyxl.utils.datetime import from_excel
+
+from ..config.settings import INGESTION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_ROW = f"{_NS}row"
+_SHEET_DATA = f"{_NS}sheetData"
+_VALUE = f"{_NS}v"
+_TEXT = f"{_NS}t"
+_INLINE = f"{_NS}is"
+_RUN_TEXT = f"{_NS}r/{_NS}t"
+
+_EPOCH_1900 = datetime(1899, 12, 30)
+_EPOCH_1904 = datetime(1904, 1, 1)
+
+
+class _ExcelSerial(float):
+    """Número serial de data do Excel (célula numérica com formato de data)."""
+
+
+def _column_index(reference: str) -> int:
+    """Converte a referência da célula (ex.: 'AB12') no índice da coluna."""
+    index = 0
+    for char in reference:
+        if char.isdigit():
+            break
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def _rich_text(element: ET.Element) -> str:
+    """Texto de um <si> ou <is>, simples ou com formatação (runs)."""
+    text = element.find(_TEXT)
+    if text is not None:
+        return text.text or ""
+    return "".join(run.text or "" for run in element.iterfind(_RUN_TEXT))
+
+
+def _normalize_header(header: Sequence[Any]) -> List[Any]:
+    """Replica a nomeação de colunas do pandas (vazias e duplicadas)."""
+    names: List[Any] = []
+    seen: Dict[Any, int] = {}
+
+    for position, value in enumerate(header):
+        name = f"Unnamed: {position}" if value is None else value
+
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+
+        names.append(name)
+
+    return names
+
+
+class _WorkbookParts:
+    """Partes do pacote XLSX necessárias para ler a primeira planilha."""
+
+    def __init__(self, archive: zipfile.ZipFile):
+        self.archive = archive
+        self.sheet_path, self.epoch = self._read_workbook()
+        self.shared_strings = self._read_shared_strings()
+        self.date_styles, self.time_styles = self._read_date_styles()
+
+    def _read_workbook(self) -> Tuple[str, datetime]:
+        workbook = ET.fromstring(self.archive.read("xl/workbook.xml"))
+
+        properties = workbook.find(f"{_NS}workbookPr")
+        date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+
+        sheet = workbook.find(f"{_NS}sheets/{_NS}sheet")
+        relationship_id = sheet.get(f"{_REL_NS}id")
+
+        relationships = ET.fromstring(self.archive.read("xl/_rels/workbook.xml.rels"))
+        for relationship in relationships.iter(f"{_PKG_REL_NS}Relationship"):
+            if relationship.get("Id") == relationship_id:
+                target = relationship.get("Target")
+                break
+        else:
+            target = "worksheets/sheet1.xml"
+
+        if target.startswith("/"):
+            path = target.lstrip("/")
+        else:
+            path = posixpath.normpath(posixpath.join("xl", target))
+
+        return path, _EPOCH_1904 if date1904 else _EPOCH_1900
+
+    def _read_shared_strings(self) -> List[str]:
+        if "xl/sharedStrings.xml" not in self.archive.namelist():
+            return []
+
+        strings = []
+        for _, element in ET.iterparse(self.archive.open("xl/sharedStrings.xml")):
+            if element.tag == f"{_NS}si":
+                strings.append(_rich_text(element))
+                element.clear()
+        return strings
+
+    def _read_date_styles(self) -> Tuple[Set[str], Dict[str, bool]]:
+        """
+        Estilos com formato de data/hora.
+
+        Returns:
+            Tupla (estilos com parte de data, {estilo só de hora ou duração:
+            True se for duração}), como o openpyxl distingue datetime, time
+            e timedelta
+        """
+        if "xl/styles.xml" not in self.archive.namelist():
+            return set(), {}
+
+        styles = ET.fromstring(self.archive.read("xl/styles.xml"))
+        custom_formats = {
+            int(fmt.get("numFmtId")): fmt.get("formatCode")
+            for fmt in styles.iter(f"{_NS}numFmt")
+        }
+
+        date_styles: Set[str] = set()
+        time_styles: Dict[str, bool] = {}
+        cell_formats = styles.find(f"{_NS}cellXfs")
+        for index, cell_format in enumerate(cell_formats if cell_formats is not None else []):
+            format_id = int(cell_format.get("numFmtId", 0))
+            format_code = custom_formats.get(format_id, BUILTIN_FORMATS.get(format_id))
+            kind = is_datetime(format_code) if format_code else None
+            if kind is None:
+                continue
+            if is_timedelta_format(format_code):
+                time_styles[str(index)] = True
+            elif kind == "time":
+                time_styles[str(index)] = False
+            else:
+                date_styles.add(str(index))
+
+        return date_styles, time_styles
+
+
+def _cell_value(cell: ET.Element, parts: _WorkbookParts) -> Any:
+    """Converte o conteúdo de uma célula para o tipo Python correspondente."""
+    cell_type = cell.get("t", "n")
+
+    if cell_type == "inlineStr":
+        inline = cell.find(_INLINE)
+        return _rich_text(inline) if inline is not None else None
+
+    value = cell.find(_VALUE)
+    if value is None or value.text is None:
+        return None
+    text = value.text
+
+    if cell_type == "n":
+        style = cell.get("s")
+        if style in parts.date_styles:
+            return _ExcelSerial(text)
+        if style in parts.time_styles:
+            # Só hora (datetime.time) ou duração (timedelta), como no openpyxl
+            return from_excel(float(text), parts.epoch, timedelta=parts.time_styles[style])
+        return float(text)
+    if cell_type == "s":
+        return parts.shared_strings[int(text)]
+    if cell_type == "b":
+        return text == "1"
+    if cell_type == "d":
+        return pd.Timestamp(text)
+    # 'str' (resultado de fórmula) e 'e' (erro) ficam como texto
+    return text
+
+
+def _build_column(values: List[Any], epoch: datetime) -> Any:
+    """Monta o array tipado de uma coluna a partir dos valores lidos."""
+    present = [value for value in values if value is not None]
+    if not present:
+        return np.full(len(values), np.nan)
+
+    if all(type(value) is _ExcelSerial for value in present):
+        serials = np.array([np.nan if v is None else v for v in values], dtype=float)
+        dates = pd.to_datetime(serials, unit="D", origin=pd.Timestamp(epoch))
+        return dates.round("ms")
+
+    if all(type(value) is float for value in present):
+        numbers = np.array([np.nan if v is None else v for v in values], dtype=float)
+        if len(present) == len(values) and np.all(np.mod(numbers, 1) == 0):
+            return numbers.astype(np.int64)
+        return numbers
+
+    # Coluna mista: converter elemento a elemento
+    converted = np.empty(len(values), dtype=object)
+    for position, value in enumerate(values):
+        if type(value) is _ExcelSerial:
+            value = (pd.Timestamp(epoch) + pd.to_timedelta(float(value), unit="D")).round("ms")
+        elif type(value) is float and value.is_integer():
+            value = int(value)
+        converted[position] = np.nan if value is None else value
+    return converted
+
+
+def mixed_values(series: pd.Series) -> np.ndarray:
+    """Valores de uma coluna tipada como os de uma coluna mista (ver _build_column)."""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = series.astype(object)
+    else:
+        values = series.to_numpy(dtype=object)
+    converted = np.empty(len(values), dtype=object)
+    for position, value in enumerate(values):
+        if isinstance(value, (float, np.floating)) and float(value).is_integer():
+            value = int(value)
+        elif isinstance(value, np.integer):
+            value = int(value)
+        converted[position] = np.nan if pd.isna(value) else value
+    return converted
+
+
+def unify_chunk_dtypes(chunks: List[pd.DataFrame]) -> List[Any]:
+    """
+    Alinha os tipos de cada coluna entre os blocos, como numa leitura única.
+
+    Cada bloco infere os tipos das suas próprias linhas: uma coluna numérica
+    num bloco e mista no seguinte viraria float64 e object. Blocos sem
+    valores na coluna assumem o tipo dos demais; tipos ainda divergentes
+    (exceto int/float, que o pandas já combina) tornam a coluna mista em
+    todos os blocos. Colunas category são mantidas. Altera os blocos no lugar.
+
+    Returns:
+        Colunas com o tipo alterado em algum bloco
+    """
+    changed = []
+    if len(chunks) < 2:
+        return changed
+
+    for column in chunks[0].columns:
+        series = [chunk[column] for chunk in chunks]
+        if any(isinstance(s.dtype, pd.CategoricalDtype) for s in series):
+            continue
+
+        filled = [s for s in series if s.notna().any()]
+        dtypes = {s.dtype for s in filled}
+        if len(dtypes) == 1:
+            target = dtypes.pop()
+            empty = [chunk for chunk, s in zip(chunks, series) if s.dtype != target]
+            for chunk in empty:
+                chunk[column] = chunk[column].astype(target if target != np.int64 else float)
+            if empty:
+                changed.append(column)
+            continue
+        if not dtypes or all(pd.api.types.is_numeric_dtype(dtype) and dtype != bool for dtype in dtypes):
+            continue
+
+        for chunk, s in zip(chunks, series):
+            chunk[column] = mixed_values(s)
+        changed.append(column)
+
+    return changed
+
+
+def _build_frame(names: List[Any], rows: List[List[Any]], start: int, epoch: datetime) -> pd.DataFrame:
+    """Monta o DataFrame coluna a coluna a partir das linhas lidas."""
+    columns = zip(*rows) if rows else ([] for _ in names)
+    return pd.DataFrame(
+        {name: _build_column(list(values), epoch) for name, values in zip(names, columns)},
+        columns=names,
+        index=pd.RangeIndex(start, start + len(rows))
+    )
+
+
+def _iter_rows(parts: _WorkbookParts) -> Iterator[Dict[int, ET.Element]]:
+    """Itera as linhas da planilha como {índice da coluna: célula}."""
+    sheet_data = None
+
+    for event, element in ET.iterparse(parts.archive.open(parts.sheet_path), events=("start", "end")):
+        if event == "start":
+            if element.tag == _SHEET_DATA:
+                sheet_data = element
+            continue
+
+        if element.tag != _ROW:
+            continue
+
+        cells = {}
+        position = -1
+        for cell in element:
+            reference = cell.get("r")
+            position = _column_index(reference) if reference else position + 1
+            cells[position] = cell
+
+        yield cells
+
+        # Liberar a linha já processada
+        element.clear()
+        if sheet_data is not None:
+            sheet_data.clear()
+
+
+def _open_archive(source: Union[bytes, str, Path]) -> zipfile.ZipFile:
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    return zipfile.ZipFile(source)
+
+
+def read_xlsx_columns(source: Union[bytes, str, Path]) -> List[Any]:
+    """Lê apenas o cabeçalho da primeira planilha."""
+    with _open_archive(source) as archive:
+        parts = _WorkbookParts(archive)
+        for cells in _iter_rows(parts):
+            return _normalize_header(_header_values(cells, parts))
+    return []
+
+
+def _header_values(cells: Dict[int, ET.Element], parts: _WorkbookParts) -> List[Any]:
+    width = max(cells) + 1 if cells else 0
+    header = [None] * width
+    for position, cell in cells.items():
+        value = _cell_value(cell, parts)
+        if type(value) is float and value.is_integer():
+            value = int(value)
+        header[position] = value
+    return header
+
+
+ColumnSelection = Union[Sequence[Any], Callable[[List[Any]], Sequence[Any]], None]
+
+
+def iter_xlsx_chunks(
+    source: Union[bytes, str, Path],
+    columns: ColumnSelection = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lê a primeira planilha de um XLSX em blocos, direto do XML.
+
+    Células de colunas fora da projeção são descartadas antes de qualquer
+    conversão de valor, e cada coluna vira um array tipado (datas, números
+    ou texto) ao final de cada bloco.
+
+    Args:
+        source: Conteúdo do arquivo ou caminho
+        columns: Colunas a carregar (None carrega todas) ou função que
+            recebe o cabeçalho e devolve as colunas
+        chunk_size: Número de linhas por bloco
+
+    Yields:
+        DataFrames com no máximo chunk_size linhas (ao menos um, mesmo vazio)
+    """
+    chunk_size = chunk_size or INGESTION_CONFIG["xlsx_chunk_size"]
+
+    with _open_archive(source) as archive:
+        parts = _WorkbookParts(archive)
+        rows = _iter_rows(parts)
+
+        first = next(rows, None)
+        header = _normalize_header(_header_values(first, parts)) if first else []
+
+        if callable(columns):
+            columns = columns(header)
+
+        if columns is None:
+            positions = list(range(len(header)))
+        else:
+            positions = [header.index(column) for column in columns if column in header]
+        names = [header[position] for position in positions]
+        slots = {position: slot for slot, position in enumerate(positions)}
+
+        buffer: List[List[Any]] = []
+        offset = 0
+
+        for cells in rows:
+            values = [None] * len(slots)
+            empty = True
+
+            for position, cell in cells.items():
+                slot = slots.get(position)
+                if slot is None:
+                    continue
+                value = _cell_value(cell, parts)
+                if value is not None:
+                    values[slot] = value
+                    empty = False
+
+            if empty:
+                continue
+
+            buffer.append(values)
+            if len(buffer) >= chunk_size:
+                yield _build_frame(names, buffer, offset, parts.epoch)
+                offset += len(buffer)
+                buffer = []
+
+        if buffer or offset == 0:
+            yield _build_frame(names, buffer, offset, parts.epoch)
+
+
+def read_xlsx(
+    source: Union[bytes, str, Path],
+    columns: ColumnSelection = None,
+) -> pd.DataFrame:
+    """Lê um XLSX completo pelo leitor em blocos."""
+    chunks = list(iter_xlsx_chunks(source, columns=columns))
+    if len(chunks) == 1:
+        return chunks[0]
+    unify_chunk_dtypes(chunks)
+    return pd.concat(chunks)
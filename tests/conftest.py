@@ -0,0 +1,24 @@
+"""
+Configuração compartilhada dos testes
+"""
+import pytest
+
+from src.config.settings import CACHE_CONFIG
+from src.utils import column_mapping, data_processor, history_store
+from src.utils.column_mapping import ColumnMapper
+from src.utils.dataset import LoadCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_storage(tmp_path, monkeypatch):
+    """Cache em disco, mapeamentos de colunas, datasets e histórico em diretório temporário."""
+    storage = tmp_path / 'storage'
+    monkeypatch.setitem(CACHE_CONFIG, 'disk_cache_dir', storage / 'cache')
+    monkeypatch.setitem(CACHE_CONFIG, 'column_mappings_file', storage / 'column_mappings.json')
+
+    mapper = ColumnMapper(storage / 'column_mappings.json')
+    monkeypatch.setattr(column_mapping, 'COLUMN_MAPPER', mapper)
+    monkeypatch.setattr(data_processor, 'COLUMN_MAPPER', mapper)
+    monkeypatch.setattr(data_processor, 'LOAD_CACHE', LoadCache())
+    monkeypatch.setattr(history_store, 'HISTORY_DIR', storage / 'historico')
+    return storage
@@ -152,6 +152,7 @@ class TestAuthenticationManager:
         assert permissions['view_reports']
         assert permissions['export_data']
         assert permissions['manage_users']
+        assert permissions['manage_column_mappings']
         assert permissions['view_logs']
         assert permissions['advanced_filters']
     
@@ -163,6 +164,7 @@ class TestAuthenticationManager:
         assert permissions['view_reports']
         assert permissions['export_data']
         assert not permissions['manage_users']
+        assert not permissions['manage_column_mappings']
         assert not permissions['view_logs']
         assert permissions['advanced_filters']
     
@@ -174,6 +176,7 @@ class TestAuthenticationManager:
         assert permissions['view_reports']
         assert not permissions['export_data']
         assert not permissions['manage_users']
+        assert not permissions['manage_column_mappings']
         assert not permissions['view_logs']
         assert not permissions['advanced_filters']
     
@@ -0,0 +1,61 @@
+"""
+Testes para o carregamento em lote de relatórios
+"""
+import pandas as pd
+
+from src.utils.batch_loader import SOURCE_COLUMN, find_report_files
+from src.utils.data_processor import DataProcessor
+from src.utils.dataset import LoadCache
+from src.utils.file_cache import frame_from_buffer, frame_to_buffer
+
+
+def _write_reports(directory):
+    pd.DataFrame({
+        'Data prevista de entrega': ['2025-03-20', '2025-03-20'],
+        'Entregador': ['João', 'Maria'],
+        'Status': ['Entregue', 'Pendente'],
+    }).to_excel(directory / 'entregas_20-03.xlsx', index=False)
+    
+    (directory / 'entregas_21-03.csv').write_text(
+        "Data prevista de entrega;Motorista;Status;Peso\n"
+        "2025-03-21;Pedro;Entregue;3.5\n"
+        "2025-03-21;João;Em rota;1.0\n",
+        encoding='utf-8'
+    )
+    (directory / 'leia-me.txt').write_text("ignorado")
+    (directory / 'sem_data.csv').write_text("Entregador\nAna\n")
+
+
+class TestBatchLoader:
+    """Testes para o carregamento em lote"""
+    
+    def test_find_report_files(self, tmp_path):
+        _write_reports(tmp_path)
+        
+        names = [path.name for path in find_report_files(tmp_path)]
+        
+        assert names == ['entregas_20-03.xlsx', 'entregas_21-03.csv', 'sem_data.csv']
+    
+    def test_buffer_roundtrip_keeps_categories(self):
+        df = pd.DataFrame({'Entregador': pd.Categorical(['João', None, 'Maria'])}, index=[4, 5, 9])
+        
+        pd.testing.assert_frame_equal(frame_from_buffer(frame_to_buffer(df)), df)
+    
+    def test_load_reports_in_process_pool(self, tmp_path):
+        _write_reports(tmp_path)
+        processor = DataProcessor()
+        processor.load_cache = LoadCache()
+        
+        success, message, df = processor.load_reports(find_report_files(tmp_path), max_workers=2)
+        
+        assert success
+        assert '4 registros' in message and '1 arquivo(s) ignorado(s)' in message
+        assert df.index.tolist() == [0, 1, 2, 3]
+        # 'Motorista' alinhada à coluna detectada no primeiro arquivo
+        assert processor.detected_columns['entregador'] == 'Entregador'
+        assert df['Entregador'].tolist() == ['João', 'Maria', 'Pedro', 'João']
+        assert df[SOURCE_COLUMN].tolist() == ['entregas_20-03.xlsx'] * 2 + ['entregas_21-03.csv'] * 2
+        assert df['Peso'].isna().tolist() == [True, True, False, False]
+        
+        grouped = processor.query().with_status('pending').group_by_deliverer()
+        assert grouped['Entregador'].tolist() == ['João', 'Maria']
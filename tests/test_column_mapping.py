@@ -0,0 +1,117 @@
+"""
+Testes para a detecção de colunas com cache por layout
+"""
+import pandas as pd
+
+from src.config.settings import AUTO_FILTERS
+from src.utils.column_mapping import ColumnMapper, KeywordMatcher
+from src.utils.data_processor import DataProcessor
+from src.utils.dataset import LoadCache
+from src.utils.file_cache import DiskCache
+
+HEADER = ['Data prevista de entrega', 'Motorista', 'Município', 'Situação da entrega', 'Valor']
+
+
+class TestKeywordMatcher:
+    """Testes para o matcher de palavras-chave compilado"""
+
+    def test_priority_follows_group_order(self):
+        matcher = KeywordMatcher({'status': ['Status'], 'entregador': ['Entregador']})
+
+        assert matcher.first('Entregador / Status') == 'status'
+        assert matcher.first('ENTREGADOR') == 'entregador'
+        assert matcher.first('Cidade') is None
+        assert matcher.matches('Status do Entregador') == {'status', 'entregador'}
+
+
+class TestColumnMapper:
+    """Testes para o cache de layouts e os mapeamentos fixados"""
+
+    def test_layout_is_persisted(self, tmp_path):
+        mapper = ColumnMapper(tmp_path / 'mapeamentos.json')
+        layout = mapper.resolve(HEADER)
+        assert not (tmp_path / 'mapeamentos.json').exists()  # a detecção não grava em disco
+
+        assert layout.columns == {
+            'data_entrega': 'Data prevista de entrega', 'entregador': 'Motorista',
+            'cidade': 'Município', 'status': 'Situação da entrega'
+        }
+        assert layout.missing == []
+
+        mapper.pin({'cliente': None})
+        layout = mapper.resolve(HEADER)
+        reloaded = ColumnMapper(tmp_path / 'mapeamentos.json')
+        reloaded._detect = None  # layouts conhecidos não passam pela detecção
+        assert reloaded.resolve(HEADER) == layout
+
+    def test_missing_required_columns(self, tmp_path):
+        layout = ColumnMapper(tmp_path / 'mapeamentos.json').resolve(['Entregador', 'Cidade'])
+
+        assert layout.missing == ['Data prevista de entrega']
+        assert 'data_entrega' not in layout.columns
+
+    def test_pins_override_detection(self, tmp_path):
+        mapper = ColumnMapper(tmp_path / 'mapeamentos.json')
+        mapper.resolve(HEADER)
+
+        mapper.pin({'cliente': 'Município', 'status': None, 'data_entrega': 'Prazo'})
+        layout = mapper.resolve(HEADER + ['Prazo'])
+
+        assert layout.columns['cliente'] == 'Município'
+        assert 'cidade' not in layout.columns
+        assert 'status' not in layout.columns
+        assert layout.columns['data_entrega'] == 'Prazo'
+        assert ColumnMapper(tmp_path / 'mapeamentos.json').pins == mapper.pins
+
+        mapper.unpin(['status'])
+        assert mapper.resolve(HEADER).columns['status'] == 'Situação da entrega'
+
+
+    def test_layouts_dropped_when_keywords_change(self, tmp_path, monkeypatch):
+        mapper = ColumnMapper(tmp_path / 'mapeamentos.json')
+        mapper.resolve(HEADER)
+        mapper.pin({'cliente': None})
+
+        monkeypatch.setitem(AUTO_FILTERS, 'cidade', ['Município', 'Cidade'])
+        reloaded = ColumnMapper(tmp_path / 'mapeamentos.json')
+
+        assert reloaded.keywords_digest != mapper.keywords_digest
+        assert reloaded._layouts == {}
+        assert reloaded.pins == {'cliente': None}
+
+
+def test_load_cache_key_follows_detection_keywords(tmp_path, monkeypatch):
+    content = "Data prevista de entrega;Motorista\n2025-01-01;João\n".encode('utf-8')
+    processor = DataProcessor()
+    processor.load_cache = LoadCache()
+    processor.disk_cache = DiskCache(tmp_path / 'cache')
+    processor.column_mapper = ColumnMapper(tmp_path / 'mapeamentos.json')
+    processor.load_file(content, 'dados.csv')
+    assert processor.detected_columns.get('entregador') == 'Motorista'
+    fingerprint = processor.dataset.fingerprint
+
+    monkeypatch.setitem(AUTO_FILTERS, 'entregador', ['Entregador'])
+    processor.column_mapper = ColumnMapper(tmp_path / 'mapeamentos.json')
+    processor.load_file(content, 'dados.csv')
+
+    assert processor.dataset.fingerprint != fingerprint
+    assert 'entregador' not in processor.detected_columns
+
+
+def test_pinned_column_is_used_on_load(tmp_path):
+    processor = DataProcessor()
+    processor.load_cache = LoadCache()
+    processor.disk_cache = DiskCache(tmp_path / 'cache')
+    processor.column_mapper = ColumnMapper(tmp_path / 'mapeamentos.json')
+    content = "Prazo;Parceiro\n2025-01-01;João\n2025-01-02;Maria\n".encode('utf-8')
+
+    success, message, _ = processor.load_file(content, 'dados.csv')
+    assert not success and 'obrigatórias' in message
+
+    processor.column_mapper.pin({'data_entrega': 'Prazo', 'entregador': 'Parceiro'})
+    success, _, df = processor.load_file(content, 'dados.csv')
+
+    assert success
+    assert processor.detected_columns == {'data_entrega': 'Prazo', 'entregador': 'Parceiro'}
+    assert pd.api.types.is_datetime64_any_dtype(df['Prazo'])
+    assert isinstance(df['Parceiro'].dtype, pd.CategoricalDtype)
@@ -1,7 +1,10 @@
 """
 Testes para o módulo de processamento de dados.
 """
+import warnings
+
 import pytest
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from io import BytesIO
@@ -181,3 +184,280 @@ def test_load_file_unsupported_format():
     assert "não suportado" in message.lower()
     assert loaded_df is None
 
+
+
+def test_load_file_csv_latin1_semicolon():
+    """Testa carregamento de CSV latin-1 separado por ponto e vírgula."""
+    processor = DataProcessor()
+    content = (
+        "Data prevista de entrega;Entregador;Município\n"
+        "2025-01-01;João;São Paulo\n"
+        "2025-01-02;Maria;Brasília\n"
+        "inválida;Pedro;Goiânia\n"
+    ).encode('latin-1')
+    
+    success, message, loaded_df = processor.load_file(content, "entregas.csv")
+    
+    assert success
+    assert len(loaded_df) == 2  # Linha com data inválida é descartada
+    assert loaded_df['Município'].tolist() == ['São Paulo', 'Brasília']
+    assert processor.detected_columns['entregador'] == 'Entregador'
+
+
+def test_load_file_with_invalid_dates_does_not_write_to_slice():
+    """Testa descarte de datas inválidas sem atribuições sobre a fatia do bloco bruto."""
+    processor = DataProcessor()
+    content = "Data prevista de entrega;Entregador;Observações\n" + "".join(
+        f"{'xx' if i % 7 == 0 else '2025-01-0%d' % (i % 9 + 1)};E{i % 5}; nota {i} \n"
+        for i in range(20_000)
+    )
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', pd.errors.SettingWithCopyWarning)
+        success, message, loaded_df = processor.load_file(content.encode('utf-8'), "entregas.csv")
+    
+    assert success, message
+    assert len(loaded_df) == 20_000 - len(range(0, 20_000, 7))
+    assert isinstance(loaded_df['Entregador'].dtype, pd.CategoricalDtype)
+    assert loaded_df['Observações'].iloc[0] == 'nota 1'
+
+
+def test_load_file_projection_keeps_detected_and_extra_columns():
+    """Testa carregamento apenas das colunas reconhecidas e adicionais."""
+    processor = DataProcessor()
+    content = (
+        "Data prevista de entrega;Entregador;Observações;Valor;Código ERP\n"
+        "2025-01-01;João;frágil;10;A1\n"
+        "2025-01-02;Maria;;20;A2\n"
+    ).encode('utf-8')
+    
+    success, message, loaded_df = processor.load_file(
+        content, "entregas.csv", project_columns=True, extra_columns=('valor',)
+    )
+    
+    assert success
+    assert list(loaded_df.columns) == ['Data prevista de entrega', 'Entregador', 'Valor']
+    assert processor.original_columns == list(loaded_df.columns)
+
+
+def test_project_columns_from_header():
+    """Testa seleção de colunas a partir do cabeçalho."""
+    processor = DataProcessor()
+    header = ['ID', 'Data prevista de entrega', 'Motorista', 'Município', 'Peso']
+    
+    assert processor._project_columns(header) == ['Data prevista de entrega', 'Motorista', 'Município']
+    assert processor._project_columns(header, ('Peso',))[-1] == 'Peso'
+
+
+def test_preprocess_encodes_detected_columns_as_category():
+    """Testa codificação das colunas detectadas como category normalizada."""
+    processor = DataProcessor()
+    df = pd.DataFrame({
+        'Data prevista de entrega': ['2025-01-01', '2025-01-02', '2025-01-03', '2025-01-04'],
+        'Entregador': [' João ', 'João', 'Maria  Silva', None],
+        'Observações': [' a ', 'b', 'c', 'd']
+    })
+    processor.detected_columns = processor._detect_columns(df)
+    
+    result = processor._preprocess_dataframe(df)
+    
+    assert isinstance(result['Entregador'].dtype, pd.CategoricalDtype)
+    assert list(result['Entregador'].cat.categories) == ['João', 'Maria Silva']
+    assert result['Entregador'].isna().sum() == 1
+    assert result['Observações'].dtype == object
+
+
+def test_apply_filters_and_group_on_categories():
+    """Testa filtros e agrupamento sobre colunas category em blocos diferentes."""
+    processor = DataProcessor()
+    chunks = [
+        pd.DataFrame({
+            'Data prevista de entrega': ['2025-01-01', '2025-01-01'],
+            'Entregador': ['João', 'Maria'],
+            'Status': ['Entregue', 'Pendente']
+        }),
+        pd.DataFrame({
+            'Data prevista de entrega': ['2025-01-02', '2025-01-02'],
+            'Entregador': ['Pedro', 'João'],
+            'Status': ['Entregue', 'Em rota']
+        }, index=[2, 3]),
+    ]
+    
+    success, _, total = processor._ingest_chunks(iter(chunks))
+    
+    assert success and total == 4
+    assert list(processor.df['Entregador'].cat.categories) == ['João', 'Maria', 'Pedro']
+    
+    filtered = processor.apply_filters({'entregador': ['João', 'Pedro']})
+    pending = processor.filter_by_status(filtered, 'pending')
+    grouped = processor.group_by_deliverer(filtered)
+    
+    assert len(filtered) == 3
+    assert pending.index.tolist() == [3]
+    assert grouped['Entregador'].tolist() == ['João', 'Pedro']
+    assert grouped['Quantidade'].tolist() == [2, 1]
+
+
+def test_apply_filters_date_range_with_index():
+    """Testa filtros de dia e período, com e sem índice de datas."""
+    processor = DataProcessor()
+    processor.detected_columns = {'data_entrega': 'Data prevista de entrega', 'entregador': 'Entregador'}
+    processor.df = pd.DataFrame({
+        'Data prevista de entrega': pd.to_datetime(['2025-01-01', '2025-01-05', '2025-01-03', '2025-01-10']),
+        'Entregador': pd.Categorical(['João', 'Maria', 'João', 'João'])
+    })
+    filters = {
+        'date_range': (datetime(2025, 1, 1).date(), datetime(2025, 1, 5).date()),
+        'entregador': ['João']
+    }
+    
+    without_index = processor.apply_filters(filters)
+    processor._build_indexes()
+    with_index = processor.apply_filters(filters)
+    single_day = processor.apply_filters({'date_filter': datetime(2025, 1, 5).date()})
+    
+    assert without_index.index.tolist() == [0, 2]
+    assert with_index.index.tolist() == [0, 2]
+    assert single_day.index.tolist() == [1]
+
+
+def test_filter_by_status_uses_precomputed_codes():
+    """Testa o filtro de status com os códigos calculados no carregamento."""
+    processor = DataProcessor()
+    processor.detected_columns = {'status': 'Status'}
+    processor.df = pd.DataFrame({
+        'Status': pd.Categorical(['Entregue', 'Pendente', None, 'Em rota', 'Finalizado'])
+    })
+    processor._build_indexes()
+    
+    delivered = processor.filter_by_status(processor.df, 'delivered')
+    subset_pending = processor.filter_by_status(processor.df.iloc[2:], 'pending')
+    
+    assert processor.status_index.codes.dtype == 'int8'
+    assert delivered.index.tolist() == [0, 4]
+    assert subset_pending.index.tolist() == [3]
+
+
+def test_statistics_from_cube_match_rows():
+    """Testa agrupamento e estatísticas respondidos pelo cubo contra as linhas."""
+    processor = DataProcessor()
+    processor.detected_columns = {
+        'data_entrega': 'Data prevista de entrega',
+        'entregador': 'Entregador',
+        'cidade': 'Cidade',
+        'status': 'Status'
+    }
+    size = 4200
+    positions = np.arange(size)
+    processor.df = pd.DataFrame({
+        'Data prevista de entrega': pd.Timestamp('2025-01-01') + pd.to_timedelta(positions % 7, unit='D'),
+        'Entregador': pd.Categorical(np.array(['Ana', 'Bruno', 'Carla', 'Davi'])[positions % 4]),
+        'Cidade': pd.Categorical(np.array(['Rio', 'Santos', 'Campinas'])[positions % 3]),
+        'Status': pd.Categorical(np.array(['Entregue', 'Pendente', 'Em rota', 'Cancelado', 'Entregue'])[positions % 5]),
+    })
+    processor._build_indexes()
+    
+    filtered = processor.apply_filters({
+        'cidade': ['Rio', 'Santos'],
+        'date_range': (datetime(2025, 1, 2).date(), datetime(2025, 1, 5).date())
+    })
+    pending = processor.filter_by_status(filtered, 'pending')
+    
+    assert processor._cube_selection(pending) is not None
+    # Cópias não são recortes conhecidos: calculadas pelas linhas
+    assert processor._cube_selection(pending.copy()) is None
+    
+    pd.testing.assert_frame_equal(
+        processor.group_by_deliverer(pending),
+        processor.group_by_deliverer(pending.copy())
+    )
+    assert processor.get_statistics(pending) == processor.get_statistics(pending.copy())
+    assert processor.get_statistics(processor.df) == processor.get_statistics(processor.df.copy())
+
+
+def test_load_file_rehydrates_state_from_load_cache():
+    """Testa reaproveitamento do dataset carregado ao alternar entre arquivos."""
+    from src.utils.dataset import LoadCache
+    
+    processor = DataProcessor()
+    processor.load_cache = LoadCache(max_entries=2)
+    first = "Data prevista de entrega;Entregador\n2025-01-01;João\n2025-01-02;Maria\n".encode()
+    second = "Data prevista de entrega;Motorista;Cidade\n2025-01-01;Pedro;Rio\n".encode()
+    
+    _, _, first_df = processor.load_file(BytesIO(first), "a.csv")
+    processor.load_file(second, "b.csv")
+    assert processor.detected_columns.get('cidade') == 'Cidade'
+    
+    success, message, reloaded = processor.load_file(first, "a.csv")
+    
+    assert success and "2 registros" in message
+    assert reloaded is first_df
+    assert processor.dataset.df is first_df
+    assert 'cidade' not in processor.detected_columns
+    assert processor.filter_index.is_current(processor.df)
+    assert processor.apply_filters({'entregador': 'Maria'})['Entregador'].tolist() == ['Maria']
+    
+    with pytest.raises(AttributeError):
+        processor.dataset.df = None
+
+
+def test_load_file_keeps_frame_mapped_from_disk_cache(tmp_path):
+    """Testa que o DataFrame carregado é lido do arquivo Arrow mapeado, não do heap."""
+    from src.utils.dataset import LoadCache
+    from src.utils.file_cache import DiskCache, PYARROW_AVAILABLE
+    
+    if not PYARROW_AVAILABLE:
+        pytest.skip("pyarrow não instalado")
+    
+    processor = DataProcessor()
+    processor.disk_cache = DiskCache(tmp_path)
+    processor.load_cache = LoadCache()
+    content = (
+        "Data prevista de entrega;Entregador;Observações;Valor\n"
+        "2025-01-01;João;Frágil;10.5\n"
+        "2025-01-01;Maria;Portaria;20.0\n"
+        "2025-01-02;João;Frágil;7.25\n"
+    ).encode('utf-8')
+    
+    success, _, df = processor.load_file(content, "dados.csv")
+    
+    assert success
+    assert not df['Valor'].to_numpy().flags.writeable
+    assert isinstance(df['Observações'].dtype, pd.ArrowDtype)
+    
+    filtered = processor.apply_filters({'Observações': 'Frágil', 'Valor_range': (5.0, 12.0)})
+    assert filtered['Valor'].tolist() == [10.5, 7.25]
+    assert processor.get_filter_options('Observações') == ['Frágil', 'Portaria']
+    assert processor.validate_data_quality(df)['quality_score'] > 0
+
+
+def test_failed_load_keeps_previous_state(monkeypatch):
+    """Testa que um carregamento que falha no meio não altera a sessão."""
+    from src.config.settings import INGESTION_CONFIG
+    from src.utils.dataset import LoadCache
+    
+    processor = DataProcessor()
+    processor.load_cache = LoadCache()
+    processor.load_file("Data prevista de entrega;Entregador\n2025-01-01;João\n".encode(), "a.csv")
+    df, detected = processor.df, dict(processor.detected_columns)
+    
+    # Falha no segundo bloco, depois da detecção das colunas do novo arquivo
+    preprocess = DataProcessor._preprocess_dataframe
+    calls = []
+    
+    def failing_preprocess(self, chunk, copy=True):
+        calls.append(len(chunk))
+        if len(calls) > 1:
+            raise ValueError("bloco inválido")
+        return preprocess(self, chunk, copy=copy)
+    
+    monkeypatch.setitem(INGESTION_CONFIG, 'csv_chunk_size', 1)
+    monkeypatch.setattr(DataProcessor, '_preprocess_dataframe', failing_preprocess)
+    success, _, _ = processor.load_file(
+        "Data prevista de entrega;Motorista;Cidade\n2025-01-01;Pedro;Rio\n2025-01-02;Ana;Rio\n".encode(), "b.csv"
+    )
+    
+    assert not success
+    assert processor.df is df
+    assert processor.detected_columns == detected
+    assert processor.group_by_deliverer(processor.df)['Entregador'].tolist() == ['João']
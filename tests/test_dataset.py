@@ -0,0 +1,106 @@
+"""
+Testes para o registro compartilhado de datasets
+"""
+import gc
+import threading
+import time
+
+import pandas as pd
+
+from src.utils.data_processor import DataProcessor
+from src.utils.dataset import LoadCache, LoadedDataset
+
+CSV_CONTENT = "Data prevista de entrega;Entregador\n2025-01-01;João\n2025-01-02;Maria\n".encode('utf-8')
+
+
+def _dataset(key):
+    return LoadedDataset(pd.DataFrame({'a': [1]}), ['a'], {}, key, 1)
+
+
+class TestLoadCache:
+    """Testes para o registro com contagem de referências"""
+
+    def test_referenced_datasets_are_not_evicted(self):
+        cache = LoadCache(max_entries=1)
+        cache.put('a', _dataset('a'))
+        cache.acquire('a')
+
+        cache.put('b', _dataset('b'))
+        assert 'a' in cache and 'b' in cache
+
+        cache.release('a')
+        assert 'a' not in cache and 'b' in cache
+
+    def test_clear_keeps_datasets_in_use(self):
+        cache = LoadCache()
+        cache.put('a', _dataset('a'))
+        cache.put('b', _dataset('b'))
+        cache.acquire('b')
+
+        cache.clear()
+
+        assert 'a' not in cache and 'b' in cache
+        assert cache.stats()['in_use'] == 1
+
+    def test_concurrent_loads_run_once(self):
+        cache = LoadCache()
+        calls = []
+
+        def load():
+            calls.append(1)
+            time.sleep(0.05)
+            return _dataset('a'), "carregado"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load('a', load)[0]))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert all(dataset is results[0] for dataset in results)
+
+    def test_failed_load_is_not_registered(self):
+        cache = LoadCache()
+
+        dataset, message = cache.get_or_load('a', lambda: (None, "erro"))
+
+        assert dataset is None and message == "erro"
+        assert 'a' not in cache
+
+
+class TestSharedDatasets:
+    """Testes para o compartilhamento entre sessões"""
+
+    def test_sessions_share_one_frame(self):
+        cache = LoadCache()
+        first, second = DataProcessor(), DataProcessor()
+        first.load_cache = second.load_cache = cache
+
+        first.load_file(CSV_CONTENT, 'dados.csv')
+        second.load_file(CSV_CONTENT, 'dados.csv')
+
+        assert second.df is first.df
+        assert cache.references(first.dataset.fingerprint) == 2
+
+    def test_references_follow_active_dataset(self):
+        cache = LoadCache()
+        processor = DataProcessor()
+        processor.load_cache = cache
+
+        processor.load_file(CSV_CONTENT, 'dados.csv')
+        key = processor.dataset.fingerprint
+        processor.load_file(CSV_CONTENT + "2025-01-03;Pedro\n".encode('utf-8'), 'dados.csv')
+
+        assert cache.references(key) == 0
+        assert cache.references(processor.dataset.fingerprint) == 1
+
+        key = processor.dataset.fingerprint
+        del processor
+        gc.collect()
+
+        assert cache.references(key) == 0
@@ -0,0 +1,66 @@
+"""
+Testes para a conversão de datas com formato memorizado por coluna
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.utils.date_parsing import EXCEL_SERIAL, DateParser
+
+
+class TestDateParser:
+    """Testes para o DateParser"""
+
+    def test_brazilian_formats_with_time_variants(self):
+        parser = DateParser()
+        series = pd.Series(['01/02/2025', '03/02/2025 14:30', '01/02/2025', None, 'inválida'])
+
+        result = parser.parse(series, 'Data')
+
+        assert result.tolist()[:3] == [
+            pd.Timestamp('2025-02-01'), pd.Timestamp('2025-02-03 14:30'), pd.Timestamp('2025-02-01')
+        ]
+        assert result.iloc[3:].isna().all()
+        assert set(parser.detected_formats('Data')) == {'%d/%m/%Y', '%d/%m/%Y %H:%M'}
+
+    def test_excel_serials_as_text_and_numbers(self):
+        parser = DateParser()
+
+        from_text = parser.parse(pd.Series(['45658', '45659.5']), 'texto')
+        from_numbers = parser.parse(pd.Series([45658.0, np.nan, 3.0]))
+
+        assert parser.detected_formats('texto') == (EXCEL_SERIAL,)
+        assert from_text.tolist() == [pd.Timestamp('2025-01-01'), pd.Timestamp('2025-01-02 12:00')]
+        assert from_numbers.iloc[0] == pd.Timestamp('2025-01-01')
+        assert from_numbers.iloc[1:].isna().all()
+
+    def test_spreadsheet_cells_mix_dates_and_text(self):
+        series = pd.Series([datetime(2025, 1, 5), '06/01/2025', 45663], dtype=object)
+
+        result = DateParser().parse(series, 'Data')
+
+        assert result.tolist() == [pd.Timestamp('2025-01-05'), pd.Timestamp('2025-01-06'), pd.Timestamp('2025-01-06')]
+
+    def test_datetime_columns_pass_through(self):
+        series = pd.Series(pd.to_datetime(['2025-01-01', '2025-01-02']))
+
+        assert DateParser().parse(series) is series
+
+    def test_cached_format_is_reused_and_redetected_on_change(self):
+        parser = DateParser()
+        parser.parse(pd.Series(['01/02/2025', '02/02/2025']), 'Data')
+        assert parser.detected_formats('Data') == ('%d/%m/%Y',)
+
+        result = parser.parse(pd.Series(['2025-03-01', '2025-03-02 08:00:00']), 'Data')
+
+        assert result.tolist() == [pd.Timestamp('2025-03-01'), pd.Timestamp('2025-03-02 08:00')]
+        assert '%d/%m/%Y' not in parser.detected_formats('Data')
+
+    def test_padded_and_unlisted_formats_fall_back(self):
+        parser = DateParser()
+        series = pd.Series([' 01/02/2025 ', '03/02/2025', '1 Feb 2025'])
+
+        result = parser.parse(series, 'Data')
+
+        assert result.tolist() == [pd.Timestamp('2025-02-01'), pd.Timestamp('2025-02-03'), pd.Timestamp('2025-02-01')]
@@ -0,0 +1,45 @@
+"""
+Testes para a exportação em Excel em streaming
+"""
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from src.config.settings import EXPORT_CONFIG
+from src.utils.export_utils import ExportManager, _column_widths
+
+
+def test_to_excel_round_trip(monkeypatch):
+    monkeypatch.setitem(EXPORT_CONFIG['excel'], 'write_chunk_rows', 2)
+    df = pd.DataFrame({
+        'Data prevista de entrega': pd.to_datetime(['2025-01-01', '2025-01-02', None]),
+        'Entregador': pd.Categorical(['João', None, 'Maria']),
+        'Peso': [1.5, np.nan, 3.0],
+        'Volumes': [1, 2, 3],
+    })
+
+    buffer = ExportManager().to_excel(df)
+    sheets = pd.read_excel(buffer, sheet_name=None)
+
+    assert list(sheets) == ['Relatório', 'Informações']
+    result = sheets['Relatório']
+    pd.testing.assert_series_equal(result['Data prevista de entrega'], df['Data prevista de entrega'], check_dtype=False)
+    assert result['Entregador'].fillna('').tolist() == ['João', '', 'Maria']
+    assert result['Peso'].isna().tolist() == [False, True, False]
+    assert result['Volumes'].tolist() == [1, 2, 3]
+    assert sheets['Informações'].iloc[-1, 0] == 'Total de registros: 3'
+
+
+def test_column_widths_follow_longest_text():
+    df = pd.DataFrame({
+        'A': ['curto', 'um texto bem mais longo'],
+        'Cidade': pd.Categorical(['SP', 'SP'], categories=['SP', 'Nome de categoria sem uso']),
+        'Observações': ['x' * 80, None],
+    })
+
+    assert _column_widths(df, sample_rows=10, max_width=50) == [25, 8, 50]
+
+    buffer = ExportManager().to_excel(df)
+    worksheet = load_workbook(buffer)['Relatório']
+    assert worksheet.column_dimensions['A'].width == 25
+    assert worksheet['A1'].font.b
@@ -0,0 +1,88 @@
+"""
+Testes para o cache colunar em disco.
+"""
+import pytest
+import pandas as pd
+
+from io import BytesIO
+
+from src.utils.file_cache import DiskCache, content_digest, make_cache_key, PYARROW_AVAILABLE
+
+pytestmark = pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow não instalado")
+
+
+class TestDiskCache:
+    """Testes para a classe DiskCache."""
+    
+    def test_make_cache_key_depends_on_content_and_extension(self):
+        """Testa que a chave muda com conteúdo e extensão."""
+        key = make_cache_key(b"abc", "a.xlsx")
+        
+        assert key == make_cache_key(b"abc", "outro_nome.xlsx")
+        assert key != make_cache_key(b"abd", "a.xlsx")
+        assert key != make_cache_key(b"abc", "a.csv")
+    
+    def test_content_digest_sources(self, tmp_path):
+        """Testa digest igual para bytes, buffers e arquivos."""
+        content = b"abc" * 1000
+        path = tmp_path / "upload.csv"
+        path.write_bytes(content)
+        
+        with open(path, "rb") as handle:
+            from_file = content_digest(handle)
+        
+        assert content_digest(content) == content_digest(BytesIO(content)) == from_file
+        assert make_cache_key(None, "a.csv", digest=from_file) == make_cache_key(content, "a.csv")
+    
+    def test_put_and_get_roundtrip(self, tmp_path):
+        """Testa gravação e leitura de uma entrada."""
+        cache = DiskCache(tmp_path, max_entries=5)
+        df = pd.DataFrame({
+            'Data prevista de entrega': pd.to_datetime(['2025-01-01', '2025-01-02']),
+            'Entregador': ['João', 'Maria']
+        }, index=[3, 7])
+        
+        assert cache.put("chave", df, {'detected_columns': {'entregador': 'Entregador'}})
+        
+        cached_df, metadata = cache.get("chave")
+        
+        # Texto volta como array Arrow (sem objetos Python por linha)
+        assert isinstance(cached_df['Entregador'].dtype, pd.ArrowDtype)
+        pd.testing.assert_frame_equal(cached_df.astype({'Entregador': object}), df)
+        assert metadata['detected_columns'] == {'entregador': 'Entregador'}
+    
+    def test_get_returns_views_over_mapped_file(self, tmp_path):
+        """Testa que colunas numéricas e de data não são copiadas para o heap."""
+        cache = DiskCache(tmp_path)
+        df = pd.DataFrame({
+            'Data prevista de entrega': pd.date_range('2025-01-01', periods=200_000, freq='min'),
+            'Peso': range(200_000),
+        })
+        cache.put("chave", df, {})
+        
+        cached_df, _ = cache.get("chave")
+        
+        for column in df.columns:
+            values = cached_df[column].to_numpy()
+            assert not values.flags.writeable
+            assert not values.flags.owndata
+    
+    def test_get_missing_entry(self, tmp_path):
+        """Testa leitura de chave inexistente."""
+        cache = DiskCache(tmp_path)
+        
+        assert cache.get("inexistente") is None
+    
+    def test_lru_eviction(self, tmp_path):
+        """Testa remoção das entradas menos usadas."""
+        cache = DiskCache(tmp_path, max_entries=2)
+        df = pd.DataFrame({'a': [1]})
+        
+        cache.put("k1", df, {})
+        cache.put("k2", df, {})
+        assert cache.get("k1") is not None  # k1 passa a ser a mais recente
+        cache.put("k3", df, {})
+        
+        assert cache.get("k2") is None
+        assert cache.get("k1") is not None
+        assert cache.get("k3") is not None
@@ -0,0 +1,69 @@
+"""
+Testes para os leitores de arquivos.
+"""
+import pandas as pd
+import pytest
+
+from src.utils.file_readers import sniff_csv_format, read_csv_columns, iter_csv_chunks
+
+
+class TestSniffCsvFormat:
+    """Testes para detecção de encoding e separador."""
+    
+    def test_utf8_semicolon(self):
+        """Testa CSV UTF-8 separado por ponto e vírgula."""
+        content = "Data prevista de entrega;Entregador\n01/01/2025;João\n".encode('utf-8')
+        
+        assert sniff_csv_format(content) == ('utf-8', ';')
+    
+    def test_latin1_comma(self):
+        """Testa CSV latin-1 separado por vírgula."""
+        content = "Data prevista de entrega,Município\n01/01/2025,São Paulo\n".encode('latin-1')
+        
+        assert sniff_csv_format(content) == ('latin-1', ',')
+    
+    def test_utf8_bom(self):
+        """Testa CSV UTF-8 com BOM."""
+        content = "Data;Cidade\n01/01/2025;Brasília\n".encode('utf-8-sig')
+        
+        encoding, separator = sniff_csv_format(content)
+        
+        assert encoding == 'utf-8-sig'
+        assert separator == ';'
+    
+    def test_truncated_multibyte_prefix(self):
+        """Testa prefixo cortado no meio de um caractere multibyte."""
+        content = "Data;Cidade\n01/01/2025;São Paulo\n".encode('utf-8')
+        cut = content.index("ã".encode('utf-8')) + 1
+        
+        encoding, _ = sniff_csv_format(content, sample_size=cut)
+        
+        assert encoding == 'utf-8'
+
+
+def test_iter_csv_chunks_respects_chunk_size():
+    """Testa leitura em blocos com tipos explícitos."""
+    rows = "\n".join(f"0{i % 9 + 1}/01/2025;{i:03d}" for i in range(25))
+    content = f"Data;Codigo\n{rows}\n".encode('utf-8')
+    
+    assert read_csv_columns(content, 'utf-8', ';') == ['Data', 'Codigo']
+    
+    chunks = list(iter_csv_chunks(content, 'utf-8', ';', chunk_size=10, dtype={'Codigo': str}))
+    
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert chunks[0]['Codigo'].iloc[0] == '000'
+
+
+def test_latin1_byte_after_sniffed_prefix():
+    rows = "".join(f"2025-01-01;Entregador {i}\n" for i in range(30_000))
+    content = ("Data prevista de entrega;Entregador\n" + rows + "2025-01-02;João\n").encode('latin-1')
+    assert content.index('ã'.encode('latin-1')) > 64 * 1024
+
+    encoding, separator = sniff_csv_format(content)
+    chunks = list(iter_csv_chunks(content, encoding, separator, chunk_size=1_000))
+    df = pd.concat(chunks, ignore_index=True)
+
+    assert encoding == 'utf-8'
+    assert len(df) == 30_001
+    assert df['Entregador'].iloc[-1] == 'João'
+    assert df['Entregador'].iloc[:-1].tolist() == [f'Entregador {i}' for i in range(30_000)]
@@ -0,0 +1,118 @@
+"""
+Testes para o histórico local em Parquet
+"""
+import pandas as pd
+import pytest
+
+from src.utils.data_processor import DataProcessor
+from src.utils.dataset import LoadCache
+from src.utils.history_store import PYARROW_AVAILABLE, HistoryStore
+
+pytestmark = pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow não instalado")
+
+
+def _upload(days, deliverers, statuses):
+    content = "Data prevista de entrega;Entregador;Status\n" + "".join(
+        f"{day};{deliverer};{status}\n"
+        for day, deliverer, status in zip(days, deliverers, statuses)
+    )
+    return content.encode('utf-8')
+
+
+def _processor(tmp_path):
+    processor = DataProcessor()
+    processor.history = HistoryStore(tmp_path / 'historico')
+    processor.load_cache = LoadCache()
+    return processor
+
+
+class TestHistoryStore:
+    """Testes para o histórico particionado por dia"""
+
+    def test_ingest_rewrites_only_changed_days(self, tmp_path):
+        processor = _processor(tmp_path)
+        processor.load_file(_upload(
+            ['2025-01-01', '2025-01-01', '2025-01-02'], ['João', 'Maria', 'Pedro'],
+            ['Entregue', 'Pendente', 'Entregue']
+        ), 'dia1.csv')
+
+        assert processor.save_history()[2] == {'added': 2, 'changed': 0, 'unchanged': 0, 'rows_written': 3}
+
+        store = processor.history
+        untouched = store._partition_path(pd.Timestamp('2025-01-01').to_datetime64().astype('datetime64[D]'))
+        mtime = untouched.stat().st_mtime_ns
+
+        processor.load_file(_upload(
+            ['2025-01-01', '2025-01-01', '2025-01-02', '2025-01-03'], ['João', 'Maria', 'Pedro', 'Ana'],
+            ['Entregue', 'Pendente', 'Pendente', 'Entregue']
+        ), 'dia2.csv')
+
+        assert processor.save_history()[2] == {'added': 1, 'changed': 1, 'unchanged': 1, 'rows_written': 2}
+        assert untouched.stat().st_mtime_ns == mtime
+        assert [day.isoformat() for day in store.days()] == ['2025-01-01', '2025-01-02', '2025-01-03']
+
+    def test_changed_day_is_replaced(self, tmp_path):
+        processor = _processor(tmp_path)
+        processor.load_file(_upload(['2025-01-01'] * 2, ['João', 'Maria'], ['Pendente', 'Pendente']), 'manha.csv')
+        processor.save_history()
+
+        processor.load_file(_upload(['2025-01-01'] * 2, ['João', 'Maria'], ['Entregue', 'Pendente']), 'tarde.csv')
+        processor.save_history()
+
+        df = processor.history.read()
+        assert df['Status'].tolist() == ['Entregue', 'Pendente']
+
+    def test_upload_missing_stored_columns_is_refused(self, tmp_path):
+        processor = _processor(tmp_path)
+        content = "Data prevista de entrega;Entregador;Valor\n2025-01-01;João;10\n2025-01-02;Maria;20\n"
+        processor.load_file(content.encode('utf-8'), 'completo.csv')
+        processor.save_history()
+        before = processor.history.read()
+
+        projected = content.replace("João", "Ana").encode('utf-8')
+        processor.load_file(projected, 'projetado.csv', project_columns=True, extra_columns=())
+        success, message, summary = processor.save_history()
+
+        assert not success and 'Valor' in message
+        assert summary == {}
+        pd.testing.assert_frame_equal(processor.history.read(), before)
+
+    def test_read_period(self, tmp_path):
+        processor = _processor(tmp_path)
+        processor.load_file(_upload(
+            ['2025-01-01', '2025-01-02', '2025-01-03'], ['João', 'Maria', 'Pedro'],
+            ['Entregue', 'Pendente', 'Entregue']
+        ), 'dados.csv')
+        processor.save_history()
+
+        df = processor.history.read('2025-01-02', '2025-01-03')
+
+        assert df['Entregador'].tolist() == ['Maria', 'Pedro']
+        assert list(df['Entregador'].cat.categories) == ['Maria', 'Pedro']
+        assert '_row_key' not in df.columns
+        assert processor.history.read('2025-02-01', '2025-02-28') is None
+
+    def test_load_history_restores_processor_state(self, tmp_path):
+        source = _processor(tmp_path)
+        source.load_file(_upload(
+            ['2025-01-01', '2025-01-02', '2025-01-02'], ['João', 'Maria', 'João'],
+            ['Entregue', 'Pendente', 'Entregue']
+        ), 'dados.csv')
+        source.save_history()
+
+        processor = _processor(tmp_path)
+        success, _, df = processor.load_history('2025-01-02', '2025-01-02')
+
+        assert success
+        assert len(df) == 2
+        assert processor.detected_columns['entregador'] == 'Entregador'
+        assert processor.query().with_status('delivered').count() == 1
+
+        grouped = processor.query().group_by_deliverer()
+        assert grouped['Entregador'].tolist() == ['João', 'Maria']
+
+    def test_load_history_without_data(self, tmp_path):
+        success, message, df = _processor(tmp_path).load_history()
+
+        assert not success
+        assert df is None
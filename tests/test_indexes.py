@@ -0,0 +1,125 @@
+"""
+Testes para os índices de filtro.
+"""
+import numpy as np
+import pandas as pd
+from datetime import date
+
+from src.utils.indexes import AggregationCube, DateIndex, FilterIndex, RowFingerprints
+
+
+def _sample_frame(size: int = 500) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        'Entregador': pd.Categorical(rng.choice(['João', 'Maria', 'Pedro', None], size)),
+        'Cidade': rng.choice(['São Paulo', 'Rio', 'Brasília'], size),
+    })
+    return df
+
+
+class TestFilterIndex:
+    """Testes para a classe FilterIndex."""
+    
+    def test_select_matches_scan(self):
+        """Testa equivalência entre índice e varredura completa."""
+        df = _sample_frame()
+        index = FilterIndex(df, ['Entregador', 'Cidade'])
+        
+        positions = index.select({'Entregador': ['João', 'Pedro'], 'Cidade': ['Rio']})
+        
+        expected = np.flatnonzero(
+            df['Entregador'].isin(['João', 'Pedro']).to_numpy() & (df['Cidade'] == 'Rio').to_numpy()
+        )
+        np.testing.assert_array_equal(positions, expected)
+    
+    def test_select_unknown_value(self):
+        """Testa seleção de valor inexistente."""
+        df = _sample_frame()
+        index = FilterIndex(df, ['Entregador'])
+        
+        assert len(index.select({'Entregador': ['Ninguém']})) == 0
+    
+    def test_is_current(self):
+        """Testa que o índice só vale para o DataFrame indexado."""
+        df = _sample_frame()
+        index = FilterIndex(df, ['Entregador'])
+        
+        assert index.is_current(df)
+        assert not index.is_current(df.copy())
+        assert 'Entregador' in index
+        assert 'Inexistente' not in index
+
+
+class TestDateIndex:
+    """Testes para a classe DateIndex."""
+    
+    def test_positions_by_day_and_range(self):
+        """Testa busca por dia e por período, ignorando datas nulas."""
+        df = pd.DataFrame({
+            'Data': pd.to_datetime([
+                '2025-01-03 10:00', '2025-01-01 00:00', None, '2025-01-02 23:59', '2025-01-03 00:00'
+            ])
+        })
+        index = DateIndex(df, 'Data')
+        
+        np.testing.assert_array_equal(index.positions(date(2025, 1, 3), date(2025, 1, 3)), [0, 4])
+        np.testing.assert_array_equal(index.positions(date(2025, 1, 1), date(2025, 1, 2)), [1, 3])
+        assert len(index.positions(date(2025, 2, 1), date(2025, 1, 1))) == 0
+
+
+class TestAggregationCube:
+    """Testes para a classe AggregationCube."""
+    
+    def test_counts_match_rows(self):
+        """Testa contagens do cubo contra a varredura das linhas."""
+        df = _sample_frame()
+        df['Data'] = pd.Timestamp('2025-01-01') + pd.to_timedelta(np.arange(len(df)) % 10, unit='D')
+        df['Status'] = pd.Categorical(np.where(np.arange(len(df)) % 3 == 0, 'Pendente', 'Entregue'))
+        cube = AggregationCube(df, 'Data', ['Entregador', 'Cidade', 'Status'], 'Status')
+        
+        cells = cube.mask(
+            values={'Cidade': ['Rio', 'Brasília']},
+            day_bounds=(np.datetime64('2025-01-03'), np.datetime64('2025-01-06')),
+            status_type='pending'
+        )
+        rows = df[
+            df['Cidade'].isin(['Rio', 'Brasília'])
+            & df['Data'].between('2025-01-03', '2025-01-06')
+            & (df['Status'] == 'Pendente')
+        ]
+        
+        assert len(cube) < len(df)
+        assert cube.total(cells) == len(rows)
+        assert cube.value_counts('Entregador', cells).to_dict() == \
+            rows['Entregador'].value_counts().loc[lambda c: c > 0].sort_index().to_dict()
+        assert cube.nunique('Cidade', cells) == rows['Cidade'].nunique()
+        assert cube.day_range(cells) == (np.datetime64('2025-01-03'), np.datetime64('2025-01-06'))
+
+
+class TestRowFingerprints:
+    """Testes para os fingerprints de duplicatas"""
+    
+    def test_exact_duplicates_match_pandas(self):
+        df = _sample_frame()
+        fingerprints = RowFingerprints(df)
+        
+        np.testing.assert_array_equal(fingerprints.duplicated(), df.duplicated().to_numpy())
+        assert fingerprints.duplicate_count() == df.duplicated().sum()
+        assert fingerprints.duplicated(near=True) is None
+    
+    def test_near_duplicates_use_order_day_and_deliverer(self):
+        df = pd.DataFrame({
+            'Pedido': ['A1', 'A1', 'A1', 'B2', None, None],
+            'Data': pd.to_datetime([
+                '2025-01-01 08:00', '2025-01-01 17:30', '2025-01-02 08:00',
+                '2025-01-01 08:00', '2025-01-01 08:00', '2025-01-01 08:00'
+            ]),
+            'Entregador': ['João', 'João', 'João', 'João', 'Maria', 'Maria'],
+            'Volume': [1, 2, 1, 1, 1, 1],
+        })
+        
+        fingerprints = RowFingerprints(df, ['Pedido', 'Data', 'Entregador'], 'Data')
+        
+        assert fingerprints.duplicated(near=True).tolist() == [False, True, False, False, False, False]
+        assert fingerprints.duplicate_count(near=True) == 1
+        assert fingerprints.duplicate_count() == 1
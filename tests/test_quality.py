@@ -0,0 +1,132 @@
+"""
+Testes para a varredura de qualidade em uma única passada
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.settings import INGESTION_CONFIG, QUALITY_CONFIG
+from src.utils.data_processor import DataProcessor
+from src.utils.dataset import LoadCache
+from src.utils.file_cache import DiskCache
+from src.utils.quality import scan_quality
+
+
+@pytest.fixture
+def sample_df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Data prevista de entrega': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 60, 500), unit='D'),
+        'Entregador': pd.Categorical(rng.choice(['João', 'Maria', None], 500)),
+        'Endereço': rng.choice(['Rua A', 'Rua B', 'Rua C'], 500).astype(object),
+        'Peso': np.where(rng.random(500) < 0.1, np.nan, rng.exponential(2, 500)),
+        'Volumes': rng.integers(1, 4, 500),
+    })
+    return pd.concat([df, df.iloc[:20]], ignore_index=True)
+
+
+class TestScanQuality:
+    """Testes para as métricas acumuladas por bloco"""
+
+    def test_matches_separate_passes(self, sample_df):
+        reference = pd.Timestamp('2025-02-01')
+
+        scan = scan_quality(sample_df, 'Data prevista de entrega', reference, chunk_rows=64)
+
+        assert scan.null_counts.tolist() == sample_df.isnull().sum().tolist()
+        assert scan.duplicate_rows == sample_df.duplicated().sum()
+        assert scan.future_dates == (sample_df['Data prevista de entrega'] > reference).sum()
+        assert list(scan.moments) == ['Peso', 'Volumes']
+        for col, moments in scan.moments.items():
+            assert moments.mean == pytest.approx(sample_df[col].mean())
+            assert moments.std == pytest.approx(sample_df[col].std())
+
+    def test_single_value_has_no_deviation(self):
+        scan = scan_quality(pd.DataFrame({'Peso': [1.0, np.nan]}))
+
+        assert scan.moments['Peso'].count == 1
+        assert np.isnan(scan.moments['Peso'].std)
+
+
+def test_quality_report_is_cached_for_loaded_dataset():
+    processor = DataProcessor()
+    processor.load_cache = LoadCache()
+    processor.load_file(
+        "Data prevista de entrega;Entregador;Peso\n2025-01-01;João;1\n2025-01-01;João;1\n2025-01-02;;30\n".encode('utf-8'),
+        'dados.csv'
+    )
+
+    report = processor.validate_data_quality(processor.df)
+    misses = processor.result_cache.misses
+    assert processor.validate_data_quality(processor.df) == report
+    assert processor.result_cache.misses == misses
+
+    assert "Registros duplicados: 1 (33.3%)" in report['issues']
+
+
+def test_near_duplicates_reported_from_fingerprints():
+    processor = DataProcessor()
+    processor.load_cache = LoadCache()
+    processor.load_file(
+        "Pedido;Data prevista de entrega;Entregador;Volumes\n"
+        "A1;2025-01-01;João;1\nA1;2025-01-01;João;2\nB2;2025-01-01;João;1\n".encode('utf-8'),
+        'dados.csv'
+    )
+
+    report = processor.validate_data_quality(processor.df)
+
+    assert processor.row_fingerprints.key_columns == ('Pedido', 'Data prevista de entrega', 'Entregador')
+    assert "Possíveis duplicatas (mesmo pedido, dia e entregador): 1" in report['issues']
+    assert processor.find_duplicates(near=True)['Volumes'].tolist() == [2]
+    assert processor.find_duplicates().empty
+
+
+def test_profile_matches_loaded_report(tmp_path, monkeypatch):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        'Data prevista de entrega': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 30, 300), unit='D'),
+        'Entregador': rng.choice(['João', 'Maria', ''], 300),
+        'Peso': rng.exponential(2, 300).round(2),
+    })
+    df = pd.concat([df, df.iloc[:15]], ignore_index=True)
+    path = tmp_path / 'dados.csv'
+    df.to_csv(path, sep=';', index=False)
+    monkeypatch.setitem(INGESTION_CONFIG, 'csv_chunk_size', 50)
+
+    processor = DataProcessor()
+    processor.load_cache = LoadCache()
+    processor.disk_cache = DiskCache(tmp_path / 'cache')
+    report = processor.profile_data_quality(path)
+    assert processor.df is None
+
+    processor.load_file(path.read_bytes(), 'dados.csv')
+    expected = processor.validate_data_quality(processor.df)
+
+    assert report['quality_score'] == expected['quality_score']
+    assert report['issues'] == expected['issues']
+    assert report['profile']['rows'] == len(df)
+    assert report['profile']['distinct']['Entregador'] == 2
+    assert report['profile']['duplicate_error'] < QUALITY_CONFIG['profile_bloom_error']
+
+
+def test_profile_duplicate_error_grows_past_capacity(tmp_path, monkeypatch):
+    path = tmp_path / 'dados.csv'
+    path.write_text("Data prevista de entrega;Entregador\n" + "".join(
+        f"2025-01-01;E{i}\n" for i in range(2_000)
+    ), encoding='utf-8')
+    monkeypatch.setitem(INGESTION_CONFIG, 'csv_chunk_size', 500)
+    monkeypatch.setitem(QUALITY_CONFIG, 'profile_bloom_rows', 200)
+
+    report = DataProcessor().profile_data_quality(path)
+
+    assert report['profile']['duplicate_error'] > 10 * QUALITY_CONFIG['profile_bloom_error']
+
+
+def test_profile_reports_missing_columns(tmp_path):
+    path = tmp_path / 'dados.csv'
+    path.write_text("Entregador;Peso\nJoão;1\n", encoding='utf-8')
+
+    report = DataProcessor().profile_data_quality(path)
+
+    assert report['quality_score'] == 0
+    assert 'obrigatórias' in report['issues'][0]
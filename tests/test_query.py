@@ -0,0 +1,128 @@
+"""
+Testes para as consultas preguiçosas
+"""
+import numpy as np
+import pandas as pd
+from datetime import date
+
+from src.utils.data_processor import DataProcessor
+
+
+def _loaded_processor(size: int = 4200) -> DataProcessor:
+    processor = DataProcessor()
+    processor.detected_columns = {
+        'data_entrega': 'Data prevista de entrega',
+        'entregador': 'Entregador',
+        'cidade': 'Cidade',
+        'status': 'Status'
+    }
+    positions = np.arange(size)
+    processor.df = pd.DataFrame({
+        'Data prevista de entrega': pd.Timestamp('2025-01-01') + pd.to_timedelta(positions % 7, unit='D'),
+        'Entregador': pd.Categorical(np.array(['Ana', 'Bruno', 'Carla', 'Davi'])[positions % 4]),
+        'Cidade': pd.Categorical(np.array(['Rio', 'Santos', 'Campinas'])[positions % 3]),
+        'Status': pd.Categorical(np.array(['Entregue', 'Pendente', 'Em rota', 'Cancelado', 'Entregue'])[positions % 5]),
+        'Peso': (positions % 50).astype(float),
+    })
+    processor._build_indexes()
+    return processor
+
+
+class TestFilterQuery:
+    """Testes para a classe FilterQuery"""
+    
+    def test_fused_predicates_match_eager_filters(self):
+        """Testa consulta com todos os predicados contra filtros encadeados."""
+        processor = _loaded_processor()
+        filters = {
+            'cidade': ['Rio', 'Santos'],
+            'date_range': (date(2025, 1, 2), date(2025, 1, 5)),
+            'Peso_range': (10.0, 30.0),
+        }
+        
+        query = processor.query(filters).with_status('pending')
+        
+        df = processor.df
+        expected = df[
+            df['Cidade'].isin(['Rio', 'Santos'])
+            & df['Data prevista de entrega'].between('2025-01-02', '2025-01-05')
+            & df['Peso'].between(10, 30)
+            & df['Status'].isin(['Pendente', 'Em rota'])
+        ]
+        
+        assert query.count() == len(expected)
+        assert query.positions().tolist() == expected.index.tolist()
+        pd.testing.assert_frame_equal(
+            query.group_by_deliverer(),
+            processor.group_by_deliverer(expected.copy())
+        )
+        assert query.statistics() == processor.get_statistics(expected.copy())
+    
+    def test_numeric_range_applied_by_apply_filters(self):
+        """Testa que filtros '{coluna}_range' passam a ser aplicados."""
+        processor = _loaded_processor()
+        
+        result = processor.apply_filters({'Peso_range': (0.0, 4.0)})
+        
+        assert len(result) > 0
+        assert result['Peso'].max() <= 4.0
+    
+    def test_cube_and_row_paths_agree(self):
+        """Testa consultas respondidas pelo cubo e pelas linhas."""
+        processor = _loaded_processor()
+        query = processor.query({'entregador': 'Ana'}).with_status('delivered')
+        
+        cube_groups = query.group_by_deliverer()
+        cube_stats = query.statistics()
+        cube_count = query.count()
+        processor.cube = None
+        
+        pd.testing.assert_frame_equal(cube_groups, query.group_by_deliverer())
+        assert cube_stats == query.statistics()
+        assert cube_count == query.count()
+    
+    def test_collect_materializes_projection(self):
+        """Testa materialização apenas das colunas pedidas."""
+        processor = _loaded_processor()
+        query = processor.query({'cidade': 'Rio'}).select(['Entregador'])
+        
+        result = query.collect()
+        
+        assert result.columns.tolist() == ['Entregador']
+        assert len(result) == 1400
+    
+    def test_builders_return_new_queries(self):
+        """Testa que a construção não altera a consulta original."""
+        processor = _loaded_processor()
+        base = processor.query()
+        
+        narrowed = base.where('Cidade', ['Rio']).between(np.datetime64('2025-01-01'), np.datetime64('2025-01-01'))
+        
+        assert base.count() == len(processor.df)
+        assert base.values == {} and base.day_bounds is None
+        assert narrowed.count() == len(processor.df[
+            (processor.df['Cidade'] == 'Rio') & (processor.df['Data prevista de entrega'] == '2025-01-01')
+        ])
+
+
+def test_results_are_memoized_per_filter_state():
+    """Testa reaproveitamento de resultados entre consultas equivalentes."""
+    processor = _loaded_processor()
+    filters = {'cidade': ['Rio', 'Santos'], 'Peso_range': (10.0, 30.0)}
+    
+    first = processor.query(filters).with_status('pending').group_by_deliverer()
+    misses = processor.result_cache.misses
+    
+    reordered = {'Peso_range': (10.0, 30.0), 'cidade': ['Santos', 'Rio']}
+    second = processor.query(reordered).with_status('pending').group_by_deliverer()
+    
+    assert processor.result_cache.misses == misses
+    assert processor.result_cache.hits >= 1
+    pd.testing.assert_frame_equal(first, second)
+    
+    # Outro dataset: fingerprint diferente, novo cálculo
+    processor.df = processor.df.iloc[:2100].copy()
+    processor._build_indexes()
+    processor.query(filters).with_status('pending').group_by_deliverer()
+    
+    assert processor.result_cache.misses > misses
@@ -0,0 +1,71 @@
+"""
+Testes para o cache de resultados
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from src.utils.result_cache import ResultCache, canonical_key, frame_fingerprint
+
+
+class TestCanonicalKey:
+    """Testes para canonical_key"""
+
+    def test_ignores_key_and_value_order(self):
+        first = {'cidade': ['Rio', 'Santos'], 'date_filter': date(2025, 1, 1)}
+        second = {'date_filter': date(2025, 1, 1), 'cidade': ['Santos', 'Rio']}
+
+        assert canonical_key(first) == canonical_key(second)
+
+    def test_keeps_range_order(self):
+        assert canonical_key({'Peso_range': (1.0, 5.0)}) != canonical_key({'Peso_range': (5.0, 1.0)})
+
+    def test_normalizes_numpy_types(self):
+        assert canonical_key({'d': np.datetime64('2025-01-01')}) == canonical_key({'d': '2025-01-01'})
+
+    def test_frame_fingerprint(self):
+        df = pd.DataFrame({'a': [1, 2, 3]})
+
+        assert frame_fingerprint(df) == frame_fingerprint(df.copy())
+        assert frame_fingerprint(df) != frame_fingerprint(df.assign(a=[1, 2, 4]))
+
+
+class TestResultCache:
+    """Testes para ResultCache"""
+
+    def test_hits_and_misses(self):
+        cache = ResultCache(max_bytes=1024 * 1024)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return np.arange(10)
+
+        cache.get_or_compute('a', compute)
+        cache.get_or_compute('a', compute)
+
+        assert len(calls) == 1
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['hit_rate'] == 0.5
+
+    def test_evicts_least_recently_used_by_size(self):
+        cache = ResultCache(max_bytes=2500)
+
+        cache.get_or_compute('a', lambda: np.zeros(100))  # 800 bytes
+        cache.get_or_compute('b', lambda: np.zeros(100))
+        cache.get_or_compute('a', lambda: np.zeros(100))
+        cache.get_or_compute('c', lambda: np.zeros(200))  # 1600 bytes
+
+        assert 'a' in cache and 'c' in cache
+        assert 'b' not in cache
+        assert cache.total_bytes <= cache.max_bytes
+        assert cache.stats()['evictions'] == 1
+
+    def test_skips_oversized_results(self):
+        cache = ResultCache(max_bytes=100)
+
+        cache.get_or_compute('a', lambda: np.zeros(100))
+
+        assert len(cache) == 0
@@ -0,0 +1,145 @@
+"""
+Testes para as estruturas probabilísticas (HyperLogLog e filtro de Bloom)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.settings import STATISTICS_CONFIG
+from src.utils.data_processor import DataProcessor
+from src.utils.dataset import LoadCache
+from src.utils.file_cache import DiskCache
+from src.utils.sketches import (
+    BloomFilter, HyperLogLog, SpaceSaving, StatisticsSketch, _bit_length, hash_values
+)
+
+
+def test_bit_length_matches_python():
+    values = np.array([0, 1, 2, 3, 255, 256, 2**53 - 1, 2**53 + 1, 2**64 - 1], dtype=np.uint64)
+
+    assert _bit_length(values).tolist() == [int(v).bit_length() for v in values]
+
+
+class TestHyperLogLog:
+    """Testes para a contagem aproximada de distintos"""
+
+    @pytest.mark.parametrize('distinct', [10, 1_000, 200_000])
+    def test_estimate_within_error(self, distinct):
+        sketch = HyperLogLog()
+        values = pd.Series(np.arange(distinct)).astype(str)
+        sketch.add(pd.concat([values, values.iloc[:distinct // 2]]))
+
+        assert sketch.estimate() == pytest.approx(distinct, rel=4 * sketch.relative_error)
+
+    def test_merge_equals_single_sketch(self):
+        values = pd.Series(np.arange(50_000))
+        whole, first, second = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        whole.add(values)
+        first.add(values.iloc[:30_000])
+        second.add(values.iloc[20_000:])
+
+        first.merge(second)
+        assert np.array_equal(first.registers, whole.registers)
+
+        with pytest.raises(ValueError):
+            first.merge(HyperLogLog(precision=10))
+
+    def test_nulls_are_ignored(self):
+        sketch = HyperLogLog()
+        sketch.add(pd.Series(['a', None, np.nan, 'a']))
+
+        assert sketch.estimate() == 1
+
+
+class TestBloomFilter:
+    """Testes para a detecção de repetições entre blocos"""
+
+    def test_add_new_counts_repeats(self):
+        bloom = BloomFilter(1_000)
+        first = hash_values(pd.Series(['a', 'b', 'b', 'c']))
+        second = hash_values(pd.Series(['c', 'd', 'a']))
+
+        assert bloom.add_new(first) == 1
+        assert bloom.add_new(second) == 2
+        assert bloom.contains(hash_values(pd.Series(['d']))).all()
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(50_000, error_rate=0.01)
+        bloom.add(hash_values(pd.Series(np.arange(50_000))))
+
+        unseen = hash_values(pd.Series(np.arange(50_000, 100_000)))
+        assert bloom.contains(unseen).mean() < 0.02
+        assert bloom.expected_error == pytest.approx(0.01, rel=0.1)
+
+    def test_expected_error_above_capacity(self):
+        bloom = BloomFilter(10_000, error_rate=0.01)
+        assert bloom.expected_error == 0
+        bloom.add(hash_values(pd.Series(np.arange(50_000))))
+
+        measured = bloom.contains(hash_values(pd.Series(np.arange(50_000, 100_000)))).mean()
+        assert bloom.expected_error > 0.3
+        assert bloom.expected_error == pytest.approx(measured, rel=0.1)
+
+
+class TestSpaceSaving:
+    """Testes para os valores mais frequentes aproximados"""
+
+    def test_counts_within_error_after_merge(self):
+        rng = np.random.default_rng(0)
+        values = pd.Series(rng.zipf(1.5, 20_000) % 300).astype(str)
+        summary = SpaceSaving(capacity=16)
+        for start in range(0, len(values), 2_500):
+            block = SpaceSaving(capacity=16)
+            block.add(values.iloc[start:start + 2_500])
+            summary.merge(block)
+
+        exact = values.value_counts()
+        for item, count in summary.counts.items():
+            assert count - summary.errors[item] <= exact[item] <= count
+        assert list(summary.top(3).index) == list(exact.index[:3])
+        assert exact.iloc[16:].max() <= summary.floor
+
+    def test_exact_below_capacity(self):
+        summary = SpaceSaving(capacity=8)
+        summary.add(pd.Series(['Entregue', 'Pendente', 'Entregue', None]))
+
+        assert summary.top().to_dict() == {'Entregue': 2, 'Pendente': 1}
+        assert summary.max_error == 0
+
+
+def test_statistics_sketch_round_trip():
+    df = pd.DataFrame({
+        'Data': pd.to_datetime(['2025-01-02', '2025-01-01', None]),
+        'Entregador': ['João', 'Maria', 'João'],
+        'Status': ['Entregue', 'Entregue', 'Pendente'],
+    })
+    sketch = StatisticsSketch(['Entregador'], ['Status'], 'Data')
+    sketch.update(df)
+
+    restored = StatisticsSketch.from_dict(sketch.to_dict())
+
+    assert (restored.rows, restored.undated) == (3, 1)
+    assert (restored.min_day, restored.max_day) == (np.datetime64('2025-01-01'), np.datetime64('2025-01-02'))
+    assert restored.distinct['Entregador'].estimate() == 2
+    assert restored.top['Status'].top().to_dict() == {'Entregue': 2, 'Pendente': 1}
+
+
+def test_approximate_statistics_for_loaded_dataset(tmp_path, monkeypatch):
+    monkeypatch.setitem(STATISTICS_CONFIG, 'approximate', True)
+    processor = DataProcessor()
+    processor.load_cache = LoadCache()
+    processor.disk_cache = DiskCache(tmp_path / 'cache')
+    processor.load_file(
+        "Data prevista de entrega;Entregador;Cidade;Status\n"
+        "2025-01-01;João;SP;Entregue\n2025-01-02;Maria;SP;Pendente\n2025-01-02;João;RJ;Entregue\n".encode('utf-8'),
+        'dados.csv'
+    )
+
+    stats = processor.get_statistics(processor.df)
+    exact = processor.get_statistics(processor.df, approximate=False)
+
+    assert stats.pop('approximate')['distinct_error'] == pytest.approx(0.01625)
+    assert stats == exact
+    assert 'approximate' in processor.query().statistics()
+    # Filtros que o resumo não cobre usam o caminho exato
+    assert 'approximate' not in processor.query().where('Cidade', ['SP']).statistics()
@@ -0,0 +1,154 @@
+"""
+Testes para o backend SQL sobre o histórico
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.settings import INGESTION_CONFIG, STATISTICS_CONFIG
+from src.utils.data_processor import DataProcessor
+from src.utils.dataset import LoadCache
+from src.utils.history_store import PYARROW_AVAILABLE, HistoryStore
+from src.utils.sql_backend import SQLBackend, SQLiteBackend
+
+pytestmark = pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow não instalado")
+
+
+def _processor(history):
+    processor = DataProcessor()
+    processor.history = history
+    processor.load_cache = LoadCache()
+    return processor
+
+
+@pytest.fixture
+def history(tmp_path):
+    rows = [
+        ('2025-01-01', 'João', 'SP', 'Entregue', 1.5),
+        ('2025-01-01', 'Maria', 'RJ', 'Pendente', 2.0),
+        ('2025-01-02', 'João', 'SP', 'Em rota', 7.5),
+        ('2025-01-02', 'Pedro', '', 'Entregue', 3.0),
+        ('2025-01-03', 'Maria', 'SP', 'Entregue', 4.0),
+        ('2025-01-03', 'João', 'RJ', 'Cancelado', 9.0),
+    ]
+    content = "Data prevista de entrega;Entregador;Cidade;Status;Peso\n" + "".join(
+        ";".join(str(value) for value in row) + "\n" for row in rows
+    )
+
+    store = HistoryStore(tmp_path / 'historico')
+    source = _processor(store)
+    source.load_file(content.encode('utf-8'), 'dados.csv')
+    source.save_history()
+    return store
+
+
+@pytest.fixture
+def sql_processor(history, monkeypatch):
+    monkeypatch.setitem(INGESTION_CONFIG, "sql_backend_rows", 2)
+    monkeypatch.setitem(INGESTION_CONFIG, "sql_preview_rows", 3)
+
+    processor = _processor(history)
+    success, _, preview = processor.load_history()
+    assert success
+    assert len(preview) == 3
+    return processor
+
+
+@pytest.fixture
+def in_memory(history, sql_processor, monkeypatch):
+    monkeypatch.setitem(INGESTION_CONFIG, "sql_backend_rows", 1_000)
+
+    processor = _processor(history)
+    processor.load_history()
+    return processor
+
+
+class TestSQLBackend:
+    """Testes para as consultas SQL equivalentes às consultas em memória"""
+
+    def test_backend_selected_above_threshold(self, sql_processor, in_memory):
+        assert sql_processor.backend is not None
+        assert sql_processor.dataset.total_records == 6
+        assert in_memory.backend is None
+        assert len(in_memory.df) == 6
+
+    @pytest.mark.parametrize("filters", [
+        {},
+        {'entregador': 'João'},
+        {'cidade': ['SP', 'RJ'], 'date_range': (date(2025, 1, 2), date(2025, 1, 3))},
+        {'date_filter': date(2025, 1, 1), 'Peso_range': (1.0, 1.8)},
+    ])
+    @pytest.mark.parametrize("status_type", ['all', 'delivered', 'pending'])
+    def test_matches_in_memory_execution(self, sql_processor, in_memory, filters, status_type):
+        expected = in_memory.query(filters).with_status(status_type)
+        result = sql_processor.query(filters).with_status(status_type)
+
+        assert result.count() == expected.count()
+        pd.testing.assert_frame_equal(result.group_by_deliverer(), expected.group_by_deliverer())
+        assert result.statistics() == expected.statistics()
+
+    def test_approximate_statistics_from_daily_sketches(self, sql_processor, monkeypatch):
+        monkeypatch.setitem(STATISTICS_CONFIG, "approximate", True)
+        query = sql_processor.query().between(np.datetime64('2025-01-02'), np.datetime64('2025-01-03'))
+
+        stats = query.statistics()
+        approximate = stats.pop('approximate')
+
+        assert stats == query.statistics(approximate=False)
+        assert approximate['status_error'] == 0
+        # Filtros além do período seguem pelo SQL
+        assert 'approximate' not in query.where('Entregador', ['João']).statistics()
+
+    def test_filter_options_cover_whole_period(self, sql_processor):
+        assert sql_processor.get_filter_options('Entregador') == ['João', 'Maria', 'Pedro']
+        assert sql_processor.get_filter_options('Cidade') == ['RJ', 'SP']
+
+    def test_collect_restores_types(self, sql_processor):
+        df = sql_processor.query({'entregador': 'João'}).collect()
+
+        assert len(df) == 3
+        assert pd.api.types.is_datetime64_any_dtype(df['Data prevista de entrega'])
+        assert isinstance(df['Entregador'].dtype, pd.CategoricalDtype)
+        assert df['Peso'].tolist() == [1.5, 7.5, 9.0]
+
+    def test_engine_methods_are_abstract(self):
+        with pytest.raises(TypeError):
+            SQLBackend({}, {})
+
+    def test_sqlite_copy_follows_history_updates(self, history):
+        backend = SQLiteBackend(history, 'Data prevista de entrega', {})
+        backend.close()
+
+        processor = _processor(history)
+        processor.load_file(
+            "Data prevista de entrega;Entregador;Cidade;Status;Peso\n2025-01-03;Ana;SP;Entregue;1.0\n".encode('utf-8'),
+            'novo.csv'
+        )
+        processor.save_history()
+
+        backend = SQLiteBackend(history, 'Data prevista de entrega', {})
+        assert backend.count() == 5
+        assert backend.distinct('Entregador') == ['Ana', 'João', 'Maria', 'Pedro']
+        backend.close()
+
+    def test_save_history_refused_with_backend(self, sql_processor, history):
+        before = history.read()
+
+        success, message, summary = sql_processor.save_history()
+
+        assert not success and 'prévia' in message
+        assert summary == {}
+        pd.testing.assert_frame_equal(history.read(), before)
+
+    def test_loading_a_file_disables_backend(self, sql_processor):
+        backend = sql_processor.backend
+        sql_processor.load_file(
+            "Data prevista de entrega;Entregador\n2025-01-01;Ana\n".encode('utf-8'), 'novo.csv'
+        )
+
+        assert sql_processor.backend is None
+        with pytest.raises(Exception):  # conexão do backend anterior fechada
+            backend.count()
+        assert sql_processor.query().count() == 1
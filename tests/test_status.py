@@ -0,0 +1,48 @@
+"""
+Testes para a classificação de status
+"""
+import numpy as np
+import pandas as pd
+
+from src.utils.status import (
+    STATUS_DELIVERED, STATUS_OTHER, STATUS_PENDING, STATUS_UNKNOWN,
+    StatusClassifier, status_mask
+)
+
+
+class TestStatusClassifier:
+    """Testes para StatusClassifier"""
+
+    def test_classify(self):
+        classifier = StatusClassifier()
+
+        assert classifier.classify('Entregue') == STATUS_DELIVERED
+        assert classifier.classify('EM ROTA') == STATUS_PENDING
+        assert classifier.classify('Cancelado') == STATUS_OTHER
+        # Atende aos dois grupos de indicadores
+        assert classifier.classify('Entregue - pendente assinatura') == STATUS_DELIVERED | STATUS_PENDING
+
+    def test_custom_indicators(self):
+        classifier = StatusClassifier(['feito'], ['aberto'])
+
+        assert classifier.classify('Feito') == STATUS_DELIVERED
+        assert classifier.classify('Entregue') == STATUS_OTHER
+
+    def test_codes_categorical_and_object(self):
+        classifier = StatusClassifier()
+        values = ['Entregue', None, 'Pendente', 'Cancelado', 'Entregue']
+
+        categorical = classifier.codes(pd.Series(pd.Categorical(values)))
+        plain = classifier.codes(pd.Series(values, dtype=object))
+
+        expected = [STATUS_DELIVERED, STATUS_UNKNOWN, STATUS_PENDING, STATUS_OTHER, STATUS_DELIVERED]
+        assert categorical.dtype == np.int8
+        assert categorical.tolist() == expected
+        assert plain.tolist() == expected
+
+    def test_status_mask(self):
+        codes = np.array([STATUS_DELIVERED, STATUS_PENDING, STATUS_DELIVERED | STATUS_PENDING,
+                          STATUS_OTHER, STATUS_UNKNOWN], dtype=np.int8)
+
+        assert status_mask(codes, 'delivered').tolist() == [True, False, True, False, False]
+        assert status_mask(codes, 'pending').tolist() == [False, True, True, False, False]
@@ -0,0 +1,66 @@
+"""
+Testes para a normalização de texto sobre valores distintos
+"""
+import numpy as np
+import pandas as pd
+
+from src.config.settings import INGESTION_CONFIG
+from src.utils.data_processor import DataProcessor
+from src.utils.dataset import LoadCache
+from src.utils.file_cache import DiskCache
+from src.utils.text_normalization import fold_text, merge_labels, normalize_strings
+
+
+class TestNormalizeStrings:
+    """Testes para a limpeza de colunas de texto"""
+
+    def test_nulls_become_empty_without_nan_literal(self):
+        series = pd.Series([' a ', np.nan, None, 'nan', 3, ' a'], index=list('uvwxyz'))
+
+        result = normalize_strings(series)
+
+        assert result.tolist() == ['a', '', '', 'nan', '3', 'a']
+        assert list(result.index) == list('uvwxyz')
+
+    def test_fold_removes_accents_and_case(self):
+        result = normalize_strings(pd.Series(['  São Paulo', 'SAO PAULO', 'Ñandú']), fold=True)
+
+        assert result.tolist() == ['sao paulo', 'sao paulo', 'nandu']
+        assert list(fold_text(pd.Index(['Pendênte']))) == ['pendente']
+
+
+class TestMergeLabels:
+    """Testes para a unificação de categorias equivalentes"""
+
+    def test_most_frequent_spelling_wins(self):
+        labels = pd.Index(['SAO PAULO', 'Rio', 'São Paulo'])
+
+        remap, categories = merge_labels(labels, np.array([1, 4, 3]), fold=True)
+
+        assert list(categories) == ['Rio', 'São Paulo']
+        assert remap.tolist() == [1, 0, 1]
+
+    def test_without_fold_only_identical_labels_merge(self):
+        remap, categories = merge_labels(pd.Index(['b', 'a', 'B', 'a']), np.array([1, 1, 1, 1]))
+
+        assert list(categories) == ['B', 'a', 'b']
+        assert remap.tolist() == [2, 1, 0, 1]
+
+
+def test_fold_categories_on_load(monkeypatch, tmp_path):
+    monkeypatch.setitem(INGESTION_CONFIG, "fold_categories", True)
+    processor = DataProcessor()
+    processor.load_cache = LoadCache()
+    processor.disk_cache = DiskCache(tmp_path)
+    content = (
+        "Data prevista de entrega;Cidade;Observação\n"
+        "2025-01-01;São Paulo;  frágil \n"
+        "2025-01-01;SAO PAULO;\n"
+        "2025-01-02;São Paulo ;ok\n"
+    ).encode('utf-8')
+
+    success, _, df = processor.load_file(content, 'dados.csv')
+
+    assert success
+    assert list(df['Cidade'].cat.categories) == ['São Paulo']
+    assert df['Observação'].tolist() == ['frágil', '', 'ok']
@@ -0,0 +1,175 @@
+"""
+Testes para o leitor XLSX em streaming.
+"""
+import zipfile
+import pytest
+import pandas as pd
+from datetime import datetime
+from io import BytesIO
+from openpyxl import Workbook
+
+from src.config.settings import INGESTION_CONFIG
+from src.utils.data_processor import DataProcessor
+from src.utils.dataset import LoadCache
+from src.utils.file_cache import DiskCache
+from src.utils.xlsx_reader import iter_xlsx_chunks, read_xlsx, read_xlsx_columns
+
+
+@pytest.fixture
+def workbook_bytes():
+    """Planilha com datas, números, texto e cabeçalho vazio."""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['Data prevista de entrega', 'Entregador', 'Valor', None, 'Entregador'])
+    sheet.append([datetime(2025, 1, 1, 10, 30), 'João', 10, 'x', 'A'])
+    sheet.append([datetime(2025, 1, 2), 'Maria', 12.5, None, 'B'])
+    sheet.append([None, None, None, None, None])
+    sheet.append([datetime(2025, 1, 3), 'Pedro', None, 'y', 'C'])
+    
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_read_xlsx_columns(workbook_bytes):
+    """Testa leitura do cabeçalho com colunas vazias e duplicadas."""
+    columns = read_xlsx_columns(workbook_bytes)
+    
+    assert columns == ['Data prevista de entrega', 'Entregador', 'Valor', 'Unnamed: 3', 'Entregador.1']
+
+
+def test_read_xlsx_typed_columns(workbook_bytes):
+    """Testa tipos das colunas e descarte de linhas vazias."""
+    df = read_xlsx(workbook_bytes)
+    
+    assert len(df) == 3
+    assert pd.api.types.is_datetime64_any_dtype(df['Data prevista de entrega'])
+    assert df['Data prevista de entrega'].iloc[0] == pd.Timestamp(2025, 1, 1, 10, 30)
+    assert df['Valor'].dtype == float
+    assert df['Entregador'].tolist() == ['João', 'Maria', 'Pedro']
+
+
+def test_read_xlsx_matches_pandas(workbook_bytes):
+    """Testa equivalência com pandas.read_excel."""
+    expected = pd.read_excel(BytesIO(workbook_bytes), engine='openpyxl').dropna(how='all')
+    
+    df = read_xlsx(workbook_bytes)
+    
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_iter_xlsx_chunks_projection(workbook_bytes):
+    """Testa leitura apenas das colunas pedidas, em blocos."""
+    chunks = list(iter_xlsx_chunks(
+        workbook_bytes,
+        columns=['Entregador', 'Inexistente', 'Data prevista de entrega'],
+        chunk_size=2
+    ))
+    
+    assert [len(c) for c in chunks] == [2, 1]
+    assert list(chunks[0].columns) == ['Entregador', 'Data prevista de entrega']
+    assert chunks[1].index.tolist() == [2]
+
+
+def _minimal_package(sheet_rows: str, shared_strings: str) -> bytes:
+    """Monta um XLSX mínimo, como o gerado pelo Excel (strings compartilhadas)."""
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    rel_ns = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+    
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('xl/workbook.xml', (
+            f'<workbook {ns} {rel_ns}><sheets>'
+            '<sheet name="Dados" sheetId="1" r:id="rId7"/></sheets></workbook>'
+        ))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId7" Target="worksheets/dados.xml"/></Relationships>'
+        ))
+        archive.writestr('xl/sharedStrings.xml', f'<sst {ns}>{shared_strings}</sst>')
+        archive.writestr('xl/worksheets/dados.xml', (
+            f'<worksheet {ns}><sheetData>{sheet_rows}</sheetData></worksheet>'
+        ))
+    return buffer.getvalue()
+
+
+def test_read_xlsx_shared_strings():
+    """Testa strings compartilhadas, texto formatado e células sem referência."""
+    content = _minimal_package(
+        '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="C1" t="s"><v>1</v></c></row>'
+        '<row r="2"><c t="s"><v>2</v></c><c/><c t="s"><v>3</v></c></row>',
+        '<si><t>Entregador</t></si>'
+        '<si><r><t>Cida</t></r><r><t>de</t></r></si>'
+        '<si><t>João</t></si>'
+        '<si><t>Goiânia</t></si>'
+    )
+    
+    df = read_xlsx(content)
+    
+    assert list(df.columns) == ['Entregador', 'Unnamed: 1', 'Cidade']
+    assert df.iloc[0]['Entregador'] == 'João'
+    assert df.iloc[0]['Cidade'] == 'Goiânia'
+
+
+def test_iter_xlsx_chunks_projection_callable(workbook_bytes):
+    """Testa projeção decidida a partir do cabeçalho."""
+    df = read_xlsx(workbook_bytes, columns=lambda header: [c for c in header if c == 'Valor'])
+    
+    assert list(df.columns) == ['Valor']
+    assert len(df) == 2  # Linhas sem valor na projeção são descartadas
+
+
+def test_time_only_formats_stay_times():
+    """Testa que formatos só de hora e de duração não viram datas de 1899."""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['Data', 'Janela', 'Duração'])
+    for day, serial in ((1, 0.375), (2, 0.5)):
+        sheet.append([datetime(2025, 1, day), serial, serial + 1])
+    for row in sheet.iter_rows(min_row=2):
+        row[0].number_format = 'dd/mm/yyyy'
+        row[1].number_format = 'hh:mm'
+        row[2].number_format = '[h]:mm'
+    buffer = BytesIO()
+    workbook.save(buffer)
+    
+    df = read_xlsx(buffer.getvalue())
+    expected = pd.read_excel(BytesIO(buffer.getvalue()), engine='openpyxl')
+    
+    assert pd.api.types.is_datetime64_any_dtype(df['Data'])
+    assert [value.isoformat() for value in df['Janela']] == ['09:00:00', '12:00:00']
+    pd.testing.assert_frame_equal(df, expected)
+
+
+
+def test_chunks_with_changing_column_types_match_pandas(tmp_path, monkeypatch):
+    """Testa coluna numérica no primeiro bloco e mista nos seguintes."""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['Data prevista de entrega', 'Código', 'Obs'])
+    for row, code in enumerate([1, 2.5, 3, 4, 'A7', 6]):
+        sheet.append([datetime(2025, 1, row + 1), code, 'x' if row >= 3 else None])
+    buffer = BytesIO()
+    workbook.save(buffer)
+    monkeypatch.setitem(INGESTION_CONFIG, 'xlsx_chunk_size', 3)
+    
+    chunks = list(iter_xlsx_chunks(buffer.getvalue()))
+    df = read_xlsx(buffer.getvalue())
+    expected = pd.read_excel(BytesIO(buffer.getvalue()), engine='openpyxl')
+    
+    assert chunks[0]['Código'].dtype == float and chunks[1]['Código'].dtype == object
+    assert [type(value) for value in df['Código']] == [type(value) for value in expected['Código']]
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), expected)
+    
+    # Mesmo texto que numa leitura em bloco único, após o pré-processamento
+    monkeypatch.setitem(INGESTION_CONFIG, 'xlsx_chunk_size', 100)
+    single = DataProcessor()
+    single.load_file(buffer.getvalue(), 'entregas.xlsx')
+    monkeypatch.setitem(INGESTION_CONFIG, 'xlsx_chunk_size', 3)
+    chunked = DataProcessor()
+    chunked.load_cache = LoadCache()
+    chunked.disk_cache = DiskCache(tmp_path / 'blocos')
+    chunked.load_file(buffer.getvalue(), 'entregas.xlsx')
+    
+    assert chunked.df['Código'].tolist() == ['1', '2.5', '3', '4', 'A7', '6']
+    pd.testing.assert_frame_equal(chunked.df.reset_index(drop=True), single.df.reset_index(drop=True))